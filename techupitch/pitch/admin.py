@@ -13,6 +13,7 @@ admin.site.register(League)
 
 class PlayerAdmin(admin.ModelAdmin):
     list_display = ('name', 'dept', 'team', 'date_of_birth')
+    list_select_related = ('team',)
 
 admin.site.register(Player, PlayerAdmin)
 
@@ -20,6 +21,7 @@ admin.site.register(Player, PlayerAdmin)
 class MatchAdmin(admin.ModelAdmin):
 
     list_display = ('home_team', 'away_team' , 'start_time', 'status')
+    list_select_related = ('home_team', 'away_team')
 
 admin.site.register(Match, MatchAdmin)
 
@@ -32,6 +34,7 @@ admin.site.register(Team, TeamAdmin)
 
 class EventAdmin(admin.ModelAdmin):
     list_display = ('match', 'event_type', 'player_name')
+    list_select_related = ('match__home_team', 'match__away_team', 'player_name__team')
     
 admin.site.register(Event, EventAdmin)
 
@@ -0,0 +1,204 @@
+"""Trimmed Bootstrap CSS and per-page static byte reports.
+
+:func:`trim_css` keeps only the rules whose selectors can match markup in
+our templates, in the manner of PurgeCSS: every word in the templates (and
+in the Python modules that emit HTML) counts as used, so a class is kept if
+its name appears anywhere. Element, attribute and ``:root`` rules, at-rules
+such as ``@font-face`` and ``@keyframes`` and the custom properties are
+always kept. Classes that are only added at run time go in ``SAFELIST``.
+"""
+import gzip
+import os
+import re
+from html.parser import HTMLParser
+from pathlib import Path
+
+from whitenoise.compress import Compressor
+
+try:
+    import brotli
+except ImportError:  # optional; whitenoise skips .br files without it too
+    brotli = None
+
+BOOTSTRAP_CSS = 'bootstrap/css/bootstrap.min.css'
+TRIMMED_CSS = 'bootstrap/css/bootstrap.trimmed.min.css'
+
+# What a trimmed or replacement asset stands in for, for the savings report.
+REPLACES = {
+    TRIMMED_CSS: BOOTSTRAP_CSS,
+    'js/bootstrap-lite.js': 'bootstrap/js/bootstrap.bundle.min.js',
+}
+
+# Added by js/bootstrap-lite.js rather than written in templates.
+SAFELIST = {'show', 'collapse', 'collapsing', 'fade'}
+
+WORD = re.compile(r'[A-Za-z0-9_-]+')
+CLASS = re.compile(r'\.(-?[_a-zA-Z][\w-]*)')
+NEGATION = re.compile(r':not\([^()]*(?:\([^()]*\)[^()]*)*\)')
+KEEP_AT_RULES = ('@charset', '@font-face', '@keyframes', '@-webkit-keyframes', '@page', '@property', '@import')
+
+
+def used_words(paths):
+    """Every word appearing in the given files."""
+    words = set(SAFELIST)
+    for path in paths:
+        words.update(WORD.findall(Path(path).read_text(encoding='utf-8', errors='ignore')))
+    return words
+
+
+def markup_sources(root):
+    """Templates, plus the Python modules of the app that build HTML or widget attributes."""
+    root = Path(root)
+    return sorted(root.glob('templates/**/*.html')) + sorted(root.glob('*.py')) + sorted(root.glob('templatetags/*.py'))
+
+
+def split_top_level(text, separator):
+    """Split on ``separator`` outside parentheses, brackets and strings."""
+    parts, depth, quote, start = [], 0, None, 0
+    for index, char in enumerate(text):
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in '"\'':
+            quote = char
+        elif char in '([':
+            depth += 1
+        elif char in ')]':
+            depth -= 1
+        elif char == separator and depth == 0:
+            parts.append(text[start:index])
+            start = index + 1
+    parts.append(text[start:])
+    return parts
+
+
+def blocks(css):
+    """Yield ``(prelude, body)`` for each top-level block, and ``(statement, None)`` for ``@charset;`` etc."""
+    index, length = 0, len(css)
+    while index < length:
+        start, depth, quote = index, 0, None
+        while index < length:
+            char = css[index]
+            if quote:
+                if char == '\\':
+                    index += 1
+                elif char == quote:
+                    quote = None
+            elif css.startswith('/*', index):
+                end = css.find('*/', index + 2)
+                index = length if end == -1 else end + 1
+            elif char in '"\'':
+                quote = char
+            elif char == ';' and depth == 0:
+                yield css[start:index + 1].strip(), None
+                index += 1
+                break
+            elif char == '{':
+                if depth == 0:
+                    body_start = index + 1
+                depth += 1
+            elif char == '}':
+                depth -= 1
+                if depth == 0:
+                    yield css[start:body_start - 1].strip(), css[body_start:index]
+                    index += 1
+                    break
+            index += 1
+        else:
+            if css[start:].strip():
+                yield css[start:].strip(), None
+
+
+def strip_comments(css):
+    # keep /*! licence */ banners, drop everything else
+    return re.sub(r'/\*(?!!).*?\*/', '', css, flags=re.S)
+
+
+def selector_used(selector, words):
+    classes = CLASS.findall(NEGATION.sub('', selector))
+    return all(name in words for name in classes)
+
+
+def trim_css(css, words):
+    """Return ``css`` without the rules none of whose selectors can match."""
+    out = []
+    for prelude, body in blocks(strip_comments(css)):
+        if body is None:
+            out.append(prelude)
+        elif prelude.startswith('@'):
+            if prelude.startswith(KEEP_AT_RULES):
+                out.append(f'{prelude}{{{body}}}')
+            else:  # @media, @supports, @container, @layer: trim what is inside
+                inner = trim_css(body, words)
+                if inner:
+                    out.append(f'{prelude}{{{inner}}}')
+        else:
+            selectors = [selector for selector in split_top_level(prelude, ',') if selector_used(selector.strip(), words)]
+            if selectors:
+                out.append(f"{','.join(selectors)}{{{body}}}")
+    return ''.join(out)
+
+
+def compressed_sizes(data):
+    """``(raw, gzip, brotli)`` byte counts, as collectstatic would write them (brotli is None if unavailable)."""
+    return (
+        len(data),
+        len(gzip.compress(data, compresslevel=9)),
+        len(brotli.compress(data)) if brotli is not None else None,
+    )
+
+
+class AssetParser(HTMLParser):
+    """Collects the stylesheet, script and image URLs of a page."""
+
+    def __init__(self):
+        super().__init__()
+        self.urls = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == 'link' and 'stylesheet' in (attrs.get('rel') or '').split():
+            self.urls.append(attrs.get('href'))
+        elif tag in ('script', 'img') and attrs.get('src'):
+            self.urls.append(attrs['src'])
+
+
+def page_assets(html, static_url):
+    """The distinct static names a page references, hashed names included."""
+    parser = AssetParser()
+    parser.feed(html)
+    names = []
+    for url in parser.urls:
+        if url and url.startswith(static_url):
+            name = url[len(static_url):].split('?')[0]
+            if name not in names:
+                names.append(name)
+    return names
+
+
+def unhashed(name):
+    """``css/app.1a2b3c4d5e6f.css`` -> ``css/app.css``."""
+    return re.sub(r'\.[0-9a-f]{12}(\.[^./]+)$', r'\1', name)
+
+
+def asset_bytes(name, find):
+    """Size rows for one asset: ``(name, original_raw, raw, gzip, brotli)``.
+
+    ``find`` maps a static name to a path (``django.contrib.staticfiles.finders.find``).
+    ``original_raw`` is the size of what the asset replaces, if anything. Files
+    whitenoise doesn't precompress (images, fonts) report their raw size in
+    the compressed columns, and brotli falls back to gzip when unavailable.
+    """
+    source = unhashed(name)
+    path = find(source)
+    if not path:
+        return None
+    data = Path(path).read_bytes()
+    if Compressor(quiet=True).should_compress(source):
+        raw, gz, br = compressed_sizes(data)
+        br = gz if br is None else br
+    else:
+        raw = gz = br = len(data)
+    original = find(REPLACES[source]) if source in REPLACES else None
+    original_raw = os.path.getsize(original) if original else raw
+    return source, original_raw, raw, gz, br
@@ -0,0 +1,84 @@
+"""Time the busiest pages and API lists against whatever data is in the database.
+
+Each target is requested in-process through the test client (middleware,
+view, templates and serializers included, no network). The first request
+runs on a cleared cache and is reported separately from the warm median.
+"""
+import statistics
+import time
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client
+from django.urls import reverse
+
+from .metrics import QueryTimer
+from .models import Event, League, Match, Player, Team, University
+
+
+def targets():
+    """Return ``{name: url}`` for everything the benchmark times."""
+    urls = {
+        'index': reverse('index'),
+        'match_list': reverse('matchs'),
+        'live_upcoming_matches': reverse('ajax-matches'),
+    }
+    league = League.objects.order_by('pk').first()
+    if league is not None:
+        urls['league_table_view'] = reverse('league-table', args=[league.pk])
+    for endpoint in ('sports', 'universities', 'leagues', 'teams', 'matches', 'players', 'events'):
+        urls[f'api_{endpoint}'] = f'/api/{endpoint}/'
+    return urls
+
+
+def dataset_size():
+    return {
+        'universities': University.objects.count(),
+        'leagues': League.objects.count(),
+        'teams': Team.objects.count(),
+        'players': Player.objects.count(),
+        'matches': Match.objects.count(),
+        'events': Event.objects.count(),
+    }
+
+
+def time_request(client, url):
+    timer = QueryTimer()
+    with connection.execute_wrapper(timer):
+        start = time.perf_counter()
+        response = client.get(url)
+        elapsed = time.perf_counter() - start
+    return elapsed * 1000, timer.queries, response.status_code
+
+
+def run(repeat=5, only=None):
+    """Time every target ``repeat`` times and return ``{name: result}``."""
+    client = Client()
+    results = {}
+    for name, url in targets().items():
+        if only and name not in only:
+            continue
+        cache.clear()
+        first_ms, queries, status = time_request(client, url)
+        timings = [time_request(client, url)[0] for _ in range(repeat)]
+        results[name] = {
+            'url': url,
+            'status': status,
+            'queries': queries,
+            'first_ms': round(first_ms, 3),
+            'median_ms': round(statistics.median(timings), 3) if timings else None,
+            'min_ms': round(min(timings), 3) if timings else None,
+            'max_ms': round(max(timings), 3) if timings else None,
+        }
+    return results
+
+
+def compare(previous, current):
+    """Yield ``(size, name, before_ms, after_ms)`` for targets timed in both result files."""
+    before = {run['dataset']['matches']: run['results'] for run in previous['runs']}
+    for run in current['runs']:
+        matches = run['dataset']['matches']
+        for name, result in run['results'].items():
+            old = before.get(matches, {}).get(name)
+            if old and old['median_ms'] is not None and result['median_ms'] is not None:
+                yield matches, name, old['median_ms'], result['median_ms']
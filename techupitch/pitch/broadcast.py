@@ -0,0 +1,280 @@
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+
+from . import versions
+from .scoreboard import scoreboard_delta, versioned_scoreboard
+
+
+def sse_message(event, data):
+    """Encode one Server-Sent Events frame."""
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+def read_scoreboard(known_version=None):
+    """Return ``(version, board)``; board is None when the version is still ``known_version``.
+
+    ``version`` is the board's own, which lags the counter when a stale copy was
+    served during a rebuild; the next refresh then reads again.
+    """
+    close_old_connections()
+    version = versions.current(versions.SCOREBOARD)
+    if version == known_version:
+        return version, None
+    return versioned_scoreboard(version)
+
+
+class ScoreboardHub:
+    """Fan one scoreboard read out to every live stream in this process.
+
+    A single refresh task runs while at least one client is connected. It
+    checks the scoreboard version every ``SCOREBOARD_STREAM_INTERVAL`` seconds,
+    or straight away when a save in this process calls :meth:`notify`, and
+    only re-reads the board when the version moved. When the board differs
+    from the previous read, the delta is encoded once and the same frame is
+    queued for every subscriber.
+    """
+
+    def __init__(self, queue_size=32):
+        self.queue_size = queue_size
+        self.subscribers = set()
+        self.snapshot = None
+        self.version = None
+        self.loop = None
+        self.wake = None
+        self.task = None
+
+    async def subscribe(self):
+        loop = asyncio.get_running_loop()
+        if self.loop is not loop:
+            # first use, or the server started a new event loop
+            self.loop, self.wake, self.task, self.snapshot = loop, asyncio.Event(), None, None
+
+        if self.snapshot is None:
+            self.version, self.snapshot = await sync_to_async(read_scoreboard)()
+
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        queue.put_nowait(sse_message('snapshot', self.snapshot))
+        self.subscribers.add(queue)
+
+        if self.task is None or self.task.done():
+            self.task = loop.create_task(self.run())
+        return queue
+
+    def unsubscribe(self, queue):
+        self.subscribers.discard(queue)
+
+    def notify(self):
+        """Ask the refresh task to re-read now. Safe to call from any thread."""
+        loop = self.loop
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self.wake.set)
+
+    async def run(self):
+        while self.subscribers:
+            try:
+                await asyncio.wait_for(self.wake.wait(), timeout=settings.SCOREBOARD_STREAM_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            self.wake.clear()
+            if self.subscribers:
+                await self.refresh()
+        # nobody is listening, so the next subscriber must start from a fresh read
+        self.snapshot = None
+
+    async def refresh(self):
+        version, current = await sync_to_async(read_scoreboard)(self.version)
+        if current is None:
+            return  # scoreboard version unchanged: nothing to read or send
+        delta = scoreboard_delta(self.snapshot, current)
+        self.version, self.snapshot = version, current
+        if delta is None:
+            return
+
+        message = sse_message('delta', delta)
+        for queue in list(self.subscribers):
+            self.publish(queue, message)
+
+    def publish(self, queue, message):
+        try:
+            queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # too far behind to patch: drop the backlog and resend the whole board
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(sse_message('snapshot', self.snapshot))
+
+
+scoreboard_hub = ScoreboardHub()
+
+
+# ---- Per-match event timeline (WebSocket) ----
+
+def event_item(event):
+    return {
+        'type': 'event',
+        'id': event.id,
+        'event_type': event.event_type,
+        'event_time': event.event_time.isoformat(),
+        'team': event.team.name if event.team else None,
+        'player': event.player_name.name if event.player_name else None,
+        'description': event.description or '',
+    }
+
+
+def removed_item(event_id):
+    return {'type': 'removed', 'id': event_id}
+
+
+def score_item(home_score, away_score, status):
+    return {'type': 'score', 'home_score': home_score, 'away_score': away_score, 'status': status}
+
+
+def encode(item):
+    return json.dumps(item, separators=(',', ':'))
+
+
+def read_events(match_id, after_id):
+    from .models import Event
+
+    close_old_connections()
+    events = (
+        Event.objects.filter(match_id=match_id, id__gt=after_id)
+        .select_related('team', 'player_name')
+        .order_by('id')
+    )
+    return [event_item(event) for event in events]
+
+
+def read_score(match_id):
+    from .models import Match
+
+    close_old_connections()
+    row = Match.objects.filter(pk=match_id).values_list('home_score', 'away_score', 'status').first()
+    return score_item(*row) if row else None
+
+
+def read_event_ids(match_id):
+    from .models import Event
+
+    close_old_connections()
+    return set(Event.objects.filter(match_id=match_id).values_list('id', flat=True))
+
+
+# Queued in place of a frame when a socket falls too far behind; the consumer
+# closes it and the client reconnects, resuming from the last event id it saw.
+RESYNC = (None, None)
+
+
+class MatchChannel:
+    """Sockets watching one match, fed by a single polling task."""
+
+    def __init__(self, hub, match_id):
+        self.hub = hub
+        self.match_id = match_id
+        self.subscribers = set()
+        self.wake = asyncio.Event()
+        self.ready = asyncio.Event()
+        self.last_event_id = None
+        self.event_ids = set()
+        self.score = None
+        self.task = None
+
+    async def run(self):
+        try:
+            self.event_ids = await sync_to_async(read_event_ids)(self.match_id)
+            self.last_event_id = max(self.event_ids, default=0)
+            self.score = await sync_to_async(read_score)(self.match_id)
+        finally:
+            self.ready.set()
+
+        while self.subscribers:
+            try:
+                await asyncio.wait_for(self.wake.wait(), timeout=settings.MATCH_STREAM_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            self.wake.clear()
+            if self.subscribers:
+                await self.refresh()
+        if self.hub.channels.get(self.match_id) is self:
+            del self.hub.channels[self.match_id]
+
+    async def refresh(self):
+        for item in await sync_to_async(read_events)(self.match_id, self.last_event_id):
+            self.last_event_id = item['id']
+            self.event_ids.add(item['id'])
+            self.publish((item['id'], encode(item)))
+
+        # deletions leave no row behind, so compare the ids we have published
+        current = await sync_to_async(read_event_ids)(self.match_id)
+        for event_id in sorted(self.event_ids - current):
+            self.publish((None, encode(removed_item(event_id))))
+        self.event_ids &= current
+
+        score = await sync_to_async(read_score)(self.match_id)
+        if score is not None and score != self.score:
+            self.score = score
+            self.publish((None, encode(score)))
+
+    def publish(self, message):
+        for queue in list(self.subscribers):
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                self.subscribers.discard(queue)
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(RESYNC)
+
+
+class MatchTimelineHub:
+    """One :class:`MatchChannel` per watched match in this process.
+
+    New events are serialised once per channel, however many sockets watch
+    the match, and every socket is sent the same encoded frame.
+    """
+
+    def __init__(self, queue_size=64):
+        self.queue_size = queue_size
+        self.channels = {}
+        self.loop = None
+
+    async def subscribe(self, match_id):
+        """Register a socket and return its queue of ``(event_id, frame)`` pairs.
+
+        By the time this returns, the channel will publish every event newer
+        than what is already in the database, so a backlog read made
+        afterwards cannot leave a gap.
+        """
+        loop = asyncio.get_running_loop()
+        if self.loop is not loop:
+            self.loop, self.channels = loop, {}
+
+        channel = self.channels.get(match_id)
+        if channel is None or channel.task.done():
+            channel = self.channels[match_id] = MatchChannel(self, match_id)
+
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        channel.subscribers.add(queue)
+        if channel.task is None:
+            channel.task = loop.create_task(channel.run())
+        await channel.ready.wait()
+        return queue
+
+    def unsubscribe(self, match_id, queue):
+        channel = self.channels.get(match_id)
+        if channel is not None:
+            channel.subscribers.discard(queue)
+
+    def notify(self, match_id):
+        """Ask the channel for ``match_id`` to re-read now. Safe to call from any thread."""
+        loop = self.loop
+        channel = self.channels.get(match_id)
+        if loop is not None and channel is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(channel.wake.set)
+
+
+match_timeline_hub = MatchTimelineHub()
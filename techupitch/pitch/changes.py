@@ -0,0 +1,99 @@
+"""Append-only change feed of matches and events.
+
+Every create, update and delete of a ``Match`` or ``Event`` appends a
+``MatchChange`` in the same transaction, numbered from the ``changes``
+counter. A client downloads everything once, remembers the feed version, and
+from then on asks only for the entries after it:
+
+    GET /api/changes/?since=1041
+    {"version": 1043, "resync": false, "more": false,
+     "changes": [{"version": 1042, "kind": "event", "action": "created", "id": 77, "data": {...}},
+                 {"version": 1043, "kind": "match", "action": "updated", "id": 9, "data": {...}}]}
+
+``data`` is the row as ``MatchSerializer``/``EventSerializer`` write it (ids,
+not names). Old entries are deleted by ``manage.py compact_match_changes``;
+a client whose version is older than what was deleted gets ``resync: true``
+and must download everything again before polling from the returned version.
+"""
+from django.db import transaction
+
+from . import versions
+from .models import MatchChange, VersionCounter
+from .serializers import EventSerializer, MatchSerializer
+
+SERIALIZERS = {
+    'match': MatchSerializer,
+    'event': EventSerializer,
+}
+
+
+def record(action, instances):
+    """Append one ``action`` entry per instance (all Matches or all Events)."""
+    instances = list(instances)
+    if not instances:
+        return
+    kind = instances[0]._meta.model_name
+    serializer = SERIALIZERS[kind]
+    with transaction.atomic():
+        last = versions.advance(versions.CHANGES, len(instances))
+        first = last - len(instances) + 1
+        MatchChange.objects.bulk_create([
+            MatchChange(version=first + offset, kind=kind, object_id=instance.pk, action=action,
+                        data=serializer(instance).data)
+            for offset, instance in enumerate(instances)
+        ])
+
+
+def entry(change):
+    return {
+        'version': change.version,
+        'kind': change.kind,
+        'action': change.action,
+        'id': change.object_id,
+        'data': change.data,
+    }
+
+
+def feed(since, limit):
+    """Return the changes after version ``since`` (at most ``limit``), or a resync marker.
+
+    ``since`` is None for a client that has nothing yet. The returned
+    ``version`` is what the client should send next time.
+    """
+    current = versions.current(versions.CHANGES)
+    compacted = versions.current(versions.CHANGES_COMPACTED)
+    if since is None or since < compacted or since > current:
+        # nothing yet, entries it needs were compacted away, or a different database
+        return {'version': current, 'resync': True, 'more': False, 'changes': []}
+
+    changes = list(MatchChange.objects.filter(version__gt=since).order_by('version')[:limit + 1])
+    more = len(changes) > limit
+    changes = changes[:limit]
+    return {
+        'version': changes[-1].version if more else max([since] + [change.version for change in changes]),
+        'resync': False,
+        'more': more,
+        'changes': [entry(change) for change in changes],
+    }
+
+
+def compact(before):
+    """Delete the entries written before the datetime ``before``; returns how many went."""
+    with transaction.atomic():
+        through = (MatchChange.objects.filter(changed_at__lt=before)
+                   .order_by('-version').values_list('version', flat=True).first())
+        if through is None:
+            return 0
+        deleted, _ = MatchChange.objects.filter(version__lte=through).delete()
+        mark_compacted(through)
+    return deleted
+
+
+def require_resync():
+    """Send every client back to a full download, after writes that bypassed the log."""
+    with transaction.atomic():
+        mark_compacted(versions.advance(versions.CHANGES))
+
+
+def mark_compacted(through):
+    VersionCounter.objects.update_or_create(name=versions.CHANGES_COMPACTED, defaults={'value': through})
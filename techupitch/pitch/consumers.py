@@ -0,0 +1,79 @@
+import asyncio
+import re
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+
+from .broadcast import RESYNC, encode, match_timeline_hub, read_events, read_score
+
+MATCH_TIMELINE_PATH = re.compile(r'^/ws/match/(?P<match_id>\d+)/$')
+
+
+async def websocket_application(scope, receive, send):
+    """Route WebSocket connections; only the per-match timeline exists today."""
+    found = MATCH_TIMELINE_PATH.match(scope['path'])
+    if found is None:
+        await receive()  # websocket.connect
+        await send({'type': 'websocket.close', 'code': 4404})
+        return
+    await match_timeline(scope, receive, send, int(found['match_id']))
+
+
+async def match_timeline(scope, receive, send, match_id):
+    """Push new events, removed events and score changes of one match as compact JSON frames.
+
+    ``?after=<event id>`` replays the events a reconnecting client missed
+    before switching to live frames.
+    """
+    message = await receive()
+    if message['type'] != 'websocket.connect':
+        return
+
+    score = await sync_to_async(read_score)(match_id)
+    if score is None:
+        await send({'type': 'websocket.close', 'code': 4404})
+        return
+
+    query = parse_qs(scope.get('query_string', b'').decode())
+    try:
+        after = int(query.get('after', ['0'])[0])
+    except ValueError:
+        after = 0
+
+    await send({'type': 'websocket.accept'})
+
+    queue = await match_timeline_hub.subscribe(match_id)
+    receiver = getter = None
+    try:
+        sent_up_to = after
+        for item in await sync_to_async(read_events)(match_id, after):
+            await send({'type': 'websocket.send', 'text': encode(item)})
+            sent_up_to = item['id']
+        await send({'type': 'websocket.send', 'text': encode(await sync_to_async(read_score)(match_id))})
+
+        receiver = asyncio.ensure_future(receive())
+        while True:
+            if getter is None:
+                getter = asyncio.ensure_future(queue.get())
+            done, _ = await asyncio.wait({receiver, getter}, return_when=asyncio.FIRST_COMPLETED)
+
+            if receiver in done:
+                if receiver.result()['type'] == 'websocket.disconnect':
+                    return
+                receiver = asyncio.ensure_future(receive())  # clients have nothing to say; ignore it
+            if getter not in done:
+                continue
+
+            frame, getter = getter.result(), None
+            if frame is RESYNC:
+                await send({'type': 'websocket.close', 'code': 4000})
+                return
+            event_id, text = frame
+            if event_id is not None and event_id <= sent_up_to:
+                continue  # already sent in the backlog
+            await send({'type': 'websocket.send', 'text': text})
+    finally:
+        match_timeline_hub.unsubscribe(match_id, queue)
+        for task in (receiver, getter):
+            if task is not None and not task.done():
+                task.cancel()
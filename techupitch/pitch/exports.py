@@ -0,0 +1,157 @@
+"""Full-season exports of matches, events and players as CSV or XLSX.
+
+Rows come from ``values_list(...).iterator(chunk_size=...)``, so the database
+is read in chunks and no model instances are built. CSV is written
+straight into a ``StreamingHttpResponse``. XLSX uses openpyxl's write-only
+mode, which spools rows to a temporary file and never holds the sheet in
+memory; the file is then served with ``FileResponse``. Under ASGI both bodies
+go through ``streaming.stream``/``stream_file`` so they are not buffered.
+"""
+import csv
+import tempfile
+from datetime import datetime, time
+
+from django.utils import timezone
+from openpyxl import Workbook
+
+from .models import Event, Match, Player
+
+CHUNK_SIZE = 2000
+# Rows per worksheet; XLSX caps a sheet at 1,048,576 rows including the header.
+XLSX_SHEET_ROWS = 1_048_575
+
+EXPORTS = {
+    'matches': {
+        'queryset': lambda: Match.objects.order_by('start_time', 'id'),
+        'columns': [
+            ('id', 'id'),
+            ('league', 'league__name'),
+            ('university', 'league__university__name'),
+            ('home_team', 'home_team__name'),
+            ('away_team', 'away_team__name'),
+            ('start_time', 'start_time'),
+            ('status', 'status'),
+            ('home_score', 'home_score'),
+            ('away_score', 'away_score'),
+        ],
+        'league': 'league',
+        'university': 'league__university',
+        'time': 'start_time',
+    },
+    'events': {
+        'queryset': lambda: Event.objects.order_by('event_time', 'id'),
+        'columns': [
+            ('id', 'id'),
+            ('match_id', 'match_id'),
+            ('league', 'match__league__name'),
+            ('home_team', 'match__home_team__name'),
+            ('away_team', 'match__away_team__name'),
+            ('event_time', 'event_time'),
+            ('event_type', 'event_type'),
+            ('team', 'team__name'),
+            ('player', 'player_name__name'),
+            ('description', 'description'),
+        ],
+        'league': 'match__league',
+        'university': 'match__league__university',
+        'time': 'event_time',
+    },
+    'players': {
+        'queryset': lambda: Player.objects.order_by('team__name', 'jersey_number', 'id'),
+        'columns': [
+            ('id', 'id'),
+            ('name', 'name'),
+            ('team', 'team__name'),
+            ('university', 'university__name'),
+            ('dept', 'dept'),
+            ('position', 'position'),
+            ('jersey_number', 'jersey_number'),
+            ('date_of_birth', 'date_of_birth'),
+            ('height_cm', 'height_cm'),
+        ],
+        'league': 'team__league',
+        'university': 'university',
+        'time': None,
+    },
+}
+
+
+def export_queryset(kind, league=None, university=None, date_from=None, date_to=None):
+    """Return the filtered rows of ``kind`` as a ``values_list`` queryset.
+
+    ``date_from``/``date_to`` are inclusive dates on the kickoff or event time
+    (ignored for players).
+    """
+    spec = EXPORTS[kind]
+    queryset = spec['queryset']()
+    if league is not None:
+        queryset = queryset.filter(**{spec['league']: league})
+    if university is not None:
+        queryset = queryset.filter(**{spec['university']: university})
+    if spec['time'] and date_from:
+        start = timezone.make_aware(datetime.combine(date_from, time.min))
+        queryset = queryset.filter(**{f"{spec['time']}__gte": start})
+    if spec['time'] and date_to:
+        end = timezone.make_aware(datetime.combine(date_to, time.max))
+        queryset = queryset.filter(**{f"{spec['time']}__lte": end})
+    return queryset.values_list(*[path for _, path in spec['columns']])
+
+
+def header(kind):
+    return [name for name, _ in EXPORTS[kind]['columns']]
+
+
+def rows(queryset, chunk_size=CHUNK_SIZE):
+    for row in queryset.iterator(chunk_size=chunk_size):
+        yield [cell_value(value) for value in row]
+
+
+def cell_value(value):
+    # XLSX cannot hold time zones, so datetimes are written in local time
+    if isinstance(value, datetime):
+        return timezone.localtime(value).replace(tzinfo=None) if timezone.is_aware(value) else value
+    return value
+
+
+class Echo:
+    """File-like object whose ``write`` hands the line back, for streaming csv.writer output."""
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(kind, queryset):
+    writer = csv.writer(Echo())
+    yield writer.writerow(header(kind))
+    for row in rows(queryset):
+        yield writer.writerow(row)
+
+
+def write_csv(kind, queryset, file):
+    writer = csv.writer(file)
+    writer.writerow(header(kind))
+    writer.writerows(rows(queryset))
+
+
+def write_xlsx(kind, queryset, file):
+    """Write the export as an XLSX workbook to the binary ``file``."""
+    workbook = Workbook(write_only=True)
+    sheet, written = None, XLSX_SHEET_ROWS
+    for row in rows(queryset):
+        if written == XLSX_SHEET_ROWS:
+            sheet = workbook.create_sheet(kind if sheet is None else f'{kind} {len(workbook.sheetnames) + 1}')
+            sheet.append(header(kind))
+            written = 0
+        sheet.append(row)
+        written += 1
+    if sheet is None:
+        workbook.create_sheet(kind).append(header(kind))
+    workbook.save(file)
+
+
+def xlsx_file(kind, queryset):
+    """Return an open temporary file holding the XLSX export, rewound for reading."""
+    file = tempfile.TemporaryFile()
+    write_xlsx(kind, queryset, file)
+    file.seek(0)
+    return file
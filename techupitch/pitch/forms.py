@@ -1,5 +1,9 @@
+from datetime import date, timedelta
+
 from django import forms
-from .models import Match, Team
+from django.conf import settings
+from .models import League, Match, Sport, Team, University
+from .scheduling import WEEKDAYS
 
 class MatchForm(forms.ModelForm):
     class Meta:
@@ -14,3 +18,126 @@ class TeamForm(forms.ModelForm):
         model = Team
         fields = ['name', 'logo', 'league','university']
 
+
+
+class FixtureGeneratorForm(forms.Form):
+    teams = forms.ModelMultipleChoiceField(queryset=Team.objects.none(), widget=forms.CheckboxSelectMultiple)
+    start_date = forms.DateField(widget=forms.DateInput(attrs={'type': 'date'}))
+    match_days = forms.TypedMultipleChoiceField(
+        choices=[(index, day.title()) for index, day in enumerate(WEEKDAYS)],
+        coerce=int, initial=[5], widget=forms.CheckboxSelectMultiple,
+    )
+    kickoff_slots = forms.CharField(initial='15:00, 17:30', help_text="Comma-separated kickoff times (HH:MM).")
+    double = forms.BooleanField(required=False, initial=True, label="Home and away (double round robin)")
+
+    def __init__(self, *args, league, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['teams'].queryset = league.teams.order_by('name')
+        self.fields['teams'].initial = list(self.fields['teams'].queryset)
+
+    def clean_teams(self):
+        teams = self.cleaned_data['teams']
+        if len(teams) < 2:
+            raise forms.ValidationError("Pick at least two teams.")
+        return teams
+
+    def clean_kickoff_slots(self):
+        slots = []
+        for value in self.cleaned_data['kickoff_slots'].split(','):
+            try:
+                slots.append(forms.TimeField().clean(value.strip()))
+            except forms.ValidationError:
+                raise forms.ValidationError(f"{value.strip()!r} is not a time (HH:MM).")
+        return slots
+
+
+class ImportForm(forms.Form):
+    kind = forms.ChoiceField(choices=[('players', 'Players'), ('teams', 'Teams'), ('fixtures', 'Fixtures')])
+    file = forms.FileField(help_text="An .xlsx or .csv file with a header row.")
+    sheet = forms.CharField(required=False, help_text="Worksheet name (XLSX only; defaults to the first).")
+    dry_run = forms.BooleanField(required=False, initial=True, label="Check only (don't save)")
+
+    def clean_file(self):
+        upload = self.cleaned_data['file']
+        if not upload.name.lower().endswith(('.xlsx', '.xlsm', '.csv')):
+            raise forms.ValidationError("Upload an .xlsx or .csv file.")
+        return upload
+
+
+class ExportForm(forms.Form):
+    format = forms.ChoiceField(choices=[('csv', 'CSV'), ('xlsx', 'Excel (XLSX)')], initial='csv', required=False)
+    league = forms.ModelChoiceField(queryset=League.objects.all(), required=False)
+    university = forms.ModelChoiceField(queryset=University.objects.all(), required=False)
+    date_from = forms.DateField(required=False)
+    date_to = forms.DateField(required=False)
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if cleaned_data.get('date_from') and cleaned_data.get('date_to') \
+                and cleaned_data['date_from'] > cleaned_data['date_to']:
+            raise forms.ValidationError("date_from must be on or before date_to.")
+        return cleaned_data
+
+
+class ListFilterForm(forms.Form):
+    """GET filters of the team and player lists."""
+    league = forms.ModelChoiceField(queryset=League.objects.order_by('name'), required=False, empty_label="All leagues")
+    university = forms.ModelChoiceField(queryset=University.objects.order_by('name'), required=False,
+                                        empty_label="All universities")
+    sport = forms.ModelChoiceField(queryset=Sport.objects.order_by('name'), required=False, empty_label="All sports")
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        for field in self.fields.values():
+            field.widget.attrs['class'] = 'form-select form-select-sm'
+
+    def filters(self, lookups):
+        """Queryset filters for the valid, non-empty fields; ``lookups`` maps field name to lookup path."""
+        self.is_valid()
+        cleaned_data = getattr(self, 'cleaned_data', {})
+        return {lookups[name]: value for name, value in cleaned_data.items() if value is not None}
+
+
+class MatchWindowForm(forms.Form):
+    """The days the fixtures page shows: ``?date=`` for one day, ``?from=&to=`` for a range.
+
+    With neither, the window is today ± ``MATCH_LIST_DAYS``.
+    """
+    date = forms.DateField(required=False,
+                           widget=forms.DateInput(attrs={'type': 'date', 'class': 'form-control form-control-sm'}))
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # "from" is a keyword, so these can't be declared as attributes
+        self.fields['from'] = forms.DateField(required=False, widget=forms.DateInput(attrs={'type': 'date'}))
+        self.fields['to'] = forms.DateField(required=False, widget=forms.DateInput(attrs={'type': 'date'}))
+
+    def clean(self):
+        cleaned_data = super().clean()
+        # leave room for the widest window (an open end or a full range) and
+        # the previous/next links around it, so none of them leave date's range
+        margin = timedelta(days=max(settings.MATCH_LIST_MAX_DAYS, 4 * settings.MATCH_LIST_DAYS + 1) + 2)
+        for name in ('date', 'from', 'to'):
+            value = cleaned_data.get(name)
+            if value and not date.min + margin <= value <= date.max - margin:
+                self.add_error(name, "Pick a date nearer the present.")
+        first, last = cleaned_data.get('from'), cleaned_data.get('to')
+        if first and last:
+            if first > last:
+                raise forms.ValidationError("from must be on or before to.")
+            if (last - first).days >= settings.MATCH_LIST_MAX_DAYS:
+                raise forms.ValidationError(f"Pick at most {settings.MATCH_LIST_MAX_DAYS} days.")
+        return cleaned_data
+
+    def window(self, today):
+        """Return ``(first, last)``, the inclusive days to show; invalid input gets the default window."""
+        days = timedelta(days=settings.MATCH_LIST_DAYS)
+        if not self.is_valid():
+            return today - days, today + days
+        day, first, last = self.cleaned_data['date'], self.cleaned_data['from'], self.cleaned_data['to']
+        if day:
+            return day, day
+        if first or last:
+            # an open end gets a default-sized window
+            return first or last - 2 * days, last or first + 2 * days
+        return today - days, today + days
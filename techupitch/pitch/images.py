@@ -0,0 +1,164 @@
+"""Resized WebP and PNG/JPEG derivatives of uploaded logos and photos.
+
+Each image field listed in ``IMAGE_FIELDS`` has a JSON sibling
+``<field>_derivatives`` recording the variants built from the current file:
+
+    {"source": "team_logos/x.png", "digest": "3fa2…", "width": 800, "height": 800,
+     "variants": [{"width": 48, "height": 48, "webp": "derivatives/3f/3fa2…-48.webp",
+                   "fallback": "derivatives/3f/3fa2…-48.png"}, …]}
+
+Files are named after a hash of the source bytes, so an identical upload reuses
+them and their URLs never change content. Resizing runs in a process pool; only
+:func:`derive` (pure Pillow, no ORM) executes in the child processes.
+"""
+import hashlib
+import io
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connections
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+# model_name -> image field with a ``<field>_derivatives`` JSONField
+IMAGE_FIELDS = {
+    'team': 'logo',
+    'player': 'image',
+    'league': 'logo',
+    'university': 'logo',
+}
+
+_lock = threading.Lock()
+_pool = None
+
+
+def derivatives_attname(field_name):
+    return f'{field_name}_derivatives'
+
+
+def derive(data, widths, quality):
+    """Resize the image in ``data`` to each of ``widths`` (never upscaling).
+
+    Returns ``(digest, (width, height), variants)`` where each variant is
+    ``(width, height, {extension: bytes})`` with a WebP and a PNG (images with
+    transparency) or JPEG rendering.
+    """
+    digest = hashlib.sha256(data).hexdigest()[:20]
+    with Image.open(io.BytesIO(data)) as image:
+        image = ImageOps.exif_transpose(image)
+        size = image.size
+        has_alpha = image.mode in ('RGBA', 'LA', 'PA') or (image.mode == 'P' and 'transparency' in image.info)
+        image = image.convert('RGBA' if has_alpha else 'RGB')
+
+        targets = sorted({min(width, size[0]) for width in widths})
+        variants = []
+        for width in targets:
+            height = max(1, round(size[1] * width / size[0]))
+            resized = image.resize((width, height), Image.LANCZOS) if width != size[0] else image
+            files = {}
+            buffer = io.BytesIO()
+            resized.save(buffer, 'WEBP', quality=quality, method=6)
+            files['webp'] = buffer.getvalue()
+            buffer = io.BytesIO()
+            if has_alpha:
+                resized.save(buffer, 'PNG', optimize=True)
+                files['png'] = buffer.getvalue()
+            else:
+                resized.save(buffer, 'JPEG', quality=quality, optimize=True, progressive=True)
+                files['jpg'] = buffer.getvalue()
+            variants.append((width, height, files))
+    return digest, size, variants
+
+
+def pool():
+    global _pool
+    with _lock:
+        if _pool is None:
+            # spawn, not fork: the web workers are threaded
+            _pool = ProcessPoolExecutor(max_workers=settings.IMAGE_WORKERS,
+                                        mp_context=multiprocessing.get_context('spawn'))
+        return _pool
+
+
+def is_current(fieldfile):
+    """True when ``fieldfile`` has derivatives built from its present file."""
+    derivatives = getattr(fieldfile.instance, derivatives_attname(fieldfile.field.name), None) or {}
+    return bool(fieldfile) and derivatives.get('source') == fieldfile.name and bool(derivatives.get('variants'))
+
+
+def save_derivatives(source_name, result):
+    """Write the files of a :func:`derive` result to storage and return the JSON record."""
+    digest, (width, height), variants = result
+    record = {'source': source_name, 'digest': digest, 'width': width, 'height': height, 'variants': []}
+    for variant_width, variant_height, files in variants:
+        entry = {'width': variant_width, 'height': variant_height}
+        for extension, content in files.items():
+            name = f'derivatives/{digest[:2]}/{digest}-{variant_width}.{extension}'
+            if not default_storage.exists(name):
+                name = default_storage.save(name, ContentFile(content))
+            entry['webp' if extension == 'webp' else 'fallback'] = name
+        record['variants'].append(entry)
+    return record
+
+
+def store(model, pk, field_name, source_name, result):
+    """Save the derivatives and attach them to the row, unless its file changed meanwhile."""
+    record = save_derivatives(source_name, result)
+    values = {derivatives_attname(field_name): record}
+    if any(field.name == 'updated_at' for field in model._meta.concrete_fields):
+        values['updated_at'] = timezone.now()  # list rows cached on it show the new picture
+    model._default_manager.filter(pk=pk, **{field_name: source_name}).update(**values)
+    return record
+
+
+def schedule(instance, field_name):
+    """Build derivatives of ``instance.<field_name>`` in the process pool.
+
+    Returns a future that resolves to the stored record once the files are
+    written and the row updated.
+    """
+    fieldfile = getattr(instance, field_name)
+    with fieldfile.storage.open(fieldfile.name, 'rb') as source:
+        data = source.read()
+    model, pk, source_name = type(instance), instance.pk, fieldfile.name
+
+    done = Future()
+
+    def finish(derived):
+        try:
+            done.set_result(store(model, pk, field_name, source_name, derived.result()))
+        except BaseException as error:
+            done.set_exception(error)
+        finally:
+            connections.close_all()
+
+    pool().submit(derive, data, settings.IMAGE_DERIVATIVE_WIDTHS, settings.IMAGE_QUALITY).add_done_callback(finish)
+    return done
+
+
+def variants(fieldfile):
+    """Return the derivative record of ``fieldfile`` with storage URLs, or None if there is none yet."""
+    if not is_current(fieldfile):
+        return None
+    record = getattr(fieldfile.instance, derivatives_attname(fieldfile.field.name))
+    return [
+        {'width': variant['width'], 'height': variant['height'],
+         'webp': default_storage.url(variant['webp']), 'fallback': default_storage.url(variant['fallback'])}
+        for variant in record['variants']
+    ]
+
+
+def srcset(entries, key):
+    return ', '.join(f"{entry[key]} {entry['width']}w" for entry in entries)
+
+
+def best_fit(entries, display_width):
+    """The smallest variant at least twice ``display_width`` wide (for 2x screens), else the largest."""
+    for entry in entries:
+        if entry['width'] >= display_width * 2:
+            return entry
+    return entries[-1]
@@ -0,0 +1,492 @@
+"""Bulk import of teams, players and fixtures from XLSX or CSV files.
+
+Rows are streamed (openpyxl in read-only mode, or the csv module) and
+handled in batches: the team, league and university names in a batch are
+resolved with one query per model for the names not seen before, the
+existing rows for the batch's natural keys are fetched in one query, and
+the batch is written with ``bulk_create``/``bulk_update``. Memory stays flat
+however long the sheet is. A row that fails to parse or validate is
+reported with its sheet row number and skipped; the rest of the batch is written.
+
+Natural keys (later rows win within a file):
+
+* teams: (university, name)
+* players: (team, jersey_number), or (team, name) without a jersey number
+* fixtures: (league, home_team, away_team)
+"""
+import codecs
+import csv
+import math
+import zipfile
+from datetime import date, datetime
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from openpyxl import load_workbook
+from openpyxl.utils.exceptions import InvalidFileException
+
+from . import changes, versions
+from .models import Event, League, Match, Player, Sport, Team, University
+from .scoreboard import invalidate_snapshot
+from .standings import rebuild_all_standings
+
+BATCH_SIZE = 1000
+# Errors kept for the report; any further ones are only counted.
+MAX_ERRORS = 1000
+
+
+# ---- Reading ----
+
+def header_key(value):
+    return str(value or '').strip().lower().replace(' ', '_')
+
+
+def read_rows(file, filename, sheet=None):
+    """Yield ``(row number, {column: value})`` for every non-empty row of ``file``.
+
+    ``file`` is a binary file object; ``filename`` picks the format. A file
+    that can't be parsed raises ValueError, whichever reader failed.
+    """
+    try:
+        if filename.lower().endswith(('.xlsx', '.xlsm')):
+            workbook = load_workbook(file, read_only=True, data_only=True)
+            try:
+                worksheet = workbook[sheet] if sheet else workbook.active
+                yield from _rows(worksheet.iter_rows(values_only=True))
+            finally:
+                workbook.close()
+        elif filename.lower().endswith('.csv'):
+            yield from _rows(csv.reader(codecs.iterdecode(file, 'utf-8-sig')))
+        else:
+            raise ValueError(f"Unsupported file type: {filename} (use .xlsx or .csv).")
+    except (zipfile.BadZipFile, InvalidFileException, csv.Error) as error:
+        raise ValueError(f"{filename} is damaged or not really a {filename.rsplit('.', 1)[-1]} file ({error}).") from error
+
+
+def _rows(rows):
+    header = [header_key(value) for value in next(rows, ())]
+    for number, values in enumerate(rows, start=2):
+        if all(value is None or str(value).strip() == '' for value in values):
+            continue
+        yield number, dict(zip(header, values))
+
+
+# ---- Cell values ----
+
+def text(row, column, required=False):
+    value = row.get(column)
+    value = '' if value is None else str(value).strip()
+    if required and not value:
+        raise ValidationError(f"{column} is required.")
+    return value
+
+
+def integer(row, column):
+    value = row.get(column)
+    if value is None or str(value).strip() == '':
+        return None
+    try:
+        number = float(value)
+        # "inf" and "nan" parse as floats but have no int()
+        if not math.isfinite(number) or number != int(number):
+            raise ValueError
+    except (TypeError, ValueError):
+        raise ValidationError(f"{column} must be a whole number, not {value!r}.")
+    return int(number)
+
+
+def date_value(row, column):
+    value = row.get(column)
+    if value is None or str(value).strip() == '':
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    parsed = parse_date(str(value).strip())
+    if parsed is None:
+        raise ValidationError(f"{column} must be a date (YYYY-MM-DD), not {value!r}.")
+    return parsed
+
+
+def datetime_value(row, column):
+    value = row.get(column)
+    if isinstance(value, datetime):
+        parsed = value
+    else:
+        parsed = parse_datetime(text(row, column, required=True))
+        if parsed is None:
+            raise ValidationError(f"{column} must be a date and time (YYYY-MM-DD HH:MM), not {value!r}.")
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+# ---- Name lookups ----
+
+class NameLookup:
+    """Resolve names to ids, querying each distinct name once per import."""
+
+    def __init__(self, queryset, label, fields=('name',)):
+        self.queryset = queryset
+        self.label = label
+        self.fields = fields
+        self.ids = {}
+
+    def prefetch(self, names):
+        missing = {name for name in names if name and name not in self.ids}
+        if not missing:
+            return
+        found = {name: set() for name in missing}
+        for field in self.fields:
+            for pk, name in self.queryset.filter(**{f'{field}__in': missing}).values_list('pk', field):
+                found[name].add(pk)
+        self.ids.update(found)
+
+    def get(self, name):
+        ids = self.ids.get(name)
+        if not ids:
+            raise ValidationError(f"Unknown {self.label} {name!r}.")
+        if len(ids) > 1:
+            raise ValidationError(f"{self.label.capitalize()} {name!r} is ambiguous.")
+        return next(iter(ids))
+
+
+class TeamLookup:
+    """Resolve team names, narrowed by university or league when names repeat."""
+
+    def __init__(self):
+        self.teams = {}  # name -> [(pk, university_id, {league ids})]
+        self.universities = {}  # team pk -> university id
+
+    def prefetch(self, names):
+        missing = {name for name in names if name and name not in self.teams}
+        if not missing:
+            return
+        found = {name: {} for name in missing}
+        for pk, name, university_id in Team.objects.filter(name__in=missing).values_list('pk', 'name', 'university_id'):
+            found[name][pk] = (pk, university_id, set())
+        through = Team.league.through.objects.filter(team__name__in=missing)
+        for team_id, name, league_id in through.values_list('team_id', 'team__name', 'league_id'):
+            found[name][team_id][2].add(league_id)
+        self.teams.update({name: list(teams.values()) for name, teams in found.items()})
+        self.universities.update({pk: university_id for teams in found.values()
+                                  for pk, university_id, _ in teams.values()})
+
+    def get(self, name, university_id=None, league_id=None):
+        candidates = self.teams.get(name, [])
+        if university_id is not None:
+            candidates = [team for team in candidates if team[1] == university_id]
+        if league_id is not None:
+            candidates = [team for team in candidates if league_id in team[2]]
+        if not candidates:
+            raise ValidationError(f"Unknown team {name!r}.")
+        if len(candidates) > 1:
+            raise ValidationError(f"Team {name!r} is ambiguous; add a university column.")
+        return candidates[0][0]
+
+
+# ---- Importers ----
+
+class ImportResult:
+    def __init__(self):
+        self.rows = 0
+        self.created = 0
+        self.updated = 0
+        self.errors = []
+        self.error_count = 0
+
+    def error(self, number, error):
+        self.error_count += 1
+        if len(self.errors) < MAX_ERRORS:
+            if hasattr(error, 'error_dict'):
+                messages = [f"{field}: {' '.join(errors)}" for field, errors in error.message_dict.items()]
+            else:
+                messages = error.messages
+            self.errors.append((number, ' '.join(messages)))
+
+
+class Importer:
+    """Batch loop shared by the importers; subclasses parse rows and find existing ones."""
+    model = None
+    update_fields = []
+    # resolved to ids already, so skip full_clean's per-row existence query
+    foreign_keys = []
+
+    def __init__(self, batch_size=BATCH_SIZE, dry_run=False):
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+
+    def run(self, rows):
+        result = ImportResult()
+        batch = []
+        for number, row in rows:
+            batch.append((number, row))
+            if len(batch) >= self.batch_size:
+                self.write(batch, result)
+                batch = []
+        if batch:
+            self.write(batch, result)
+        if not self.dry_run and (result.created or result.updated):
+            self.finish()
+        result.errors.sort()
+        return result
+
+    def write(self, batch, result):
+        result.rows += len(batch)
+        self.prefetch([row for _, row in batch])
+
+        parsed = {}
+        for number, row in batch:
+            try:
+                values = self.parse(row)
+            except ValidationError as error:
+                result.error(number, error)
+                continue
+            parsed[self.natural_key(values)] = (number, values)
+
+        existing = self.existing(parsed.keys())
+        creates, updates = [], []
+        for key, (number, values) in parsed.items():
+            instance = existing.get(key)
+            if instance is None:
+                instance = self.model(**self.model_values(values))
+            else:
+                for field, value in self.model_values(values).items():
+                    setattr(instance, field, value)
+            try:
+                instance.full_clean(exclude=self.foreign_keys, validate_unique=False, validate_constraints=False)
+            except ValidationError as error:
+                result.error(number, error)
+                continue
+            (creates if instance.pk is None else updates).append((instance, values))
+
+        if not self.dry_run:
+            with transaction.atomic():
+                self.model.objects.bulk_create([instance for instance, _ in creates])
+                if updates:
+                    # bulk_update skips pre_save, so stamp auto_now fields here
+                    auto_now = [field for field in self.model._meta.concrete_fields if getattr(field, 'auto_now', False)]
+                    for instance, _ in updates:
+                        for field in auto_now:
+                            field.pre_save(instance, add=False)
+                    self.model.objects.bulk_update([instance for instance, _ in updates],
+                                                   self.update_fields + [field.name for field in auto_now])
+                self.after_write(creates + updates)
+                self.record_changes(creates, updates)
+        result.created += len(creates)
+        result.updated += len(updates)
+
+    def prefetch(self, rows):
+        pass
+
+    def model_values(self, values):
+        return values
+
+    def parse(self, row):
+        raise NotImplementedError
+
+    def natural_key(self, values):
+        raise NotImplementedError
+
+    def existing(self, keys):
+        raise NotImplementedError
+
+    def after_write(self, written):
+        pass
+
+    def record_changes(self, creates, updates):
+        """Append the batch to the change feed, for models that have one."""
+
+    def finish(self):
+        transaction.on_commit(invalidate_snapshot)
+
+
+class TeamImporter(Importer):
+    """Columns: name, sport, university (name or short name), leagues (separated by ';')."""
+    model = Team
+    update_fields = ['sport', 'university']
+    foreign_keys = ['sport', 'university', 'league']
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.sports = NameLookup(Sport.objects.all(), 'sport')
+        self.universities = NameLookup(University.objects.all(), 'university', ('name', 'short_name'))
+        self.leagues = NameLookup(League.objects.all(), 'league')
+        self.touched_leagues = set()
+
+    def prefetch(self, rows):
+        self.sports.prefetch(text(row, 'sport') for row in rows)
+        self.universities.prefetch(text(row, 'university') for row in rows)
+        self.leagues.prefetch(name.strip() for row in rows for name in text(row, 'leagues').split(';'))
+
+    def parse(self, row):
+        university = text(row, 'university')
+        leagues = [name.strip() for name in text(row, 'leagues').split(';') if name.strip()]
+        return {
+            'name': text(row, 'name', required=True),
+            'sport_id': self.sports.get(text(row, 'sport', required=True)),
+            'university_id': self.universities.get(university) if university else None,
+            'league_ids': [self.leagues.get(name) for name in leagues],
+        }
+
+    def natural_key(self, values):
+        return values['university_id'], values['name']
+
+    def existing(self, keys):
+        names = {name for _, name in keys}
+        teams = Team.objects.filter(name__in=names).order_by('pk')
+        found = {}
+        for team in teams:
+            found.setdefault((team.university_id, team.name), team)
+        return found
+
+    def model_values(self, values):
+        # league_ids is applied to the membership table in after_write
+        return {field: value for field, value in values.items() if field != 'league_ids'}
+
+    def after_write(self, written):
+        Membership = Team.league.through
+        Membership.objects.bulk_create([
+            Membership(team_id=team.pk, league_id=league_id)
+            for team, values in written for league_id in values['league_ids']
+        ], ignore_conflicts=True)
+        self.touched_leagues.update(league_id for _, values in written for league_id in values['league_ids'])
+        versions.bump(versions.LISTINGS)
+
+    def finish(self):
+        super().finish()
+        rebuild_all_standings(League.objects.filter(pk__in=self.touched_leagues))
+
+
+class PlayerImporter(Importer):
+    """Columns: name, team, university (optional, narrows the team), dept, position,
+    jersey_number, date_of_birth, height_cm."""
+    model = Player
+    update_fields = ['name', 'dept', 'university', 'position', 'date_of_birth', 'height_cm']
+    foreign_keys = ['team', 'university']
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.teams = TeamLookup()
+        self.universities = NameLookup(University.objects.all(), 'university', ('name', 'short_name'))
+        self.team_universities = {}
+
+    def prefetch(self, rows):
+        self.teams.prefetch(text(row, 'team') for row in rows)
+        self.universities.prefetch(text(row, 'university') for row in rows)
+
+    def parse(self, row):
+        university = text(row, 'university')
+        university_id = self.universities.get(university) if university else None
+        team_id = self.teams.get(text(row, 'team', required=True), university_id=university_id)
+        if university_id is None:
+            university_id = self.teams.universities[team_id]
+
+        position = text(row, 'position').upper() or None
+        return {
+            'name': text(row, 'name', required=True),
+            'team_id': team_id,
+            'university_id': university_id,
+            'dept': text(row, 'dept'),
+            'position': position,
+            'jersey_number': integer(row, 'jersey_number'),
+            'date_of_birth': date_value(row, 'date_of_birth'),
+            'height_cm': integer(row, 'height_cm'),
+        }
+
+    def natural_key(self, values):
+        if values['jersey_number'] is None:
+            return values['team_id'], 'name', values['name']
+        return values['team_id'], 'jersey', values['jersey_number']
+
+    def existing(self, keys):
+        team_ids = {key[0] for key in keys}
+        numbers = {key[2] for key in keys if key[1] == 'jersey'}
+        names = {key[2] for key in keys if key[1] == 'name'}
+        found = {}
+        if numbers:
+            for player in Player.objects.filter(team_id__in=team_ids, jersey_number__in=numbers).order_by('pk'):
+                found.setdefault((player.team_id, 'jersey', player.jersey_number), player)
+        if names:
+            players = Player.objects.filter(team_id__in=team_ids, name__in=names, jersey_number__isnull=True)
+            for player in players.order_by('pk'):
+                found.setdefault((player.team_id, 'name', player.name), player)
+        return found
+
+    def after_write(self, written):
+        # renamed players print differently on the match sheets of their events
+        events = Event.objects.filter(player_name__in=[player.pk for player, _ in written])
+        versions.bump_all(versions.match_sheet(pk) for pk in events.values_list('match_id', flat=True))
+
+
+class FixtureImporter(Importer):
+    """Columns: league, home_team, away_team, start_time, and optionally home_score, away_score."""
+    model = Match
+    update_fields = ['start_time', 'home_score', 'away_score']
+    foreign_keys = ['league', 'home_team', 'away_team']
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.leagues = NameLookup(League.objects.all(), 'league')
+        self.teams = TeamLookup()
+        self.touched_leagues = set()
+
+    def prefetch(self, rows):
+        self.leagues.prefetch(text(row, 'league') for row in rows)
+        self.teams.prefetch(text(row, column) for row in rows for column in ('home_team', 'away_team'))
+
+    def parse(self, row):
+        league_id = self.leagues.get(text(row, 'league', required=True))
+        home_team_id = self.teams.get(text(row, 'home_team', required=True), league_id=league_id)
+        away_team_id = self.teams.get(text(row, 'away_team', required=True), league_id=league_id)
+        if home_team_id == away_team_id:
+            raise ValidationError("home_team and away_team must differ.")
+        return {
+            'league_id': league_id,
+            'home_team_id': home_team_id,
+            'away_team_id': away_team_id,
+            'start_time': datetime_value(row, 'start_time'),
+            'home_score': integer(row, 'home_score'),
+            'away_score': integer(row, 'away_score'),
+        }
+
+    def natural_key(self, values):
+        return values['league_id'], values['home_team_id'], values['away_team_id']
+
+    def existing(self, keys):
+        league_ids = {league_id for league_id, _, _ in keys}
+        home_ids = {home for _, home, _ in keys}
+        found = {}
+        for match in Match.objects.filter(league_id__in=league_ids, home_team_id__in=home_ids).order_by('pk'):
+            found.setdefault((match.league_id, match.home_team_id, match.away_team_id), match)
+        return found
+
+    def after_write(self, written):
+        self.touched_leagues.update(values['league_id'] for _, values in written)
+        versions.bump(versions.SCOREBOARD)
+        versions.bump_all(versions.match_sheet(match.pk) for match, _ in written)
+
+    def record_changes(self, creates, updates):
+        changes.record('created', [instance for instance, _ in creates])
+        changes.record('updated', [instance for instance, _ in updates])
+
+    def finish(self):
+        super().finish()
+        # bulk writes skip the signals that keep standings in step with results
+        rebuild_all_standings(League.objects.filter(pk__in=self.touched_leagues))
+
+
+IMPORTERS = {
+    'teams': TeamImporter,
+    'players': PlayerImporter,
+    'fixtures': FixtureImporter,
+}
+
+
+def import_file(kind, file, filename, sheet=None, batch_size=BATCH_SIZE, dry_run=False):
+    """Import ``file`` as ``kind`` ('teams', 'players' or 'fixtures') and return an :class:`ImportResult`."""
+    importer = IMPORTERS[kind](batch_size=batch_size, dry_run=dry_run)
+    return importer.run(read_rows(file, filename, sheet))
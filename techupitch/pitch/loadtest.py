@@ -0,0 +1,185 @@
+"""Load generator for the live score endpoints.
+
+Simulates open home pages polling ``ajax-matches`` (revalidating with the
+ETag, as browsers do) while a staff client PATCHes scores through the API,
+then reports throughput, latency percentiles, errors and, when ``/metrics``
+is reachable, the server-side query rates over the run.
+"""
+import asyncio
+import json
+import math
+import random
+import re
+import time
+
+import aiohttp
+
+METRIC_LINE = re.compile(r'^(\w+)\{view="((?:[^"\\]|\\.)*)"\} (\S+)$')
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of ``values`` (``fraction`` in 0..1), or None when empty."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(fraction * len(ordered)))
+    return ordered[rank - 1]
+
+
+def parse_metrics(text):
+    """Return ``{metric: {view: value}}`` for the per-view series of a /metrics page."""
+    series = {}
+    for line in text.splitlines():
+        found = METRIC_LINE.match(line)
+        if found:
+            name, view, value = found.groups()
+            series.setdefault(name, {})[view] = float(value)
+    return series
+
+
+def metrics_delta(before, after, seconds):
+    """Per-view requests, queries, queries per request and queries per second between two scrapes."""
+    rows = {}
+    requests = after.get('upitch_http_requests_total', {})
+    for view, total in requests.items():
+        served = total - before.get('upitch_http_requests_total', {}).get(view, 0)
+        if served <= 0:
+            continue
+        queries = (after.get('upitch_db_queries_total', {}).get(view, 0)
+                   - before.get('upitch_db_queries_total', {}).get(view, 0))
+        rows[view] = {
+            'requests': int(served),
+            'queries': int(queries),
+            'queries_per_request': round(queries / served, 2),
+            'queries_per_second': round(queries / seconds, 2) if seconds else None,
+        }
+    return rows
+
+
+class Recorder:
+    """Latencies and outcomes of one kind of request."""
+
+    def __init__(self):
+        self.latencies = []
+        self.statuses = {}
+        self.errors = 0
+
+    def add(self, seconds, status):
+        self.latencies.append(seconds)
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        if not isinstance(status, int) or status >= 400:
+            self.errors += 1
+
+    def summary(self, elapsed):
+        count = len(self.latencies)
+        as_ms = lambda value: round(value * 1000, 2) if value is not None else None
+        return {
+            'requests': count,
+            'throughput': round(count / elapsed, 2) if elapsed else None,
+            'p50_ms': as_ms(percentile(self.latencies, 0.50)),
+            'p95_ms': as_ms(percentile(self.latencies, 0.95)),
+            'p99_ms': as_ms(percentile(self.latencies, 0.99)),
+            'errors': self.errors,
+            'error_rate': round(self.errors / count, 4) if count else 0,
+            'statuses': {str(status): n for status, n in sorted(self.statuses.items(), key=str)},
+        }
+
+
+async def timed(session, recorder, method, url, **kwargs):
+    start = time.perf_counter()
+    try:
+        async with session.request(method, url, **kwargs) as response:
+            body = await response.read()
+            recorder.add(time.perf_counter() - start, response.status)
+            return response, body
+    except (aiohttp.ClientError, asyncio.TimeoutError) as error:
+        recorder.add(time.perf_counter() - start, type(error).__name__)
+        return None, None
+
+
+async def poller(session, base_url, recorder, interval, deadline):
+    """One open home page: poll every ``interval`` seconds, revalidating with the last ETag."""
+    await asyncio.sleep(random.uniform(0, interval))  # pages were not all opened at the same instant
+    etag = None
+    while time.monotonic() < deadline:
+        headers = {'If-None-Match': etag} if etag else {}
+        response, _ = await timed(session, recorder, 'GET', f'{base_url}/pitch/ajax/matches/', headers=headers)
+        if response is not None and response.status == 200:
+            etag = response.headers.get('ETag', etag)
+        await asyncio.sleep(interval)
+
+
+async def score_writer(session, base_url, recorder, interval, deadline, auth):
+    """A staff user bumping the score of live (or, failing that, any) matches."""
+    _, body = await timed(session, Recorder(), 'GET', f'{base_url}/pitch/ajax/matches/')
+    match_ids = [match['id'] for match in (_json(body) or {}).get('live_matches', [])]
+    if not match_ids:
+        _, body = await timed(session, Recorder(), 'GET', f'{base_url}/api/matches/?page_size=50', auth=auth)
+        match_ids = [match['id'] for match in (_json(body) or {}).get('results', [])]
+    if not match_ids:
+        return
+
+    goals = {}
+    while time.monotonic() < deadline:
+        match_id = random.choice(match_ids)
+        goals[match_id] = goals.get(match_id, 0) + 1
+        await timed(session, recorder, 'PATCH', f'{base_url}/api/matches/{match_id}/',
+                    json={'home_score': goals[match_id]}, auth=auth)
+        await asyncio.sleep(interval)
+
+
+def _json(body):
+    try:
+        return json.loads(body) if body else None
+    except ValueError:
+        return None
+
+
+async def scrape_metrics(session, base_url, token):
+    if not token:
+        return None
+    try:
+        async with session.get(f'{base_url}/metrics', headers={'Authorization': f'Bearer {token}'}) as response:
+            if response.status != 200:
+                return None
+            return parse_metrics(await response.text())
+    except aiohttp.ClientError:
+        return None
+
+
+async def run(base_url, pollers=200, duration=30, poll_interval=10, update_interval=2,
+              staff_user=None, staff_password=None, metrics_token=None, metrics_settle=0, timeout=10):
+    """Drive the server for ``duration`` seconds and return the report.
+
+    ``metrics_settle`` is how long to wait before the final /metrics scrape,
+    so every worker has flushed its counters for the run.
+    """
+    base_url = base_url.rstrip('/')
+    connector = aiohttp.TCPConnector(limit=0)
+    async with aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=timeout)) as session:
+        before = await scrape_metrics(session, base_url, metrics_token)
+
+        polls, updates = Recorder(), Recorder()
+        start = time.monotonic()
+        deadline = start + duration
+        tasks = [poller(session, base_url, polls, poll_interval, deadline) for _ in range(pollers)]
+        if staff_user:
+            auth = aiohttp.BasicAuth(staff_user, staff_password or '')
+            tasks.append(score_writer(session, base_url, updates, update_interval, deadline, auth))
+        await asyncio.gather(*tasks)
+        elapsed = time.monotonic() - start
+
+        if before is not None:
+            await asyncio.sleep(metrics_settle)
+        after = await scrape_metrics(session, base_url, metrics_token)
+
+    report = {
+        'base_url': base_url,
+        'pollers': pollers,
+        'duration': round(elapsed, 2),
+        'poll_interval': poll_interval,
+        'polls': polls.summary(elapsed),
+        'updates': updates.summary(elapsed) if staff_user else None,
+        'server': metrics_delta(before, after, elapsed) if before is not None and after is not None else None,
+    }
+    return report
@@ -0,0 +1,88 @@
+import json
+import platform
+import subprocess
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_databases, setup_test_environment, teardown_databases, teardown_test_environment
+from django.utils import timezone
+
+from pitch import benchmarks
+from pitch.seeding import scaled_sizes, seed
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = ("Time index, match_list, league_table_view, live_upcoming_matches and the API lists "
+            "at several dataset sizes and save the results as JSON.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='1000,10000,50000',
+                            help="Comma-separated match counts; each is seeded into a throwaway test database.")
+        parser.add_argument('--current', action='store_true',
+                            help="Benchmark the configured database as it is instead of seeding.")
+        parser.add_argument('--repeat', type=int, default=5, help="Warm requests per target.")
+        parser.add_argument('--only', action='append', help="Only time this target (may be repeated).")
+        parser.add_argument('--output', default='benchmark-results.json')
+        parser.add_argument('--compare', help="Earlier results file to print the change against.")
+
+    def handle(self, *args, **options):
+        try:
+            sizes = [int(size) for size in options['sizes'].split(',') if size.strip()]
+        except ValueError:
+            raise CommandError("--sizes must be a comma-separated list of integers.")
+        if options['repeat'] < 1:
+            raise CommandError("--repeat must be at least 1.")
+
+        report = {
+            'commit': git_commit(),
+            'created': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'repeat': options['repeat'],
+            'runs': [],
+        }
+
+        setup_test_environment()  # lets the test client through ALLOWED_HOSTS
+        try:
+            if options['current']:
+                report['runs'].append(self.benchmark(options))
+            for size in [] if options['current'] else sizes:
+                old_config = setup_databases(verbosity=0, interactive=False)
+                try:
+                    self.stdout.write(f"Seeding {size} matches...")
+                    seed(**scaled_sizes(size))
+                    report['runs'].append(self.benchmark(options))
+                finally:
+                    teardown_databases(old_config, verbosity=0)
+        finally:
+            teardown_test_environment()
+
+        with open(options['output'], 'w') as handle:
+            json.dump(report, handle, indent=2)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {options['output']}."))
+
+        if options['compare']:
+            with open(options['compare']) as handle:
+                previous = json.load(handle)
+            for matches, name, before, after in benchmarks.compare(previous, report):
+                self.stdout.write(f"{matches:>8} {name:<24} {before:>9.1f}ms -> {after:>9.1f}ms "
+                                  f"({(after - before) / before * 100 if before else 0:+.0f}%)")
+
+    def benchmark(self, options):
+        dataset = benchmarks.dataset_size()
+        results = benchmarks.run(options['repeat'], options['only'])
+        self.stdout.write(f"{dataset['matches']} matches:")
+        for name, result in results.items():
+            self.stdout.write(f"  {name:<24} {result['median_ms']:>9.1f}ms  {result['queries']:>4} queries"
+                              f"  (first {result['first_ms']:.1f}ms, HTTP {result['status']})")
+        return {'dataset': dataset, 'results': results}
@@ -0,0 +1,58 @@
+from concurrent.futures import FIRST_COMPLETED, wait
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from pitch import images
+
+# Images scheduled per pool worker at a time; each holds its source bytes
+# until it is built, so the backfill never reads the whole library at once.
+IN_FLIGHT_PER_WORKER = 2
+
+
+class Command(BaseCommand):
+    help = "Build resized WebP/JPEG/PNG derivatives for logos and player photos that lack current ones."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--model', action='append', choices=sorted(images.IMAGE_FIELDS),
+                            help="Only this model (repeatable). Defaults to all of them.")
+        parser.add_argument('--force', action='store_true', help="Rebuild even when the derivatives are current.")
+
+    def handle(self, *args, **options):
+        self.built = self.failed = 0
+        limit = max(1, settings.IMAGE_WORKERS * IN_FLIGHT_PER_WORKER)
+        for model_name in options['model'] or sorted(images.IMAGE_FIELDS):
+            model = apps.get_model('pitch', model_name)
+            field_name = images.IMAGE_FIELDS[model_name]
+            queryset = model._default_manager.exclude(**{field_name: ''}).exclude(**{f'{field_name}__isnull': True})
+
+            pending = {}
+            for instance in queryset.only('pk', field_name, images.derivatives_attname(field_name)).iterator():
+                fieldfile = getattr(instance, field_name)
+                if not options['force'] and images.is_current(fieldfile):
+                    continue
+                try:
+                    pending[images.schedule(instance, field_name)] = (instance, fieldfile.name)
+                except OSError as error:
+                    self.report_failure(model_name, instance.pk, fieldfile.name, error)
+                if len(pending) >= limit:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    self.collect(model_name, pending, done)
+            self.collect(model_name, pending, list(pending))
+
+        self.stdout.write(self.style.SUCCESS(f"Built derivatives for {self.built} images ({self.failed} failed)."))
+
+    def collect(self, model_name, pending, futures):
+        """Count the finished ``futures`` (each already stored its files) and drop them from ``pending``."""
+        for future in futures:
+            instance, name = pending.pop(future)
+            try:
+                future.result()
+                self.built += 1
+            except Exception as error:
+                self.report_failure(model_name, instance.pk, name, error)
+
+    def report_failure(self, model_name, pk, name, error):
+        self.failed += 1
+        self.stderr.write(f"{model_name} {pk}: {name}: {error}")
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from pitch.query_plans import analyze, check_query_plans
+
+
+class Command(BaseCommand):
+    help = "EXPLAIN the hot match/event queries and fail if any falls back to a sequential scan."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--no-analyze', action='store_true',
+                            help="Skip refreshing planner statistics first.")
+        parser.add_argument('--verbose-plans', action='store_true',
+                            help="Print every plan, not just the failing ones.")
+
+    def handle(self, *args, **options):
+        if not options['no_analyze']:
+            analyze()
+
+        failures = []
+        for name, (plan, scanned) in check_query_plans().items():
+            if scanned:
+                failures.append(name)
+                self.stdout.write(self.style.ERROR(f"{name}: sequential scan on {', '.join(scanned)}"))
+            else:
+                self.stdout.write(f"{name}: ok")
+            if scanned or options['verbose_plans']:
+                self.stdout.write(f"    {plan}".replace('\n', '\n    '))
+
+        if failures:
+            raise CommandError(f"{len(failures)} hot queries use sequential scans.")
+        self.stdout.write(self.style.SUCCESS("All hot queries use indexes."))
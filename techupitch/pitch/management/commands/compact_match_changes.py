@@ -0,0 +1,20 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from pitch import changes
+
+
+class Command(BaseCommand):
+    help = ("Delete change feed entries older than the retention period. "
+            "Clients polling from before the deleted entries are told to resync.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.CHANGE_LOG_RETENTION_DAYS,
+                            help="Keep this many days of changes (default: CHANGE_LOG_RETENTION_DAYS).")
+
+    def handle(self, *args, **options):
+        deleted = changes.compact(timezone.now() - timedelta(days=options['days']))
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} change feed entries."))
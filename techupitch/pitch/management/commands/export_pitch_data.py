@@ -0,0 +1,48 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from pitch import exports
+from pitch.models import League, University
+
+
+class Command(BaseCommand):
+    help = "Export matches, events or players as CSV or XLSX, reading the database in chunks."
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(exports.EXPORTS))
+        parser.add_argument('--format', choices=['csv', 'xlsx'],
+                            help="Defaults to the --output extension, else csv.")
+        parser.add_argument('--output', help="File to write; CSV goes to stdout when omitted.")
+        parser.add_argument('--league', type=int, help="League id.")
+        parser.add_argument('--university', type=int, help="University id.")
+        parser.add_argument('--from', dest='date_from', help="First date (YYYY-MM-DD), inclusive.")
+        parser.add_argument('--to', dest='date_to', help="Last date (YYYY-MM-DD), inclusive.")
+
+    def handle(self, *args, **options):
+        output = options['output']
+        fmt = options['format'] or ('xlsx' if output and output.lower().endswith('.xlsx') else 'csv')
+        if fmt == 'xlsx' and not output:
+            raise CommandError("XLSX exports need --output.")
+
+        try:
+            league = League.objects.get(pk=options['league']) if options['league'] else None
+            university = University.objects.get(pk=options['university']) if options['university'] else None
+            date_from = date.fromisoformat(options['date_from']) if options['date_from'] else None
+            date_to = date.fromisoformat(options['date_to']) if options['date_to'] else None
+        except (League.DoesNotExist, University.DoesNotExist, ValueError) as error:
+            raise CommandError(str(error))
+
+        queryset = exports.export_queryset(options['kind'], league=league, university=university,
+                                           date_from=date_from, date_to=date_to)
+        if fmt == 'xlsx':
+            with open(output, 'wb') as handle:
+                exports.write_xlsx(options['kind'], queryset, handle)
+        elif output:
+            with open(output, 'w', newline='', encoding='utf-8') as handle:
+                exports.write_csv(options['kind'], queryset, handle)
+        else:
+            exports.write_csv(options['kind'], queryset, self.stdout)
+
+        if output:
+            self.stdout.write(self.style.SUCCESS(f"Wrote {output}."))
@@ -0,0 +1,41 @@
+from datetime import date, time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from pitch.models import League
+from pitch.scheduling import WEEKDAYS, create_fixtures, schedule
+
+
+class Command(BaseCommand):
+    help = "Preview (default) or create a round-robin season of matches for a league."
+
+    def add_arguments(self, parser):
+        parser.add_argument('league', type=int, help="League id; every team in the league takes part.")
+        parser.add_argument('--start', required=True, help="First possible match date (YYYY-MM-DD).")
+        parser.add_argument('--days', default='sat', help="Comma-separated match days, e.g. sat,sun.")
+        parser.add_argument('--slots', default='15:00', help="Comma-separated kickoff times, e.g. 15:00,17:30.")
+        parser.add_argument('--single', action='store_true', help="Play each pair once instead of home and away.")
+        parser.add_argument('--commit', action='store_true', help="Create the matches instead of printing them.")
+
+    def handle(self, *args, **options):
+        try:
+            league = League.objects.get(pk=options['league'])
+        except League.DoesNotExist:
+            raise CommandError(f"League {options['league']} does not exist.")
+        try:
+            start = date.fromisoformat(options['start'])
+            days = [WEEKDAYS.index(day.strip().lower()[:3]) for day in options['days'].split(',')]
+            slots = [time.fromisoformat(slot.strip()) for slot in options['slots'].split(',')]
+            fixtures = schedule(league.teams.order_by('name'), start, days, slots, double=not options['single'])
+        except ValueError as error:
+            raise CommandError(str(error))
+
+        if not options['commit']:
+            for fixture in fixtures:
+                self.stdout.write(f"R{fixture.round:<3} {fixture.start_time:%a %Y-%m-%d %H:%M}  "
+                                  f"{fixture.home_team} vs {fixture.away_team}")
+            self.stdout.write(f"{len(fixtures)} matches; run again with --commit to create them.")
+            return
+
+        matches = create_fixtures(league, fixtures)
+        self.stdout.write(self.style.SUCCESS(f"Created {len(matches)} matches for {league.name}."))
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from pitch.importers import BATCH_SIZE, IMPORTERS, import_file
+
+
+class Command(BaseCommand):
+    help = "Import teams, players or fixtures from an XLSX or CSV file, updating rows that already exist."
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(IMPORTERS))
+        parser.add_argument('path', help="An .xlsx or .csv file with a header row.")
+        parser.add_argument('--sheet', help="Worksheet name (XLSX only; defaults to the first).")
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument('--dry-run', action='store_true', help="Validate every row without saving.")
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['path'], 'rb') as handle:
+                result = import_file(options['kind'], handle, options['path'], sheet=options['sheet'],
+                                     batch_size=options['batch_size'], dry_run=options['dry_run'])
+        except (OSError, KeyError, ValueError) as error:
+            raise CommandError(f"Could not read {options['path']}: {error}")
+
+        for number, message in result.errors:
+            self.stderr.write(f"row {number}: {message}")
+        if result.error_count > len(result.errors):
+            self.stderr.write(f"... and {result.error_count - len(result.errors)} more errors")
+
+        verb = "Checked" if options['dry_run'] else "Imported"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {result.rows} rows: {result.created} new, {result.updated} updated, "
+            f"{result.error_count} with errors."
+        ))
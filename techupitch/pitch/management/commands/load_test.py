@@ -0,0 +1,103 @@
+import asyncio
+import json
+import os
+import secrets
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from pitch import loadtest
+
+
+class Command(BaseCommand):
+    help = ("Simulate many home pages polling ajax-matches plus a staff client posting scores, "
+            "and report throughput, latency percentiles, errors and server query rates.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000', help="Server to load.")
+        parser.add_argument('--serve', action='store_true',
+                            help="Start gunicorn (as in the Procfile) on --url's port for the run.")
+        parser.add_argument('--workers', type=int, default=2, help="gunicorn workers with --serve.")
+        parser.add_argument('--pollers', type=int, default=200, help="Concurrent open home pages.")
+        parser.add_argument('--duration', type=float, default=30, help="Seconds to run.")
+        parser.add_argument('--poll-interval', type=float, default=10,
+                            help="Seconds between polls per page (index.html polls every 10).")
+        parser.add_argument('--update-interval', type=float, default=2,
+                            help="Seconds between staff score updates.")
+        parser.add_argument('--staff-user', help="Staff username for the score updates (basic auth).")
+        parser.add_argument('--staff-password', default=os.environ.get('LOADTEST_STAFF_PASSWORD'),
+                            help="Defaults to $LOADTEST_STAFF_PASSWORD.")
+        parser.add_argument('--metrics-token', default=settings.METRICS_TOKEN,
+                            help="Bearer token for /metrics; defaults to METRICS_TOKEN.")
+        parser.add_argument('--output', help="Also write the report to this JSON file.")
+
+    def handle(self, *args, **options):
+        server = None
+        if options['serve']:
+            if not options['metrics_token']:
+                options['metrics_token'] = secrets.token_urlsafe(16)
+            server = self.start_server(options)
+        try:
+            report = asyncio.run(loadtest.run(
+                options['url'], pollers=options['pollers'], duration=options['duration'],
+                poll_interval=options['poll_interval'], update_interval=options['update_interval'],
+                staff_user=options['staff_user'], staff_password=options['staff_password'],
+                metrics_token=options['metrics_token'], metrics_settle=settings.METRICS_FLUSH_INTERVAL + 1,
+            ))
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait(timeout=30)
+        if server is not None:
+            report['workers'] = options['workers']
+
+        self.print_report(report)
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                json.dump(report, handle, indent=2)
+
+    def start_server(self, options):
+        bind = options['url'].split('://', 1)[-1].rstrip('/')
+        env = dict(os.environ, METRICS_TOKEN=options['metrics_token'],
+                   METRICS_DIR=tempfile.mkdtemp(prefix='upitch-loadtest-'))
+        server = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', 'techupitch.asgi:application', '-k', 'uvicorn_worker.UvicornWorker',
+             '--workers', str(options['workers']), '--bind', bind],
+            cwd=settings.BASE_DIR, env=env,
+        )
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise CommandError("gunicorn exited before accepting connections.")
+            try:
+                urllib.request.urlopen(f"{options['url'].rstrip('/')}/pitch/ajax/matches/", timeout=1)
+                return server
+            except OSError:
+                time.sleep(0.25)
+        server.terminate()
+        raise CommandError("gunicorn did not start within 30 seconds.")
+
+    def print_report(self, report):
+        self.stdout.write(f"{report['pollers']} pollers for {report['duration']}s against {report['base_url']}"
+                          + (f" ({report['workers']} workers)" if 'workers' in report else ''))
+        for kind in ('polls', 'updates'):
+            result = report[kind]
+            if result is None:
+                continue
+            self.stdout.write(
+                f"  {kind:<8} {result['requests']:>7} requests  {result['throughput']:>8} req/s  "
+                f"p50 {result['p50_ms']}ms  p95 {result['p95_ms']}ms  p99 {result['p99_ms']}ms  "
+                f"errors {result['errors']} ({result['error_rate']:.2%})  statuses {result['statuses']}"
+            )
+        if report['server']:
+            self.stdout.write("  server (from /metrics):")
+            for view, row in sorted(report['server'].items()):
+                self.stdout.write(f"    {view:<28} {row['requests']:>7} requests  {row['queries']:>8} queries  "
+                                  f"{row['queries_per_request']} q/req  {row['queries_per_second']} q/s")
+        else:
+            self.stdout.write("  server query rates unavailable (no /metrics access).")
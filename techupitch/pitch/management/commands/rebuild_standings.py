@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from pitch.models import League
+from pitch.standings import rebuild_all_standings
+
+
+class Command(BaseCommand):
+    help = "Recompute the persisted league standings from match results to repair drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--league', type=int, action='append', dest='leagues',
+                            help="Only rebuild this league id (may be repeated).")
+
+    def handle(self, *args, **options):
+        leagues = League.objects.all()
+        if options['leagues']:
+            leagues = leagues.filter(pk__in=options['leagues'])
+
+        rows = rebuild_all_standings(leagues)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rows} standing rows."))
@@ -0,0 +1,50 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils import timezone
+
+from pitch.models import Match
+
+
+class Command(BaseCommand):
+    help = (
+        "Keep match statuses current: sleep until the next kickoff or full-time "
+        "boundary, then apply scheduled->live->finished transitions in one batch."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true',
+                            help="Apply due transitions once and exit (for cron).")
+        parser.add_argument('--max-sleep', type=float, default=60.0,
+                            help="Upper bound in seconds between checks, so newly created "
+                                 "or rescheduled matches are noticed (default: 60).")
+
+    def handle(self, *args, **options):
+        if options['once']:
+            self.tick()
+            return
+
+        self.stdout.write("Match clock running. Press Ctrl+C to stop.")
+        try:
+            while True:
+                next_boundary = self.tick()
+                time.sleep(self.sleep_seconds(next_boundary, options['max_sleep']))
+        except KeyboardInterrupt:
+            self.stdout.write("Match clock stopped.")
+
+    def tick(self):
+        close_old_connections()
+        now = timezone.now()
+        started, finished = Match.objects.update_statuses(now)
+        if started or finished:
+            self.stdout.write(f"{now:%Y-%m-%d %H:%M:%S} started {started}, finished {finished}")
+        return Match.objects.next_transition(timezone.now())
+
+    @staticmethod
+    def sleep_seconds(next_boundary, max_sleep):
+        if next_boundary is None:
+            return max_sleep
+        # wake just after the boundary so the `start_time <= now` windows include it
+        wait = (next_boundary - timezone.now()).total_seconds() + 0.5
+        return min(max(wait, 0.5), max_sleep)
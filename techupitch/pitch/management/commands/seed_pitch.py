@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from pitch.models import University
+from pitch.seeding import scaled_sizes, seed
+
+
+class Command(BaseCommand):
+    help = "Generate synthetic universities, leagues, teams, players, matches and events."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--matches', type=int, default=1000)
+        parser.add_argument('--universities', type=int,
+                            help="Defaults to one per 4000 matches (50 for 200k).")
+        parser.add_argument('--leagues-per-university', type=int)
+        parser.add_argument('--teams-per-league', type=int)
+        parser.add_argument('--players-per-team', type=int)
+        parser.add_argument('--events-per-match', type=int)
+        parser.add_argument('--prefix', default='Seed',
+                            help="Name prefix, so several runs can share one database.")
+        parser.add_argument('--seed', type=int, default=0, help="Random seed.")
+
+    def handle(self, *args, **options):
+        sizes = scaled_sizes(options['matches'])
+        for name in sizes:
+            if options.get(name) is not None:
+                sizes[name] = options[name]
+
+        if University.objects.filter(name__startswith=f"{options['prefix']} University ").exists():
+            raise CommandError(f"Data with prefix {options['prefix']!r} already exists; pass another --prefix.")
+
+        counts = seed(prefix=options['prefix'], random_seed=options['seed'], **sizes)
+        summary = ', '.join(f'{count} {name}' for name, count in counts.items())
+        self.stdout.write(self.style.SUCCESS(f"Created {summary}."))
@@ -0,0 +1,38 @@
+from pathlib import Path
+
+from django.apps import apps
+from django.contrib.staticfiles import finders
+from django.core.management.base import BaseCommand, CommandError
+
+from pitch import assets
+
+
+class Command(BaseCommand):
+    help = "Rebuild the trimmed Bootstrap CSS from the classes the templates use."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true',
+                            help="Fail if the committed trimmed CSS is out of date instead of writing it.")
+
+    def handle(self, *args, **options):
+        source = finders.find(assets.BOOTSTRAP_CSS)
+        if not source:
+            raise CommandError(f"{assets.BOOTSTRAP_CSS} not found by the static finders.")
+        app_root = Path(apps.get_app_config('pitch').path)
+        words = assets.used_words(assets.markup_sources(app_root))
+
+        original = Path(source).read_text(encoding='utf-8')
+        trimmed = assets.trim_css(original, words) + '\n'
+        target = app_root / 'static' / assets.TRIMMED_CSS
+
+        if options['check']:
+            if not target.exists() or target.read_text(encoding='utf-8') != trimmed:
+                raise CommandError(f"{target} is out of date; run manage.py trim_bootstrap_css.")
+            self.stdout.write("Trimmed CSS is up to date.")
+            return
+
+        target.write_text(trimmed, encoding='utf-8')
+        before, after = len(original.encode()), len(trimmed.encode())
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {target}: {after:,} bytes, down from {before:,} ({100 - 100 * after / before:.0f}% smaller)."
+        ))
@@ -0,0 +1,122 @@
+"""Serve uploaded media from MEDIA_ROOT, in the spirit of whitenoise.
+
+Responses carry an ETag and Last-Modified, answer conditional requests with
+304 and single ``Range`` requests with 206. Files whose names are content
+hashed (see :mod:`pitch.storage`) are sent with ``Cache-Control: immutable``,
+so browsers never ask for them again; anything else must be revalidated.
+Bodies go through :mod:`pitch.streaming`, so ASGI reads them a block at a time.
+"""
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import default_storage
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_safe
+
+from .streaming import file_chunks, stream, stream_file
+
+RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def cache_control(name):
+    is_hashed = getattr(default_storage, 'is_content_hashed', None)
+    if is_hashed is not None and is_hashed(name):
+        return f'public, max-age={settings.MEDIA_CACHE_MAX_AGE}, immutable'
+    return 'public, max-age=0, must-revalidate'
+
+
+def byte_range(header, size):
+    """Parse a single ``Range`` header into ``(start, end)`` inclusive.
+
+    Returns None to serve the whole file (no header, or several ranges) and
+    raises ValueError when the range can't be satisfied.
+    """
+    match = RANGE.match(header.strip()) if header else None
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:  # suffix: the last N bytes
+        length = int(last)
+        if length == 0:
+            raise ValueError(header)
+        return max(0, size - length), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or end < start:
+        raise ValueError(header)
+    return start, end
+
+
+def if_range_matches(request, etag, last_modified):
+    """A Range only applies while the If-Range validator (if any) still matches."""
+    validator = request.headers.get('If-Range')
+    if not validator:
+        return True
+    if validator.startswith(('"', 'W/')):
+        return validator == etag
+    return parse_http_date_safe(validator) == last_modified
+
+
+@require_safe
+def serve_media(request, path):
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+    except (SuspiciousFileOperation, ValueError):
+        raise Http404("No such file.")
+    try:
+        stat = os.stat(full_path)
+    except (FileNotFoundError, NotADirectoryError):
+        raise Http404("No such file.")
+    if not os.path.isfile(full_path):
+        raise Http404("No such file.")
+
+    size, last_modified = stat.st_size, int(stat.st_mtime)
+    etag = f'"{last_modified:x}-{size:x}"'
+    headers = {
+        'ETag': etag,
+        'Last-Modified': http_date(last_modified),
+        'Cache-Control': cache_control(path),
+        'Accept-Ranges': 'bytes',
+    }
+
+    not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if not_modified is not None:
+        for header, value in headers.items():
+            not_modified.headers.setdefault(header, value)
+        return not_modified
+
+    content_type, encoding = mimetypes.guess_type(full_path)
+    content_type = content_type or 'application/octet-stream'
+
+    try:
+        span = byte_range(request.headers.get('Range'), size) if if_range_matches(request, etag, last_modified) else None
+    except ValueError:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    if request.method == 'HEAD':
+        response = HttpResponse(content_type=content_type)
+        response['Content-Length'] = str(size)
+    elif span is None:
+        file = open(full_path, 'rb')
+        response = stream_file(request, FileResponse(file, content_type=content_type), file)
+    else:
+        start, end = span
+        chunks = file_chunks(open(full_path, 'rb'), start, end - start + 1)
+        response = StreamingHttpResponse(stream(request, chunks), content_type=content_type, status=206)
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = str(end - start + 1)
+    if encoding:
+        response['Content-Encoding'] = encoding
+    for header, value in headers.items():
+        response[header] = value
+    return response
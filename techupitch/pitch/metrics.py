@@ -0,0 +1,237 @@
+"""Per-view request and SQL metrics, exported in Prometheus text format.
+
+Each process keeps its counters in memory. When ``METRICS_DIR`` is set, the
+counters are also written to ``<METRICS_DIR>/metrics-<pid>.json`` at most every
+``METRICS_FLUSH_INTERVAL`` seconds, and the ``/metrics`` endpoint sums the files
+of every worker so gunicorn workers report as one.
+
+The sum covers live workers only: ``collect`` deletes the file of any pid
+that is no longer running, so when gunicorn recycles a worker its counts
+leave the totals and the counters go down. Prometheus treats that as a
+counter reset, which ``rate()`` and ``increase()`` already handle. Because
+liveness is checked by pid, ``METRICS_DIR`` must belong to the workers of
+one host.
+"""
+import json
+import os
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection
+
+# Request latency histogram bucket bounds, in seconds.
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class Registry:
+    """Counters for one process, keyed by URL name."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.views = {}
+        self.last_flush = 0.0
+        self.dirty = False
+        self.flusher = None
+
+    def record(self, view, seconds, queries, sql_seconds):
+        with self.lock:
+            stats = self.views.get(view)
+            if stats is None:
+                stats = self.views[view] = {
+                    'requests': 0, 'seconds': 0.0, 'buckets': [0] * len(BUCKETS),
+                    'queries': 0, 'sql_seconds': 0.0,
+                }
+            stats['requests'] += 1
+            stats['seconds'] += seconds
+            stats['queries'] += queries
+            stats['sql_seconds'] += sql_seconds
+            for index, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    stats['buckets'][index] += 1
+                    break
+            self.dirty = True
+        self.maybe_flush()
+
+    def snapshot(self):
+        with self.lock:
+            return json.loads(json.dumps(self.views))
+
+    def maybe_flush(self, force=False):
+        """Write this process's counters to ``METRICS_DIR`` if the interval has passed.
+
+        Request threads and the idle flusher all call this, so the check and the
+        write happen under the lock, each write goes to its own temporary file,
+        and a failed write is skipped rather than failing the request.
+        """
+        directory = settings.METRICS_DIR
+        if not directory:
+            return
+        with self.lock:
+            now = time.monotonic()
+            if not force and now - self.last_flush < settings.METRICS_FLUSH_INTERVAL:
+                return
+            self.last_flush = now
+            self.dirty = False
+            if self.flusher is None:
+                # flushes the tail of a burst once the worker goes idle
+                self.flusher = threading.Thread(target=self.flush_idle, daemon=True)
+                self.flusher.start()
+
+            path = os.path.join(directory, f'metrics-{os.getpid()}.json')
+            try:
+                os.makedirs(directory, exist_ok=True)
+                fd, temp = tempfile.mkstemp(dir=directory, prefix='.metrics-', suffix='.tmp')
+                try:
+                    with os.fdopen(fd, 'w') as handle:
+                        json.dump(self.views, handle)
+                    os.replace(temp, path)
+                except BaseException:
+                    os.unlink(temp)
+                    raise
+            except OSError:
+                self.dirty = True  # try again on the next flush
+
+    def flush_idle(self):
+        while True:
+            time.sleep(settings.METRICS_FLUSH_INTERVAL)
+            if self.dirty:
+                self.maybe_flush(force=True)
+
+
+registry = Registry()
+
+
+def merge(into, views):
+    for view, stats in views.items():
+        total = into.setdefault(view, {
+            'requests': 0, 'seconds': 0.0, 'buckets': [0] * len(BUCKETS),
+            'queries': 0, 'sql_seconds': 0.0,
+        })
+        for key in ('requests', 'seconds', 'queries', 'sql_seconds'):
+            total[key] += stats[key]
+        total['buckets'] = [a + b for a, b in zip(total['buckets'], stats['buckets'])]
+
+
+def pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # running, as another user
+    return True
+
+
+def collect():
+    """Return the counters of every live worker (or just this process without METRICS_DIR)."""
+    directory = settings.METRICS_DIR
+    if not directory:
+        return registry.snapshot()
+
+    registry.maybe_flush(force=True)
+    views = {}
+    for name in os.listdir(directory):
+        pid = name[len('metrics-'):-len('.json')]
+        if not (name.startswith('metrics-') and name.endswith('.json') and pid.isdigit()):
+            continue
+        if not pid_alive(int(pid)):
+            # the worker exited (gunicorn recycles them); its counts go with it
+            try:
+                os.unlink(os.path.join(directory, name))
+            except OSError:
+                pass
+            continue
+        try:
+            with open(os.path.join(directory, name)) as handle:
+                merge(views, json.load(handle))
+        except (OSError, ValueError):
+            continue  # a worker is mid-write or the file vanished
+    return views
+
+
+def label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def render(views, extra=()):
+    """Format counters as Prometheus text exposition."""
+    lines = [
+        '# HELP upitch_http_requests_total Requests served, by URL name.',
+        '# TYPE upitch_http_requests_total counter',
+    ]
+    for view, stats in sorted(views.items()):
+        lines.append(f'upitch_http_requests_total{{view="{label(view)}"}} {stats["requests"]}')
+
+    lines += [
+        '# HELP upitch_http_request_duration_seconds Request latency, by URL name.',
+        '# TYPE upitch_http_request_duration_seconds histogram',
+    ]
+    for view, stats in sorted(views.items()):
+        cumulative = 0
+        for bound, count in zip(BUCKETS, stats['buckets']):
+            cumulative += count
+            lines.append(f'upitch_http_request_duration_seconds_bucket{{view="{label(view)}",le="{bound}"}} {cumulative}')
+        lines.append(f'upitch_http_request_duration_seconds_bucket{{view="{label(view)}",le="+Inf"}} {stats["requests"]}')
+        lines.append(f'upitch_http_request_duration_seconds_sum{{view="{label(view)}"}} {stats["seconds"]:.6f}')
+        lines.append(f'upitch_http_request_duration_seconds_count{{view="{label(view)}"}} {stats["requests"]}')
+
+    lines += [
+        '# HELP upitch_db_queries_total SQL queries run while serving requests, by URL name.',
+        '# TYPE upitch_db_queries_total counter',
+    ]
+    for view, stats in sorted(views.items()):
+        lines.append(f'upitch_db_queries_total{{view="{label(view)}"}} {stats["queries"]}')
+
+    lines += [
+        '# HELP upitch_db_query_seconds_total Time spent in SQL while serving requests, by URL name.',
+        '# TYPE upitch_db_query_seconds_total counter',
+    ]
+    for view, stats in sorted(views.items()):
+        lines.append(f'upitch_db_query_seconds_total{{view="{label(view)}"}} {stats["sql_seconds"]:.6f}')
+
+    lines.extend(extra)
+    return '\n'.join(lines) + '\n'
+
+
+class QueryTimer:
+    """``connection.execute_wrapper`` hook counting queries and their time."""
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - start
+            self.queries += 1
+
+
+def view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return '<unresolved>'
+    return match.view_name or match.route or '<unnamed>'
+
+
+class MetricsMiddleware:
+    """Record request count, latency, SQL query count and SQL time per URL name.
+
+    Deliberately sync-only: under ASGI Django runs it in the same thread as
+    the sync views, so ``execute_wrapper`` sees their queries.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timer = QueryTimer()
+        start = time.perf_counter()
+        with connection.execute_wrapper(timer):
+            response = self.get_response(request)
+        registry.record(view_name(request), time.perf_counter() - start, timer.queries, timer.seconds)
+        return response
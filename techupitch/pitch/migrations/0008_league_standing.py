@@ -0,0 +1,68 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:24
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def populate_standings(apps, schema_editor):
+    League = apps.get_model('pitch', 'League')
+    Match = apps.get_model('pitch', 'Match')
+    LeagueStanding = apps.get_model('pitch', 'LeagueStanding')
+
+    standings = []
+    for league in League.objects.all():
+        rows = {team.pk: LeagueStanding(league=league, team=team) for team in league.teams.all()}
+        results = Match.objects.filter(
+            league=league, status='finished', home_score__isnull=False, away_score__isnull=False,
+        ).values_list('home_team_id', 'away_team_id', 'home_score', 'away_score')
+        for home_id, away_id, home_score, away_score in results:
+            for team_id, scored, conceded in ((home_id, home_score, away_score), (away_id, away_score, home_score)):
+                row = rows.get(team_id)
+                if row is None:
+                    continue
+                row.played += 1
+                row.goals_for += scored
+                row.goals_against += conceded
+                row.goal_difference += scored - conceded
+                if scored > conceded:
+                    row.wins += 1
+                    row.points += 3
+                elif scored == conceded:
+                    row.draws += 1
+                    row.points += 1
+                else:
+                    row.losses += 1
+        standings.extend(rows.values())
+    LeagueStanding.objects.bulk_create(standings)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pitch', '0007_alter_match_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeagueStanding',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('played', models.IntegerField(default=0)),
+                ('wins', models.IntegerField(default=0)),
+                ('draws', models.IntegerField(default=0)),
+                ('losses', models.IntegerField(default=0)),
+                ('goals_for', models.IntegerField(default=0)),
+                ('goals_against', models.IntegerField(default=0)),
+                ('goal_difference', models.IntegerField(default=0)),
+                ('points', models.IntegerField(default=0)),
+                ('league', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='standings', to='pitch.league')),
+                ('team', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='standings', to='pitch.team')),
+            ],
+            options={
+                'ordering': ['league', '-points', '-goal_difference', '-goals_for', 'team'],
+                'indexes': [models.Index(fields=['league', '-points', '-goal_difference', '-goals_for', 'team'], name='league_standing_table_idx')],
+                'constraints': [models.UniqueConstraint(fields=('league', 'team'), name='league_standing_unique_team')],
+            },
+        ),
+        migrations.RunPython(populate_standings, migrations.RunPython.noop),
+    ]
@@ -55,6 +55,7 @@ class University(models.Model):
     city = models.CharField(max_length=64, blank=True)
     state = models.CharField(max_length=64, blank=True)
     logo = models.ImageField(upload_to="universities/logos/", blank=True)
+    logo_derivatives = models.JSONField(default=dict, blank=True, editable=False)  # see pitch/images.py
 
     # Optional: add social handles or website
     website = models.URLField(blank=True)
@@ -83,6 +84,7 @@ class League(models.Model):
     )
     
     logo = models.ImageField(upload_to='league_logos/', blank=True, null=True) # Optional, league logo.
+    logo_derivatives = models.JSONField(default=dict, blank=True, editable=False)  # see pitch/images.py
     abbreviation = models.CharField(max_length=10, blank=True, null=True) # Optional, short name or abbreviation.
 
     def __str__(self):
@@ -98,11 +100,22 @@ class Team(models.Model):
     name = models.CharField(max_length=200)
     sport = models.ForeignKey(Sport, on_delete=models.CASCADE)
     logo = models.ImageField(upload_to='team_logos/', blank=True, null=True)
+    logo_derivatives = models.JSONField(default=dict, blank=True, editable=False)  # see pitch/images.py
 
     league = models.ManyToManyField(League, related_name="teams", blank=True)
 
     
     university = models.ForeignKey(University, on_delete=models.CASCADE, blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)  # part of the team_list row cache key
+
+    class Meta:
+        indexes = [
+            # team list: all teams, or one sport's/university's, by name
+            models.Index(fields=['name', 'id'], name='team_name_idx'),
+            models.Index(fields=['sport', 'name'], name='team_sport_name_idx'),
+            models.Index(fields=['university', 'name'], name='team_university_name_idx'),
+        ]
+
     def league_names(self):
         return ",".join(self.league.values_list("name", flat=True))
 
@@ -113,11 +126,72 @@ class Team(models.Model):
         """Returns the url to access a particular team."""
         return reverse('team-detail', args=[str(self.id)])
 
-from django.db import models
+from django.db import models, transaction
 from django.urls import reverse
 from django.utils import timezone
 from datetime import timedelta
 
+MATCH_DURATION = timedelta(minutes=90)
+
+
+class MatchQuerySet(models.QuerySet):
+    def update_statuses(self, now=None):
+        """Move matches along scheduled → live → finished with two set-based UPDATEs.
+
+        Only rows whose ``start_time`` falls in a transition window are touched,
+        so the cost follows the number of matches changing state, not the
+        size of the match history. Postponed matches are never touched.
+        Returns ``(started, finished)`` row counts.
+        """
+        from .changes import record
+        from .signals import match_statuses_changed
+        from .standings import apply_result
+        from .versions import SCOREBOARD, bump, bump_all, match_sheet
+
+        now = now or timezone.now()
+        full_time = now - MATCH_DURATION
+
+        with transaction.atomic():
+            ending = self.filter(status__in=['scheduled', 'live'], start_time__lte=full_time)
+            starting = self.filter(status='scheduled', start_time__lte=now, start_time__gt=full_time)
+            # bulk UPDATEs skip the post_save handlers, so credit the standings
+            # and log the changes here
+            ending_rows = list(ending.values_list('pk', 'league_id', 'home_team_id', 'away_team_id',
+                                                  'home_score', 'away_score'))
+            starting_ids = list(starting.values_list('pk', flat=True))
+            ending_ids = [row[0] for row in ending_rows]
+
+            finished = ending.filter(pk__in=ending_ids).update(status='finished') if ending_ids else 0
+            started = starting.filter(pk__in=starting_ids).update(status='live') if starting_ids else 0
+
+            for _, *result in ending_rows:
+                if result[3] is not None and result[4] is not None:
+                    apply_result(result)
+
+            if started or finished:
+                bump(SCOREBOARD)
+                bump_all(match_sheet(pk) for pk in ending_ids + starting_ids)
+                record('updated', self.filter(pk__in=ending_ids + starting_ids).order_by('pk'))
+                transaction.on_commit(
+                    lambda: match_statuses_changed.send(sender=self.model, started=started, finished=finished)
+                )
+
+        return started, finished
+
+    def next_transition(self, now=None):
+        """Return the next kickoff or full-time boundary after ``now``, or None."""
+        now = now or timezone.now()
+        next_kickoff = self.filter(status='scheduled', start_time__gt=now).aggregate(
+            first=models.Min('start_time'))['first']
+        earliest_live = self.filter(status='live').aggregate(first=models.Min('start_time'))['first']
+
+        boundaries = [next_kickoff]
+        if earliest_live is not None:
+            boundaries.append(earliest_live + MATCH_DURATION)
+        boundaries = [boundary for boundary in boundaries if boundary is not None]
+        return min(boundaries) if boundaries else None
+
+
 class Match(models.Model):
     STATUS_CHOICES = [
         ('scheduled', 'Scheduled'),
@@ -134,12 +208,33 @@ class Match(models.Model):
     home_score = models.IntegerField(null=True, blank=True)
     away_score = models.IntegerField(null=True, blank=True)
 
+    objects = MatchQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # live list (status='live' ORDER BY -start_time) and the clock's transition windows
+            models.Index(fields=['status', '-start_time'], name='match_status_start_idx'),
+            # upcoming list (start_time > now ORDER BY start_time) and API cursor pages
+            models.Index(fields=['start_time', 'id'], name='match_start_time_idx'),
+            # standings: a league's finished results
+            models.Index(fields=['league', 'status'], name='match_league_status_idx'),
+        ]
+
     def __str__(self):
         return f'{self.home_team} vs {self.away_team}'
 
     def get_absolute_url(self):
         return reverse('match-detail', args=[str(self.id)])
 
+    # ✅ Keep standings updates in the same transaction as the match write
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            return super().delete(*args, **kwargs)
+
     # ✅ Manually postpone a match
     def postpone(self):
         """Pause this match — no timer updates while postponed."""
@@ -161,12 +256,11 @@ class Match(models.Model):
             return  # Skip postponed matches
 
         now = timezone.now()
-        match_duration = timedelta(minutes=90)
 
         # Decide new status
         if now < self.start_time:
             new_status = 'scheduled'
-        elif self.start_time <= now < self.start_time + match_duration:
+        elif self.start_time <= now < self.start_time + MATCH_DURATION:
             new_status = 'live'
         else:
             new_status = 'finished'
@@ -199,6 +293,7 @@ class Player(models.Model):
     height_cm = models.PositiveIntegerField(blank=True, null=True)
 
     image = models.ImageField(upload_to='player_images/', blank=True, null=True)
+    image_derivatives = models.JSONField(default=dict, blank=True, editable=False)  # see pitch/images.py
 
     university = models.ForeignKey(
         University, null=True, blank=True, on_delete=models.SET_NULL, related_name="players"
@@ -207,9 +302,16 @@ class Player(models.Model):
     jersey_number = models.PositiveSmallIntegerField(
         null=True, blank=True, validators=[MinValueValidator(0), MaxValueValidator(99)]
     )
+    updated_at = models.DateTimeField(auto_now=True)  # part of the player_list row cache key
     
     class Meta:
         ordering = ['name', 'team'] 
+        indexes = [
+            # player list: all players, or one team's/university's, by name
+            models.Index(fields=['name', 'id'], name='player_name_idx'),
+            models.Index(fields=['team', 'name'], name='player_team_name_idx'),
+            models.Index(fields=['university', 'name'], name='player_university_name_idx'),
+        ]
 
     def get_absolute_url(self):
         """Returns the URL to access a particular player instance."""
@@ -231,6 +333,14 @@ class Event(models.Model):
     player_name = models.ForeignKey(Player , on_delete=models.CASCADE, blank=True, null=True)
     description = models.TextField(blank=True, null=True)
 
+    class Meta:
+        indexes = [
+            # a match's timeline in order
+            models.Index(fields=['match', 'event_time'], name='event_match_time_idx'),
+            # API cursor pages on (event_time, id)
+            models.Index(fields=['event_time', 'id'], name='event_time_idx'),
+        ]
+
     def __str__(self):
         return f'{self.event_type}'
 
@@ -238,57 +348,92 @@ class Event(models.Model):
         """Returns the url to access a particular team."""
         return reverse('event-detail', args=[str(self.id)])
 
+    # ✅ Keep the change feed entry in the same transaction as the event write
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            super().save(*args, **kwargs)
 
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            return super().delete(*args, **kwargs)
 
-from django.db.models import Q, Sum, Count
 
-def calculate_league_table(league):
-    teams = league.team_set.all()  # Get all teams in the league
-    table = []
 
-    for team in teams:
-        matches = Match.objects.filter(
-            Q(league=league) & (Q(home_team=team) | Q(away_team=team))
-        )
-        
+class LeagueStanding(models.Model):
+    """Persisted league table row, kept in step with finished match results."""
+    league = models.ForeignKey(League, on_delete=models.CASCADE, related_name="standings")
+    team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name="standings")
+
+    played = models.IntegerField(default=0)
+    wins = models.IntegerField(default=0)
+    draws = models.IntegerField(default=0)
+    losses = models.IntegerField(default=0)
+    goals_for = models.IntegerField(default=0)
+    goals_against = models.IntegerField(default=0)
+    goal_difference = models.IntegerField(default=0)
+    points = models.IntegerField(default=0)
 
-        played = matches.count()
-        wins = matches.filter(
-            (Q(home_team=team) & Q(home_score__gt=F('away_score'))) |
-            (Q(away_team=team) & Q(away_score__gt=F('home_score')))
-        ).count()
-        draws = matches.filter(Q(home_score=F('away_score'))).count()
-        losses = played - wins - draws
-
-        goals_for = matches.filter(home_team=team).aggregate(Sum('home_score'))['home_score__sum'] or 0
-        goals_for += matches.filter(away_team=team).aggregate(Sum('away_score'))['away_score__sum'] or 0
-
-        goals_against = matches.filter(home_team=team).aggregate(Sum('away_score'))['away_score__sum'] or 0
-        goals_against += matches.filter(away_team=team).aggregate(Sum('home_score'))['home_score__sum'] or 0
-
-        goal_difference = goals_for - goals_against
-        points = (wins * 3) + draws
-
-        table.append({
-            'team': team,
-            'played': played,
-            'wins': wins,
-            'draws': draws,
-            'losses': losses,
-            'goals_for': goals_for,
-            'goals_against': goals_against,
-            'goal_difference': goal_difference,
-            'points': points,
-        })
-
-    # Sort the table by points, goal difference, etc.
-    table = sorted(table, key=lambda x: (x['points'], x['goal_difference'], x['goals_for']), reverse=True)
-
-    # Add position
-    for index, row in enumerate(table):
-        row['position'] = index + 1
-
-    return table
+    class Meta:
+        ordering = ['league', '-points', '-goal_difference', '-goals_for', 'team']
+        constraints = [
+            UniqueConstraint(fields=['league', 'team'], name='league_standing_unique_team'),
+        ]
+        indexes = [
+            models.Index(
+                fields=['league', '-points', '-goal_difference', '-goals_for', 'team'],
+                name='league_standing_table_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.league}: {self.team} ({self.points} pts)'
+
+
+
+class VersionCounter(models.Model):
+    """Monotonically increasing version of a piece of derived data (e.g. the scoreboard)."""
+    name = models.CharField(max_length=50, primary_key=True)
+    value = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f'{self.name} v{self.value}'
+
+
+
+class MatchChange(models.Model):
+    """One entry of the append-only match and event change feed (see ``pitch.changes``)."""
+    KIND_CHOICES = [
+        ('match', 'Match'),
+        ('event', 'Event'),
+    ]
+    ACTION_CHOICES = [
+        ('created', 'Created'),
+        ('updated', 'Updated'),
+        ('deleted', 'Deleted'),
+    ]
+
+    version = models.BigIntegerField(unique=True)
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    object_id = models.BigIntegerField()
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES)
+    # the row as the write API serializes it; for deletes, its last state
+    data = models.JSONField()
+    changed_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['version']
+
+    def __str__(self):
+        return f'v{self.version} {self.kind} {self.object_id} {self.action}'
+
+
+
+from django.db.models import Q, Sum, Count
+
+def calculate_league_table(league):
+    """Compute the table for ``league`` (see ``pitch.standings``)."""
+    from .standings import calculate_league_table as build_table
+    return build_table(league)
 
 
 def league_table_view(request, league_id, season_id=None):
@@ -0,0 +1,21 @@
+from django.conf import settings
+from rest_framework.pagination import CursorPagination
+
+
+class IdCursorPagination(CursorPagination):
+    """Keyset pagination on the primary key.
+
+    Clients may ask for ``?page_size=`` up to ``API_MAX_PAGE_SIZE`` rows; the
+    default comes from ``REST_FRAMEWORK['PAGE_SIZE']``.
+    """
+    ordering = 'id'
+    page_size_query_param = 'page_size'
+    max_page_size = settings.API_MAX_PAGE_SIZE
+
+
+class MatchCursorPagination(IdCursorPagination):
+    ordering = ('start_time', 'id')
+
+
+class EventCursorPagination(IdCursorPagination):
+    ordering = ('event_time', 'id')
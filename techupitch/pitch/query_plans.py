@@ -0,0 +1,91 @@
+"""EXPLAIN checks for the hot queries behind the scoreboard, clock, standings, list and API pages.
+
+Each entry mirrors a query the app runs on every poll or page view. The check
+asks the database for its plan and reports any query that would read a whole
+table instead of an index.
+"""
+import re
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from .models import MATCH_DURATION, Event, League, LeagueStanding, Match, Player, Sport, Team, University
+from .standings import result_rows
+
+SQLITE_SCAN = re.compile(r'\bSCAN (\S+)')
+POSTGRES_SCAN = re.compile(r'Seq Scan on (\S+)')
+
+
+def hot_queries(now=None):
+    """Return ``{name: queryset}`` for the queries that must stay on an index."""
+    now = now or timezone.now()
+    full_time = now - MATCH_DURATION
+    league = League.objects.order_by('pk').first()
+    match = Match.objects.order_by('pk').first()
+    sport = Sport.objects.order_by('pk').first()
+    university = University.objects.order_by('pk').first()
+    page = settings.LIST_PAGE_SIZE
+
+    return {
+        'scoreboard live': Match.objects.filter(status='live').order_by('-start_time'),
+        'scoreboard upcoming': Match.objects.filter(start_time__gt=now).order_by('start_time')[:10],
+        'clock kickoffs': Match.objects.filter(status='scheduled', start_time__lte=now, start_time__gt=full_time),
+        'clock full time': Match.objects.filter(status__in=['scheduled', 'live'], start_time__lte=full_time),
+        'clock next kickoff': Match.objects.filter(status='scheduled', start_time__gt=now).order_by('start_time')[:1],
+        'standings results': result_rows(league),
+        'standings table': LeagueStanding.objects.filter(league=league),
+        'match timeline': Event.objects.filter(match=match).order_by('event_time', 'id'),
+        'fixtures window': Match.objects.filter(
+            start_time__gte=now - timedelta(days=settings.MATCH_LIST_DAYS),
+            start_time__lt=now + timedelta(days=settings.MATCH_LIST_DAYS + 1),
+        ).select_related('league', 'home_team', 'away_team').order_by('league__name', 'league_id', 'start_time', 'id'),
+        'team list page': Team.objects.order_by('name', 'id')[:page],
+        'team list by sport': Team.objects.filter(sport=sport).order_by('name', 'id')[:page],
+        'player list page': Player.objects.order_by('name', 'id')[:page],
+        'player list by university': Player.objects.filter(university=university).order_by('name', 'id')[:page],
+        'api matches page': Match.objects.order_by('start_time', 'id')[:50],
+        'api events page': Event.objects.order_by('event_time', 'id')[:50],
+    }
+
+
+def sequential_scans(plan, vendor=None):
+    """Return the tables ``plan`` reads in full."""
+    vendor = vendor or connection.vendor
+    if vendor == 'sqlite':
+        # "SCAN t USING INDEX i" walks an index in order; a bare "SCAN t" reads the table
+        return [
+            found[1]
+            for found in map(SQLITE_SCAN.search, plan.splitlines())
+            if found and 'USING' not in found.string and found[1] != 'CONSTANT'
+        ]
+    if vendor == 'postgresql':
+        return POSTGRES_SCAN.findall(plan)
+    return []
+
+
+def analyze():
+    """Refresh planner statistics so plans reflect the seeded data."""
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+
+
+def check_query_plans(now=None):
+    """Return ``{name: (plan, scanned tables)}`` for every hot query.
+
+    On PostgreSQL sequential scans are switched off for the check, so a
+    "Seq Scan" in the plan means no index can serve the query at all.
+    """
+    results = {}
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('SET enable_seqscan = off')
+        try:
+            for name, queryset in hot_queries(now).items():
+                plan = queryset.explain()
+                results[name] = (plan, sequential_scans(plan))
+        finally:
+            if connection.vendor == 'postgresql':
+                cursor.execute('RESET enable_seqscan')
+    return results
@@ -0,0 +1,201 @@
+"""Printable PDF league tables and match sheets.
+
+A report is rendered once per version of the data it shows: each league table
+and each match sheet has its own counter (``versions.league_table`` and
+``versions.match_sheet``), so a goal in one match re-renders only that
+match's sheet and its league's table. Files are
+written to ``REPORTS_DIR`` as ``<kind>-<id>-v<version>.pdf``, so serving an
+unchanged report is a file send. Rendering runs on a small thread pool, off
+the request thread, and concurrent requests for the same missing file share
+one render.
+"""
+import os
+import tempfile
+import threading
+from collections import namedtuple
+from xml.sax.saxutils import escape
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib.units import mm
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+from . import versions
+from .models import League, Match
+from .standings import league_table
+
+# ``counter`` maps an object id to the name of its version counter
+Report = namedtuple('Report', ['counter', 'render'])
+
+TABLE_STYLE = TableStyle([
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 9),
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#0d6efd')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f2f2f2')]),
+    ('GRID', (0, 0), (-1, -1), 0.25, colors.grey),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+])
+
+_lock = threading.Lock()
+_executor = None
+_pending = {}
+
+
+def document(file, title):
+    return SimpleDocTemplate(file, pagesize=A4, title=title, author='U Pitch',
+                             leftMargin=15 * mm, rightMargin=15 * mm, topMargin=15 * mm, bottomMargin=15 * mm)
+
+
+def generated_line(styles):
+    return Paragraph(f"Printed {timezone.localtime():%d %b %Y %H:%M}", styles['Italic'])
+
+
+def render_league_table(league_id, file):
+    league = League.objects.select_related('university').get(pk=league_id)
+    styles = getSampleStyleSheet()
+    title = f"{league.name} — League Table"
+    # Paragraph text is markup, so names are escaped
+
+    rows = [['Pos', 'Team', 'P', 'W', 'D', 'L', 'GF', 'GA', 'GD', 'Pts']]
+    for row in league_table(league):
+        rows.append([
+            row['position'], Paragraph(escape(row['team'].name), styles['BodyText']), row['played'], row['wins'],
+            row['draws'], row['losses'], row['goals_for'], row['goals_against'], row['goal_difference'],
+            row['points'],
+        ])
+    table = Table(rows, colWidths=[12 * mm, 70 * mm] + [12 * mm] * 8, repeatRows=1)
+    table.setStyle(TABLE_STYLE)
+
+    story = [Paragraph(escape(title), styles['Title'])]
+    if league.university:
+        story.append(Paragraph(escape(league.university.name), styles['Heading3']))
+    story += [generated_line(styles), Spacer(0, 6 * mm), table]
+    if len(rows) == 1:
+        story.append(Paragraph("No teams in this league yet.", styles['BodyText']))
+    document(file, title).build(story)
+
+
+def render_match_sheet(match_id, file):
+    match = Match.objects.select_related('league', 'home_team', 'away_team').get(pk=match_id)
+    events = match.event_set.select_related('team', 'player_name').order_by('event_time', 'id')
+    styles = getSampleStyleSheet()
+    title = f"{match.home_team.name} vs {match.away_team.name}"
+
+    score = '–'.join('-' if goals is None else str(goals) for goals in (match.home_score, match.away_score))
+    details = [
+        f"{match.league.name}",
+        f"Kickoff {timezone.localtime(match.start_time):%a %d %b %Y %H:%M}",
+        f"Status: {match.get_status_display()}",
+    ]
+
+    rows = [['Time', 'Event', 'Team', 'Player', 'Notes']]
+    for event in events:
+        rows.append([
+            f"{timezone.localtime(event.event_time):%H:%M}",
+            Paragraph(escape(event.event_type), styles['BodyText']),
+            Paragraph(escape(event.team.name if event.team else ''), styles['BodyText']),
+            Paragraph(escape(event.player_name.name if event.player_name else ''), styles['BodyText']),
+            Paragraph(escape(event.description or ''), styles['BodyText']),
+        ])
+    table = Table(rows, colWidths=[15 * mm, 30 * mm, 40 * mm, 40 * mm, 55 * mm], repeatRows=1)
+    table.setStyle(TABLE_STYLE)
+
+    story = [Paragraph(escape(title), styles['Title']), Paragraph(score, styles['Title'])]
+    story += [Paragraph(escape(line), styles['BodyText']) for line in details]
+    story += [generated_line(styles), Spacer(0, 6 * mm), Paragraph("Timeline", styles['Heading2']), table]
+    if len(rows) == 1:
+        story.append(Paragraph("No events recorded.", styles['BodyText']))
+    document(file, title).build(story)
+
+
+REPORTS = {
+    'league': Report(versions.league_table, render_league_table),
+    'match': Report(versions.match_sheet, render_match_sheet),
+}
+
+
+def report_path(kind, pk, version):
+    return os.path.join(settings.REPORTS_DIR, f'{kind}-{pk}-v{version}.pdf')
+
+
+def executor():
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=settings.REPORT_WORKERS, thread_name_prefix='pitch-report')
+        return _executor
+
+
+def render(kind, pk, path):
+    """Render one report to ``path`` atomically and delete the versions it replaces."""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as file:
+            REPORTS[kind].render(pk, file)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+    finally:
+        # worker threads outlive requests, so nothing else would close these
+        connections.close_all()
+
+    prune(kind, pk, path)
+    return path
+
+
+def prune(kind, pk, path):
+    """Delete the files of ``kind``/``pk`` older than the version at ``path``."""
+    prefix = f'{kind}-{pk}-v'
+    written = int(os.path.basename(path)[len(prefix):-len('.pdf')])
+    directory = os.path.dirname(path)
+    for name in os.listdir(directory):
+        version = name[len(prefix):-len('.pdf')]
+        if name.startswith(prefix) and name.endswith('.pdf') and version.isdigit() and int(version) < written:
+            try:
+                os.unlink(os.path.join(directory, name))
+            except FileNotFoundError:
+                pass
+
+
+def request(kind, pk):
+    """Return ``(path, future)`` for the current version of a report.
+
+    ``future`` is None when the file already exists; otherwise it is the
+    (possibly shared) render that will write ``path``.
+    """
+    path = report_path(kind, pk, versions.current(REPORTS[kind].counter(pk)))
+    if os.path.exists(path):
+        return path, None
+    pool = executor()
+    with _lock:
+        future = _pending.get(path)
+        if future is None:
+            future = _pending[path] = pool.submit(render, kind, pk, path)
+            future.add_done_callback(lambda done: _pending.pop(path, None))
+    return path, future
+
+
+def open_report(kind, pk, wait):
+    """Return the current report opened for reading, or None if it is still rendering after ``wait`` seconds."""
+    for _ in range(2):
+        path, future = request(kind, pk)
+        if future is not None:
+            try:
+                future.result(timeout=wait)
+            except TimeoutError:
+                return None
+        try:
+            return open(path, 'rb')
+        except FileNotFoundError:
+            # superseded by a newer version and pruned in between; look again
+            continue
+    return None
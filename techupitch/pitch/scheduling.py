@@ -0,0 +1,100 @@
+"""Season fixture generation.
+
+:func:`round_robin` builds the rounds with the circle method, oriented so
+home and away alternate as much as a round robin allows (de Werra's
+canonical schedule: at most one repeat per team per half). The second half
+mirrors the first with venues swapped, so every pair meets once at each
+ground. :func:`schedule` puts the rounds on the calendar and
+:func:`create_fixtures` writes them in one transaction.
+"""
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from . import changes, versions
+from .broadcast import scoreboard_hub
+from .models import Match
+from .scoreboard import invalidate_snapshot
+
+Fixture = namedtuple('Fixture', ['round', 'home_team', 'away_team', 'start_time'])
+
+WEEKDAYS = ['mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun']
+
+
+def round_robin(teams, double=True):
+    """Return a list of rounds, each a list of ``(home, away)`` pairs.
+
+    With an odd number of teams one team sits out each round.
+    """
+    teams = list(teams)
+    if len(teams) < 2:
+        raise ValueError("A round robin needs at least two teams.")
+    if len(teams) % 2:
+        teams.append(None)  # bye
+
+    n = len(teams)
+    m = n - 1
+    fixed = teams[m]
+    rounds = []
+    for i in range(m):
+        pairs = [(fixed, teams[i]) if i % 2 else (teams[i], fixed)]
+        for k in range(1, n // 2):
+            a, b = teams[(i + k) % m], teams[(i - k) % m]
+            pairs.append((a, b) if k % 2 else (b, a))
+        rounds.append([(home, away) for home, away in pairs if home is not None and away is not None])
+
+    if double:
+        rounds += [[(away, home) for home, away in pairs] for pairs in rounds]
+    return rounds
+
+
+def match_dates(start_date, match_days):
+    """Yield every date from ``start_date`` whose weekday (0 = Monday) is in ``match_days``."""
+    if not match_days:
+        raise ValueError("Pick at least one match day.")
+    day = start_date
+    while True:
+        if day.weekday() in match_days:
+            yield day
+        day += timedelta(days=1)
+
+
+def schedule(teams, start_date, match_days, kickoff_slots, double=True):
+    """Lay the round robin of ``teams`` out on the calendar as a list of :class:`Fixture`.
+
+    Each round is played on the next match day on or after ``start_date``;
+    its matches take the kickoff slots (``datetime.time``) in turn.
+    """
+    if not kickoff_slots:
+        raise ValueError("Pick at least one kickoff slot.")
+    slots = sorted(kickoff_slots)
+    dates = match_dates(start_date, set(match_days))
+
+    fixtures = []
+    for number, pairs in enumerate(round_robin(teams, double), start=1):
+        day = next(dates)
+        for index, (home, away) in enumerate(pairs):
+            kickoff = timezone.make_aware(datetime.combine(day, slots[index % len(slots)]))
+            fixtures.append(Fixture(number, home, away, kickoff))
+    return fixtures
+
+
+def create_fixtures(league, fixtures):
+    """Insert ``fixtures`` for ``league`` with one ``bulk_create`` and return the matches.
+
+    ``bulk_create`` skips the model signals, so the scoreboard version is
+    bumped and the change feed written here, in the same transaction.
+    """
+    with transaction.atomic():
+        matches = Match.objects.bulk_create([
+            Match(league=league, home_team=fixture.home_team, away_team=fixture.away_team,
+                  start_time=fixture.start_time)
+            for fixture in fixtures
+        ])
+        versions.bump(versions.SCOREBOARD)
+        changes.record('created', matches)
+        transaction.on_commit(invalidate_snapshot)
+        transaction.on_commit(scoreboard_hub.notify)
+    return matches
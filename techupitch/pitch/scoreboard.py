@@ -0,0 +1,163 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from . import versions
+from .models import Match, Player, Team
+
+SNAPSHOT_KEY = 'pitch:scoreboard:snapshot'
+LOCK_KEY = 'pitch:scoreboard:rebuild-lock'
+STATS_KEYS = {
+    'hits': 'pitch:scoreboard:hits',
+    'misses': 'pitch:scoreboard:misses',
+    'stale': 'pitch:scoreboard:stale',
+    'rebuilds': 'pitch:scoreboard:rebuilds',
+}
+
+
+def match_entry(match):
+    return {
+        'id': match.id,
+        'league': match.league.name,
+        'home_team': match.home_team.name,
+        'away_team': match.away_team.name,
+        'home_score': match.home_score,
+        'away_score': match.away_score,
+        'status': match.status,
+        'start_time': match.start_time,
+    }
+
+
+def build_snapshot(version=None, now=None):
+    """Read the live and upcoming lists and the homepage counters from the database."""
+    now = now or timezone.now()
+    matches = Match.objects.select_related('league', 'home_team', 'away_team')
+
+    live_matches = matches.filter(status='live').order_by('-start_time')
+    upcoming_matches = matches.filter(start_time__gt=now).order_by('start_time')[:settings.SCOREBOARD_UPCOMING_LIMIT]
+
+    return {
+        'version': versions.current(versions.SCOREBOARD) if version is None else version,
+        'num_matches': Match.objects.count(),
+        'num_team': Team.objects.count(),
+        'num_players': Player.objects.count(),
+        'live_matches': [match_entry(m) for m in live_matches],
+        'upcoming_matches': [match_entry(m) for m in upcoming_matches],
+    }
+
+
+def _count(stat):
+    key = STATS_KEYS[stat]
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, timeout=None)
+        cache.incr(key)
+
+
+def get_snapshot(version=None):
+    """Return the scoreboard snapshot, rebuilding it at most once per change.
+
+    The cached copy is used while its version matches the current scoreboard
+    version and it hasn't expired. On a miss one caller takes a short lock and
+    rebuilds; concurrent callers get the previous copy if there is one, or
+    wait briefly for the rebuild instead of all querying at once.
+    """
+    if version is None:
+        version = versions.current(versions.SCOREBOARD)
+
+    cached = cache.get(SNAPSHOT_KEY)
+    if cached is not None and cached['version'] == version:
+        _count('hits')
+        return cached
+    _count('misses')
+
+    deadline = time.monotonic() + settings.SCOREBOARD_REBUILD_WAIT
+    while not cache.add(LOCK_KEY, True, timeout=settings.SCOREBOARD_REBUILD_WAIT):
+        if cached is not None:
+            _count('stale')
+            return cached
+        if time.monotonic() >= deadline:
+            break  # the rebuilder is stuck or gone; build our own copy
+        time.sleep(0.05)
+        cached = cache.get(SNAPSHOT_KEY)
+        if cached is not None and cached['version'] == version:
+            return cached
+
+    try:
+        snapshot = build_snapshot(version)
+        cache.set(SNAPSHOT_KEY, snapshot, timeout=settings.SCOREBOARD_CACHE_TIMEOUT)
+        _count('rebuilds')
+    finally:
+        cache.delete(LOCK_KEY)
+    return snapshot
+
+
+def invalidate_snapshot():
+    cache.delete(SNAPSHOT_KEY)
+
+
+def snapshot_stats():
+    """Hit/miss counters of the snapshot cache (per process for local-memory caches)."""
+    values = cache.get_many(STATS_KEYS.values())
+    return {stat: values.get(key, 0) for stat, key in STATS_KEYS.items()}
+
+
+def live_item(entry):
+    return {
+        'id': entry['id'],
+        'league': entry['league'],
+        'home_team': entry['home_team'],
+        'away_team': entry['away_team'],
+        'home_score': entry['home_score'] or 0,
+        'away_score': entry['away_score'] or 0,
+        'status': entry['status'],
+        'start_time': entry['start_time'].isoformat(),  # the page shows it in the reader's time zone
+    }
+
+
+def upcoming_item(entry):
+    return {
+        'id': entry['id'],
+        'league': entry['league'],
+        'home_team': entry['home_team'],
+        'away_team': entry['away_team'],
+        'start_time': entry['start_time'].isoformat(),  # the page shows it in the reader's time zone
+    }
+
+
+def versioned_scoreboard(version=None):
+    """Return the live and upcoming lists served by ``ajax-matches`` and the live stream.
+
+    Returns ``(version, board)`` where ``version`` is the one the board was built at.
+
+    While another caller rebuilds, :func:`get_snapshot` may hand back the
+    previous copy, so this can be older than the current scoreboard version;
+    ETags and the live stream must use it rather than the counter.
+    """
+    snapshot = get_snapshot(version)
+    return snapshot['version'], {
+        'live_matches': [live_item(entry) for entry in snapshot['live_matches']],
+        'upcoming_matches': [upcoming_item(entry) for entry in snapshot['upcoming_matches']],
+    }
+
+
+def scoreboard_delta(previous, current):
+    """Describe how ``current`` differs from ``previous``, or return None if nothing changed.
+
+    The delta lists the entries that were added or changed (per section) and
+    the ids that left each section, which is all a client needs to patch its copy.
+    """
+    delta = {}
+    for section in ('live_matches', 'upcoming_matches'):
+        before = {item['id']: item for item in previous.get(section, [])}
+        after = {item['id']: item for item in current.get(section, [])}
+
+        changed = [item for match_id, item in after.items() if before.get(match_id) != item]
+        removed = [match_id for match_id in before if match_id not in after]
+        if changed or removed or list(before) != list(after):
+            delta[section] = {'changed': changed, 'removed': removed, 'order': list(after)}
+
+    return delta or None
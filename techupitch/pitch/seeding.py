@@ -0,0 +1,131 @@
+"""Synthetic data for benchmarks and load tests.
+
+Rows are written with ``bulk_create`` in batches, which skips ``save()`` and
+the model signals, so :func:`seed` rebuilds the standings and bumps the
+scoreboard version itself once everything is in.
+"""
+import random
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from . import changes, versions
+from .models import MATCH_DURATION, Event, League, Match, Player, Sport, Team, University
+from .scoreboard import invalidate_snapshot
+from .standings import rebuild_all_standings
+
+BATCH_SIZE = 2000
+EVENT_TYPES = ['Goal', 'Yellow Card', 'Red Card', 'Substitution']
+POSITIONS = ['GK', 'DF', 'MF', 'FW']
+
+
+def scaled_sizes(matches):
+    """Entity counts for a dataset of ``matches`` matches (200k matches -> 50 universities)."""
+    return {
+        'universities': max(1, matches // 4000),
+        'leagues_per_university': 2,
+        'teams_per_league': 10,
+        'players_per_team': 15,
+        'matches': matches,
+        'events_per_match': 3,
+    }
+
+
+def batched(items, size=BATCH_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def match_row(league, teams, start_time, now, rng):
+    home, away = rng.sample(teams, 2)
+    match = Match(league=league, home_team=home, away_team=away, start_time=start_time)
+    if start_time + MATCH_DURATION <= now:
+        match.status, match.home_score, match.away_score = 'finished', rng.randint(0, 4), rng.randint(0, 4)
+    elif start_time <= now:
+        match.status, match.home_score, match.away_score = 'live', rng.randint(0, 2), rng.randint(0, 2)
+    return match
+
+
+def event_rows(match, squads, count, rng):
+    if match.status == 'scheduled':
+        return []
+    events = []
+    for _ in range(count):
+        team = rng.choice((match.home_team, match.away_team))
+        events.append(Event(
+            match=match, team=team, player_name=rng.choice(squads[team.pk]),
+            event_type=rng.choice(EVENT_TYPES),
+            event_time=match.start_time + timedelta(minutes=rng.randint(1, 90)),
+        ))
+    return events
+
+
+def seed(universities=1, leagues_per_university=2, teams_per_league=10, players_per_team=15,
+         matches=1000, events_per_match=3, prefix='Seed', days=180, random_seed=0):
+    """Create a synthetic season and return the number of rows written per model.
+
+    Kickoffs are spread over ``days`` either side of now, so the data has
+    finished, live and upcoming matches like a real season.
+    """
+    rng = random.Random(random_seed)
+    now = timezone.now()
+    counts = dict.fromkeys(['universities', 'leagues', 'teams', 'players', 'matches', 'events'], 0)
+
+    with transaction.atomic():
+        sport, _ = Sport.objects.get_or_create(name='Football')
+
+        unis = University.objects.bulk_create([
+            University(name=f'{prefix} University {n}', short_name=f'{prefix[:3].upper()}{n}')
+            for n in range(1, universities + 1)
+        ], batch_size=BATCH_SIZE)
+        leagues = League.objects.bulk_create([
+            League(name=f'{uni.short_name} League {n}', sport=sport, university=uni)
+            for uni in unis for n in range(1, leagues_per_university + 1)
+        ], batch_size=BATCH_SIZE)
+        teams = Team.objects.bulk_create([
+            Team(name=f'{league.name} Team {n}', sport=sport, university=league.university)
+            for league in leagues for n in range(1, teams_per_league + 1)
+        ], batch_size=BATCH_SIZE)
+
+        league_teams = {league.pk: teams[i * teams_per_league:(i + 1) * teams_per_league]
+                        for i, league in enumerate(leagues)}
+        Team.league.through.objects.bulk_create([
+            Team.league.through(team_id=team.pk, league_id=league_id)
+            for league_id, members in league_teams.items() for team in members
+        ], batch_size=BATCH_SIZE)
+
+        players = Player.objects.bulk_create([
+            Player(name=f'Player {n}', dept='CSC', team=team, university=team.university,
+                   position=POSITIONS[n % len(POSITIONS)], jersey_number=n)
+            for team in teams for n in range(1, players_per_team + 1)
+        ], batch_size=BATCH_SIZE)
+        squads = {}
+        for player in players:
+            squads.setdefault(player.team_id, []).append(player)
+
+        counts.update(universities=len(unis), leagues=len(leagues), teams=len(teams), players=len(players))
+
+        window = int(timedelta(days=days).total_seconds())
+        for batch in batched(range(matches if teams_per_league >= 2 and leagues else 0)):
+            rows = []
+            for _ in batch:
+                league = rng.choice(leagues)
+                start_time = now + timedelta(seconds=rng.randint(-window, window))
+                rows.append(match_row(league, league_teams[league.pk], start_time, now, rng))
+            Match.objects.bulk_create(rows)
+            counts['matches'] += len(rows)
+
+            if players_per_team and events_per_match:
+                events = [event for match in rows for event in event_rows(match, squads, events_per_match, rng)]
+                Event.objects.bulk_create(events, batch_size=BATCH_SIZE)
+                counts['events'] += len(events)
+
+        rebuild_all_standings(leagues)
+        versions.bump(versions.SCOREBOARD)
+        versions.bump(versions.LISTINGS)
+        # far too many rows to log one by one; clients download afresh instead
+        changes.require_resync()
+        transaction.on_commit(invalidate_snapshot)
+
+    return counts
@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from . import images
 from .models import Sport, University, League, Team, Match, Player, Event
 
 class SportSerializer(serializers.ModelSerializer):
@@ -35,3 +36,76 @@ class EventSerializer(serializers.ModelSerializer):
     class Meta:
         model = Event
         fields = '__all__'
+
+
+class ImageDerivativesField(serializers.Field):
+    """Resized variants of an image field, e.g. ``ImageDerivativesField(source='logo')``.
+
+    Gives ``srcset``/``webp_srcset`` strings ready for an ``<img>``/``<picture>``
+    and the variant list, or None until the derivatives have been built.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, fieldfile):
+        entries = images.variants(fieldfile)
+        if not entries:
+            return None
+        request = self.context.get('request')
+        if request is not None:
+            entries = [
+                {**entry, 'webp': request.build_absolute_uri(entry['webp']),
+                 'fallback': request.build_absolute_uri(entry['fallback'])}
+                for entry in entries
+            ]
+        return {
+            'srcset': images.srcset(entries, 'fallback'),
+            'webp_srcset': images.srcset(entries, 'webp'),
+            'variants': entries,
+        }
+
+
+# ---- Read representations ----
+# List/retrieve responses flatten related names so clients don't need extra
+# round trips; the viewsets select/prefetch everything these fields touch.
+
+class UniversityReadSerializer(UniversitySerializer):
+    logo_derivatives = ImageDerivativesField(source='logo')
+
+
+class LeagueReadSerializer(LeagueSerializer):
+    logo_derivatives = ImageDerivativesField(source='logo')
+    sport_name = serializers.CharField(source='sport.name', read_only=True)
+    university_name = serializers.CharField(source='university.name', read_only=True, default=None)
+
+
+class LeagueSummarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = League
+        fields = ['id', 'name', 'abbreviation']
+
+
+class TeamReadSerializer(TeamSerializer):
+    logo_derivatives = ImageDerivativesField(source='logo')
+    sport_name = serializers.CharField(source='sport.name', read_only=True)
+    university_name = serializers.CharField(source='university.name', read_only=True, default=None)
+    leagues = LeagueSummarySerializer(source='league', many=True, read_only=True)
+
+
+class MatchReadSerializer(MatchSerializer):
+    league_name = serializers.CharField(source='league.name', read_only=True)
+    home_team_name = serializers.CharField(source='home_team.name', read_only=True)
+    away_team_name = serializers.CharField(source='away_team.name', read_only=True)
+
+
+class PlayerReadSerializer(PlayerSerializer):
+    image_derivatives = ImageDerivativesField(source='image')
+    team_name = serializers.CharField(source='team.name', read_only=True)
+    university_name = serializers.CharField(source='university.name', read_only=True, default=None)
+
+
+class EventReadSerializer(EventSerializer):
+    team_name = serializers.CharField(source='team.name', read_only=True, default=None)
+    player = serializers.CharField(source='player_name.name', read_only=True, default=None)
@@ -0,0 +1,234 @@
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import Signal, receiver
+
+from . import changes, images, standings, versions
+from .broadcast import match_timeline_hub, scoreboard_hub
+from .models import Event, League, Match, Player, Team, University
+from .scoreboard import invalidate_snapshot
+
+
+# Sent after Match.objects.update_statuses() commits any transition,
+# with ``started`` and ``finished`` row counts.
+match_statuses_changed = Signal()
+
+
+# ---- League standings ----
+
+@receiver(pre_save, sender=Match)
+def remember_previous_result(sender, instance, raw=False, **kwargs):
+    """Load the stored result so post_save can work out the standings delta."""
+    instance._previous_result = None
+    if raw or instance.pk is None:
+        return
+    previous = (
+        Match.objects.select_for_update()
+        .filter(pk=instance.pk)
+        .values_list('league_id', 'home_team_id', 'away_team_id', 'status', 'home_score', 'away_score')
+        .first()
+    )
+    if previous is not None:
+        instance._previous_result = standings.counted_result(*previous)
+
+
+@receiver(post_save, sender=Match)
+def update_standings_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_previous_result', None)
+    current = standings.match_result(instance)
+    if previous == current:
+        return
+    standings.apply_result(previous, sign=-1)
+    standings.apply_result(current, sign=1)
+
+
+@receiver(post_delete, sender=Match)
+def update_standings_on_delete(sender, instance, **kwargs):
+    standings.apply_result(standings.match_result(instance), sign=-1)
+
+
+@receiver(m2m_changed, sender=Team.league.through)
+def rebuild_standings_on_membership_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """Teams joining or leaving a league get their standing row rebuilt."""
+    if action == 'pre_clear' and not reverse:
+        instance._cleared_league_ids = list(instance.league.values_list('pk', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if reverse:
+        leagues = [instance]
+    else:
+        league_ids = pk_set if action != 'post_clear' else getattr(instance, '_cleared_league_ids', [])
+        leagues = League.objects.filter(pk__in=league_ids)
+
+    for league in leagues:
+        standings.rebuild_league_standings(league)
+    versions.bump(versions.LISTINGS)
+
+
+# ---- Scoreboard version ----
+
+@receiver(post_save, sender=Match)
+@receiver(post_delete, sender=Match)
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+@receiver(post_save, sender=Team)
+@receiver(post_delete, sender=Team)
+@receiver(post_save, sender=Player)
+@receiver(post_delete, sender=Player)
+def bump_scoreboard_version(sender, raw=False, **kwargs):
+    if not raw:
+        versions.bump(versions.SCOREBOARD)
+
+
+# ---- Standings version ----
+# Results and rebuilds bump it in standings.py; names printed in the table
+# change here.
+
+@receiver(post_save, sender=Team)
+@receiver(post_delete, sender=Team)
+@receiver(post_save, sender=League)
+def bump_standings_version(sender, raw=False, created=False, **kwargs):
+    if not raw and not created:
+        versions.bump(versions.STANDINGS)
+
+
+# ---- Report versions ----
+# Each PDF report follows the counter of its own league or match. Results and
+# rebuilds bump the league's in standings.py; everything else a report prints
+# is handled here.
+
+@receiver(post_save, sender=Match)
+@receiver(post_delete, sender=Match)
+def bump_match_sheet_version(sender, instance, raw=False, **kwargs):
+    if not raw:
+        versions.bump(versions.match_sheet(instance.pk))
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+def bump_match_sheet_version_on_event(sender, instance, raw=False, **kwargs):
+    if not raw:
+        versions.bump(versions.match_sheet(instance.match_id))
+
+
+@receiver(post_save, sender=Team)
+def bump_report_versions_on_team(sender, instance, raw=False, created=False, **kwargs):
+    if raw or created:
+        return
+    league_ids = instance.league.values_list('pk', flat=True)
+    match_ids = Match.objects.filter(Q(home_team=instance) | Q(away_team=instance)).values_list('pk', flat=True)
+    versions.bump_all([versions.league_table(pk) for pk in league_ids]
+                      + [versions.match_sheet(pk) for pk in match_ids])
+
+
+@receiver(pre_delete, sender=Team)
+def bump_league_table_versions_on_team_delete(sender, instance, **kwargs):
+    # before the delete, while the memberships (and standing rows) still exist
+    versions.bump_all(versions.league_table(pk) for pk in instance.league.values_list('pk', flat=True))
+
+
+@receiver(post_save, sender=Player)
+def bump_match_sheet_versions_on_player(sender, instance, raw=False, created=False, **kwargs):
+    if not raw and not created:
+        match_ids = Event.objects.filter(player_name=instance).values_list('match_id', flat=True)
+        versions.bump_all(versions.match_sheet(pk) for pk in match_ids)
+
+
+@receiver(post_save, sender=League)
+def bump_report_versions_on_league(sender, instance, raw=False, created=False, **kwargs):
+    if raw or created:
+        return
+    match_ids = instance.match_set.values_list('pk', flat=True)
+    versions.bump_all([versions.league_table(instance.pk)] + [versions.match_sheet(pk) for pk in match_ids])
+
+
+@receiver(post_save, sender=University)
+@receiver(pre_delete, sender=University)
+def bump_league_table_versions_on_university(sender, instance, raw=False, created=False, **kwargs):
+    # pre_delete: the delete sets the leagues' university to NULL without signals
+    if not raw and not created:
+        league_ids = League.objects.filter(university=instance).values_list('pk', flat=True)
+        versions.bump_all(versions.league_table(pk) for pk in league_ids)
+
+
+# ---- Change feed ----
+# Match.save()/Event.save() are atomic, so the entry commits with the write.
+
+@receiver(post_save, sender=Match)
+@receiver(post_save, sender=Event)
+def log_change_on_save(sender, instance, created=False, raw=False, **kwargs):
+    if not raw:
+        changes.record('created' if created else 'updated', [instance])
+
+
+@receiver(post_delete, sender=Match)
+@receiver(post_delete, sender=Event)
+def log_change_on_delete(sender, instance, **kwargs):
+    changes.record('deleted', [instance])
+
+
+# ---- Listings version ----
+# Membership changes bump it in rebuild_standings_on_membership_change.
+
+@receiver(post_save, sender=League)
+@receiver(post_delete, sender=League)
+@receiver(post_save, sender=University)
+@receiver(post_delete, sender=University)
+def bump_listings_version(sender, raw=False, **kwargs):
+    if not raw:
+        versions.bump(versions.LISTINGS)
+
+
+# ---- Scoreboard snapshot cache ----
+
+@receiver(post_save, sender=Match)
+@receiver(post_delete, sender=Match)
+@receiver(post_save, sender=Team)
+@receiver(post_delete, sender=Team)
+@receiver(post_save, sender=Player)
+@receiver(post_delete, sender=Player)
+def invalidate_scoreboard_snapshot(sender, **kwargs):
+    transaction.on_commit(invalidate_snapshot)
+
+
+# ---- Live scoreboard stream ----
+
+@receiver(post_save, sender=Match)
+@receiver(post_delete, sender=Match)
+def wake_scoreboard_stream(sender, instance, **kwargs):
+    match_id = instance.pk
+    transaction.on_commit(scoreboard_hub.notify)
+    transaction.on_commit(lambda: match_timeline_hub.notify(match_id))
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+def wake_match_timeline(sender, instance, **kwargs):
+    match_id = instance.match_id
+    transaction.on_commit(lambda: match_timeline_hub.notify(match_id))
+
+
+@receiver(match_statuses_changed)
+def wake_scoreboard_stream_on_transition(sender, **kwargs):
+    scoreboard_hub.notify()
+
+
+# ---- Image derivatives ----
+
+@receiver(post_save, sender=Team)
+@receiver(post_save, sender=Player)
+@receiver(post_save, sender=League)
+@receiver(post_save, sender=University)
+def build_image_derivatives(sender, instance, raw=False, **kwargs):
+    """Resize a new or replaced logo/photo once the upload is committed."""
+    if raw:
+        return
+    field_name = images.IMAGE_FIELDS[sender._meta.model_name]
+    fieldfile = getattr(instance, field_name)
+    if fieldfile and not images.is_current(fieldfile):
+        # robust: a missing or unreadable file must not fail the save that already committed
+        transaction.on_commit(lambda: images.schedule(instance, field_name), robust=True)
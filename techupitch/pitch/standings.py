@@ -0,0 +1,162 @@
+from django.db import transaction
+from django.db.models import F
+
+from . import versions
+from .models import League, LeagueStanding, Match
+
+
+def result_rows(league):
+    """Return (home_team_id, away_team_id, home_score, away_score) for every counted match."""
+    return Match.objects.filter(
+        league=league,
+        status='finished',
+        home_score__isnull=False,
+        away_score__isnull=False,
+    ).values_list('home_team_id', 'away_team_id', 'home_score', 'away_score')
+
+
+def empty_row(team):
+    return {
+        'team': team,
+        'played': 0,
+        'wins': 0,
+        'draws': 0,
+        'losses': 0,
+        'goals_for': 0,
+        'goals_against': 0,
+        'goal_difference': 0,
+        'points': 0,
+    }
+
+
+def add_result(row, scored, conceded):
+    """Fold one finished match into a team's row."""
+    row['played'] += 1
+    row['goals_for'] += scored
+    row['goals_against'] += conceded
+    if scored > conceded:
+        row['wins'] += 1
+    elif scored == conceded:
+        row['draws'] += 1
+    else:
+        row['losses'] += 1
+
+
+def sort_table(table):
+    """Order rows by points, goal difference and goals scored, then number them."""
+    table = sorted(table, key=lambda x: (x['points'], x['goal_difference'], x['goals_for']), reverse=True)
+
+    for index, row in enumerate(table):
+        row['position'] = index + 1
+
+    return table
+
+
+def calculate_league_table(league):
+    """Build the whole league table from one fetch of finished match results.
+
+    Only finished matches with both scores recorded are counted. Teams that are
+    no longer attached to the league are ignored.
+    """
+    rows = {team.id: empty_row(team) for team in league.teams.all()}
+
+    for home_id, away_id, home_score, away_score in result_rows(league):
+        if home_id in rows:
+            add_result(rows[home_id], home_score, away_score)
+        if away_id in rows:
+            add_result(rows[away_id], away_score, home_score)
+
+    for row in rows.values():
+        row['goal_difference'] = row['goals_for'] - row['goals_against']
+        row['points'] = (row['wins'] * 3) + row['draws']
+
+    return sort_table(rows.values())
+
+
+def counted_result(league_id, home_team_id, away_team_id, status, home_score, away_score):
+    """Return the result tuple a match contributes to the table, or None if it doesn't count."""
+    if status != 'finished' or home_score is None or away_score is None:
+        return None
+    return (league_id, home_team_id, away_team_id, home_score, away_score)
+
+
+def match_result(match):
+    return counted_result(
+        match.league_id, match.home_team_id, match.away_team_id,
+        match.status, match.home_score, match.away_score,
+    )
+
+
+def _apply_side(league_id, team_id, scored, conceded, sign):
+    won, drawn = scored > conceded, scored == conceded
+    LeagueStanding.objects.filter(league_id=league_id, team_id=team_id).update(
+        played=F('played') + sign,
+        wins=F('wins') + sign * won,
+        draws=F('draws') + sign * drawn,
+        losses=F('losses') + sign * (not won and not drawn),
+        goals_for=F('goals_for') + sign * scored,
+        goals_against=F('goals_against') + sign * conceded,
+        goal_difference=F('goal_difference') + sign * (scored - conceded),
+        points=F('points') + sign * (3 * won + drawn),
+    )
+
+
+def apply_result(result, sign=1):
+    """Add (sign=1) or remove (sign=-1) one result from the two affected standing rows."""
+    if result is None:
+        return
+    league_id, home_id, away_id, home_score, away_score = result
+    _apply_side(league_id, home_id, home_score, away_score, sign)
+    _apply_side(league_id, away_id, away_score, home_score, sign)
+    versions.bump(versions.STANDINGS)
+    versions.bump(versions.league_table(league_id))
+
+
+def rebuild_league_standings(league):
+    """Recompute every standing row of ``league`` from its match results."""
+    with transaction.atomic():
+        table = calculate_league_table(league)
+        LeagueStanding.objects.filter(league=league).delete()
+        LeagueStanding.objects.bulk_create([
+            LeagueStanding(
+                league=league,
+                team=row['team'],
+                played=row['played'],
+                wins=row['wins'],
+                draws=row['draws'],
+                losses=row['losses'],
+                goals_for=row['goals_for'],
+                goals_against=row['goals_against'],
+                goal_difference=row['goal_difference'],
+                points=row['points'],
+            )
+            for row in table
+        ])
+        versions.bump(versions.STANDINGS)
+        versions.bump(versions.league_table(league.pk))
+    return len(table)
+
+
+def rebuild_all_standings(leagues=None):
+    leagues = League.objects.all() if leagues is None else leagues
+    return sum(rebuild_league_standings(league) for league in leagues)
+
+
+def league_table(league):
+    """Read the persisted table for ``league`` in a single ordered query."""
+    standings = LeagueStanding.objects.filter(league=league).select_related('team')
+    table = []
+    for index, standing in enumerate(standings):
+        table.append({
+            'position': index + 1,
+            'team': standing.team,
+            'played': standing.played,
+            'wins': standing.wins,
+            'draws': standing.draws,
+            'losses': standing.losses,
+            'goals_for': standing.goals_for,
+            'goals_against': standing.goals_against,
+            'goal_difference': standing.goal_difference,
+            'points': standing.points,
+        })
+    return table
@@ -0,0 +1,22 @@
+/* Stand-in for bootstrap.bundle.min.js (80 KB): the templates only use the
+   navbar collapse toggle and dismissible alerts, so only those are here. */
+(function () {
+  document.addEventListener('click', function (event) {
+    const toggle = event.target.closest('[data-bs-toggle="collapse"]');
+    if (toggle) {
+      const target = document.querySelector(toggle.dataset.bsTarget || toggle.getAttribute('href'));
+      if (!target) return;
+      event.preventDefault();
+      const open = target.classList.toggle('show');
+      toggle.classList.toggle('collapsed', !open);
+      toggle.setAttribute('aria-expanded', String(open));
+      return;
+    }
+
+    const dismiss = event.target.closest('[data-bs-dismiss="alert"]');
+    if (dismiss) {
+      const alert = dismiss.closest('.alert');
+      if (alert) alert.remove();
+    }
+  });
+})();
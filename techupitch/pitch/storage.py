@@ -0,0 +1,90 @@
+"""Storages that name files after their content.
+
+An upload of ``team_logos/lions.png`` is stored as
+``team_logos/lions.3fa2c9e01b7d.png`` (the first 12 hex digits of its
+SHA-256), so a URL always refers to the same bytes and
+:func:`pitch.media.serve_media` can let browsers cache it forever. Saving
+identical bytes under the same name again reuses the stored file. An upload
+whose name only looks hashed is checked against its own digest first. Static
+files get the same treatment from collectstatic via
+:class:`ManifestStaticStorage`.
+"""
+import hashlib
+import os
+import re
+
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+HASH_LENGTH = 12
+HASHED_NAME = re.compile(r'\.([0-9a-f]{%d})\.[^./]+$' % HASH_LENGTH)
+
+
+@deconstructible
+class HashedFileSystemStorage(FileSystemStorage):
+    """FileSystemStorage that inserts a content hash before the extension.
+
+    ``prehashed_prefixes`` lists directories whose names are already content
+    addressed (e.g. the image derivatives) and are stored unchanged.
+    """
+
+    def __init__(self, *args, prehashed_prefixes=('derivatives/',), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prehashed_prefixes = tuple(prehashed_prefixes)
+
+    def is_content_hashed(self, name):
+        """True when ``name`` can only ever hold one content, so it may be cached indefinitely."""
+        name = name.replace('\\', '/')
+        return name.startswith(self.prehashed_prefixes) or bool(HASHED_NAME.search(name))
+
+    def is_prehashed(self, name):
+        return name.replace('\\', '/').startswith(self.prehashed_prefixes)
+
+    def hashed_name(self, name, content):
+        """``name`` with the digest of ``content`` inserted, unless it already carries exactly that digest."""
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        digest = digest.hexdigest()[:HASH_LENGTH]
+        match = HASHED_NAME.search(name)
+        if match is not None and match.group(1) == digest:
+            return name
+        root, ext = os.path.splitext(name)
+        return f'{root}.{digest}{ext}'
+
+    def get_available_name(self, name, max_length=None):
+        # Names are made unique by their hash in _save, never by a random suffix.
+        name = str(name).replace('\\', '/')
+        extra = 0 if self.is_prehashed(name) else HASH_LENGTH + 1
+        if max_length is not None and len(name) + extra > max_length:
+            directory, filename = os.path.split(name)
+            root, ext = os.path.splitext(filename)
+            root = root[:max(1, max_length - extra - len(ext) - len(directory) - 1)]
+            name = os.path.join(directory, root + ext)
+        return name
+
+    def _save(self, name, content):
+        # only the prehashed directories are trusted; any other name that
+        # looks hashed could be an upload reusing someone else's digest
+        if not self.is_prehashed(name):
+            name = self.hashed_name(name, content)
+        if self.exists(name):
+            return name  # same name, same bytes
+        return super()._save(name, content)
+
+
+class ManifestStaticStorage(CompressedManifestStaticFilesStorage):
+    """Hashed, gzip- and brotli-compressed static files, written by collectstatic.
+
+    A name missing from the manifest (collectstatic not run yet, or a
+    template pointing at a file that doesn't exist) is served under its plain
+    name instead of failing the page.
+    """
+    manifest_strict = True
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            return name
@@ -0,0 +1,69 @@
+"""Response bodies that stay streamed under both ASGI and WSGI.
+
+Under ASGI, Django sends a synchronous iterator by first collecting it with
+``sync_to_async(list)``, holding the whole body in memory (and warning); under
+WSGI an asynchronous iterator is collected the same way. :func:`stream` hands
+ASGI requests an async iterator that pulls one chunk at a time through
+``sync_to_async`` and leaves WSGI requests the plain iterator.
+"""
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+
+FILE_BLOCK_SIZE = 64 * 1024
+
+_DONE = object()
+
+
+def take(iterator, batch):
+    """The next ``batch`` items of ``iterator`` joined into one chunk, or ``_DONE`` when it is exhausted."""
+    parts = []
+    for part in iterator:
+        parts.append(part)
+        if len(parts) == batch:
+            break
+    if not parts:
+        return _DONE
+    return parts[0][:0].join(parts)
+
+
+async def async_chunks(iterable, batch=1):
+    """Iterate ``iterable`` in a worker thread, ``batch`` items per hop, without buffering it."""
+    iterator = iter(iterable)
+    try:
+        while True:
+            chunk = await sync_to_async(take)(iterator, batch)
+            if chunk is _DONE:
+                return
+            yield chunk
+    finally:
+        close = getattr(iterator, 'close', None)
+        if close is not None:
+            await sync_to_async(close)()
+
+
+def stream(request, iterable, batch=1):
+    """The body to give a ``StreamingHttpResponse`` for ``request``."""
+    if isinstance(request, ASGIRequest):
+        return async_chunks(iterable, batch)
+    return iterable
+
+
+def file_chunks(file, start=0, length=None, block_size=None):
+    """Read ``length`` bytes of ``file`` (or up to its end) from ``start``, closing it afterwards."""
+    block_size = block_size or FILE_BLOCK_SIZE
+    with file:
+        file.seek(start)
+        while length is None or length > 0:
+            chunk = file.read(block_size if length is None else min(block_size, length))
+            if not chunk:
+                break
+            if length is not None:
+                length -= len(chunk)
+            yield chunk
+
+
+def stream_file(request, response, file):
+    """Give a ``FileResponse`` on ``file`` an async body under ASGI; WSGI keeps its file wrapper."""
+    if isinstance(request, ASGIRequest):
+        response.streaming_content = async_chunks(file_chunks(file, block_size=response.block_size))
+    return response
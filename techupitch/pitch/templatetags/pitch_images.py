@@ -0,0 +1,40 @@
+from django import template
+from django.utils.html import format_html, format_html_join
+
+from pitch import images
+
+register = template.Library()
+
+
+@register.simple_tag
+def picture(fieldfile, width, **attrs):
+    """Render ``fieldfile`` shown ``width`` CSS pixels wide, picking from its derivatives.
+
+    Usage: ``{% picture team.logo 100 alt=team.name class="rounded-circle" %}``.
+    Extra keyword arguments become ``<img>`` attributes. Falls back to the
+    original file until its derivatives exist.
+    """
+    entries = images.variants(fieldfile)
+    if not entries:
+        return format_html('<img{}>', html_attrs({'src': fieldfile.url, **attrs}))
+
+    sizes = f'{width}px'
+    fallback = images.best_fit(entries, width)
+    img = {
+        'src': fallback['fallback'],
+        'srcset': images.srcset(entries, 'fallback'),
+        'sizes': sizes,
+        'width': fallback['width'],
+        'height': fallback['height'],
+        'loading': 'lazy',
+        'decoding': 'async',
+        **attrs,
+    }
+    return format_html(
+        '<picture><source type="image/webp" srcset="{}" sizes="{}"><img{}></picture>',
+        images.srcset(entries, 'webp'), sizes, html_attrs(img),
+    )
+
+
+def html_attrs(attrs):
+    return format_html_join('', ' {}="{}"', ((name.replace('_', '-'), value) for name, value in attrs.items()))
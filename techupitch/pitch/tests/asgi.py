@@ -0,0 +1,32 @@
+"""Run one request through Django's ASGI handler, as uvicorn does."""
+import warnings
+from collections import namedtuple
+
+from asgiref.testing import ApplicationCommunicator
+from django.core.handlers.asgi import ASGIHandler
+
+AsgiResponse = namedtuple('AsgiResponse', ['status', 'headers', 'chunks', 'warnings'])
+
+
+async def asgi_get(path, query='', headers=()):
+    """GET ``path`` and return its status, headers, body messages and any warnings raised."""
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+        'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': query.encode(),
+        'root_path': '', 'client': ('127.0.0.1', 40000), 'server': ('testserver', 80),
+        'headers': [(b'host', b'testserver')] + [(name.encode(), value.encode()) for name, value in headers],
+    }
+    communicator = ApplicationCommunicator(ASGIHandler(), scope)
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter('always')
+        await communicator.send_input({'type': 'http.request', 'body': b''})
+        start = await communicator.receive_output(timeout=10)
+        chunks = []
+        while True:
+            message = await communicator.receive_output(timeout=10)
+            chunks.append(message.get('body', b''))
+            if not message.get('more_body'):
+                break
+        await communicator.wait(timeout=10)
+    headers = {name.decode().lower(): value.decode() for name, value in start['headers']}
+    return AsgiResponse(start['status'], headers, chunks, [str(warning.message) for warning in caught])
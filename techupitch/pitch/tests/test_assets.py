@@ -0,0 +1,65 @@
+import io
+import shutil
+import tempfile
+
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.template import Context, Template
+from django.test import SimpleTestCase, override_settings
+
+from pitch import assets
+
+CSS = (
+    '@charset "UTF-8";/*! banner */'
+    ':root{--bs-blue:#0d6efd}body{margin:0}'
+    '.btn,.carousel{display:inline-block}.modal{display:none}'
+    '.btn:not(.collapsed){color:red}'
+    '@media (min-width:768px){.col-md-4{flex:0 0 auto}.modal-lg{width:800px}}'
+    '@media print{.d-print-none{display:none!important}}'
+    '@keyframes spin{to{transform:rotate(360deg)}}'
+)
+
+
+class TrimCssTest(SimpleTestCase):
+    def test_keeps_only_used_classes(self):
+        trimmed = assets.trim_css(CSS, {'btn', 'col-md-4'})
+        self.assertEqual(trimmed, (
+            '@charset "UTF-8";/*! banner */:root{--bs-blue:#0d6efd}body{margin:0}'
+            '.btn{display:inline-block}.btn:not(.collapsed){color:red}'
+            '@media (min-width:768px){.col-md-4{flex:0 0 auto}}'
+            '@keyframes spin{to{transform:rotate(360deg)}}'
+        ))
+
+    def test_page_assets(self):
+        html = ('<link rel="stylesheet" href="/static/css/a.1234567890ab.css"><script src="/static/js/b.js" defer>'
+                '</script><img src="/media/x.png"><img src="/static/css/a.1234567890ab.css">')
+        self.assertEqual(assets.page_assets(html, '/static/'), ['css/a.1234567890ab.css', 'js/b.js'])
+        self.assertEqual(assets.unhashed('css/a.1234567890ab.css'), 'css/a.css')
+
+    def test_committed_trimmed_css_is_current(self):
+        # fails when a template starts using a class the trimmed build dropped
+        call_command('trim_bootstrap_css', '--check', stdout=io.StringIO())
+
+
+class StaticPipelineTest(SimpleTestCase):
+    def test_missing_manifest_entries_fall_back_to_plain_names(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root, ignore_errors=True)
+        with override_settings(STATIC_ROOT=root):
+            html = Template("{% load static %}{% static 'css/nope.css' %}").render(Context())
+        self.assertEqual(html, '/static/css/nope.css')
+
+    def test_collected_files_are_hashed_compressed_and_immutable(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root, ignore_errors=True)
+        with override_settings(STATIC_ROOT=root):
+            call_command('collectstatic', interactive=False, verbosity=0,
+                         ignore_patterns=['admin', 'rest_framework', 'images', '*.amr'])
+            url = staticfiles_storage.url(assets.TRIMMED_CSS)
+            self.assertRegex(url, r'^/static/bootstrap/css/bootstrap\.trimmed\.min\.[0-9a-f]{12}\.css$')
+
+            response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip, br')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response['Content-Encoding'], 'br' if assets.brotli else 'gzip')
+            self.assertIn('immutable', response['Cache-Control'])
+            self.assertIn('max-age=315360000', response['Cache-Control'])
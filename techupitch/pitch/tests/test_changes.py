@@ -0,0 +1,112 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from pitch import changes, versions
+from pitch.models import Event, League, Match, MatchChange, Sport, Team
+from pitch.scheduling import Fixture, create_fixtures
+from pitch.seeding import seed
+
+
+class ChangeFeedTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        sport = Sport.objects.create(name='Football')
+        cls.league = League.objects.create(name='Campus League', sport=sport)
+        cls.lions = Team.objects.create(name='Lions', sport=sport)
+        cls.tigers = Team.objects.create(name='Tigers', sport=sport)
+
+    def make_match(self, minutes_ago=0, **fields):
+        return Match.objects.create(league=self.league, home_team=self.lions, away_team=self.tigers,
+                                    start_time=timezone.now() - timedelta(minutes=minutes_ago), **fields)
+
+    def since_now(self):
+        return versions.current(versions.CHANGES)
+
+    def test_writes_are_logged_in_order(self):
+        since = self.since_now()
+        match = self.make_match()
+        event = Event.objects.create(match=match, team=self.lions, event_type='Goal', event_time=timezone.now())
+        match.home_score = 1
+        match.save()
+        event_id = event.pk
+        event.delete()
+
+        result = changes.feed(since, 100)
+        self.assertFalse(result['resync'])
+        self.assertEqual([(entry['kind'], entry['action'], entry['id']) for entry in result['changes']], [
+            ('match', 'created', match.pk),
+            ('event', 'created', event_id),
+            ('match', 'updated', match.pk),
+            ('event', 'deleted', event_id),
+        ])
+        self.assertEqual(result['changes'][2]['data']['home_score'], 1)
+        self.assertEqual(result['changes'][3]['data']['match'], match.pk)
+        self.assertEqual(result['version'], result['changes'][-1]['version'])
+        self.assertEqual(changes.feed(result['version'], 100)['changes'], [])
+
+    def test_rolled_back_write_leaves_no_entry(self):
+        since = self.since_now()
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            self.make_match()
+            raise RuntimeError
+        self.assertEqual(self.since_now(), since)
+        self.assertFalse(MatchChange.objects.filter(version__gt=since).exists())
+
+    def test_bulk_writes_are_logged(self):
+        kickoff = self.make_match(minutes_ago=5)
+        since = self.since_now()
+        Match.objects.update_statuses()
+        fixtures = create_fixtures(self.league, [Fixture(1, self.tigers, self.lions, timezone.now())])
+
+        entries = changes.feed(since, 100)['changes']
+        self.assertEqual([(entry['action'], entry['id']) for entry in entries],
+                         [('updated', kickoff.pk), ('created', fixtures[0].pk)])
+        self.assertEqual(entries[0]['data']['status'], 'live')
+
+    def test_pages_follow_the_limit(self):
+        since = self.since_now()
+        for _ in range(3):
+            self.make_match()
+        first = changes.feed(since, 2)
+        self.assertTrue(first['more'])
+        self.assertEqual(len(first['changes']), 2)
+        second = changes.feed(first['version'], 2)
+        self.assertFalse(second['more'])
+        self.assertEqual(len(second['changes']), 1)
+
+    def test_resync_after_compaction(self):
+        self.assertTrue(changes.feed(None, 10)['resync'])
+        old = self.since_now()
+        self.make_match()
+        MatchChange.objects.update(changed_at=timezone.now() - timedelta(days=30))
+        recent = self.since_now()
+        self.make_match()
+
+        out = StringIO()
+        call_command('compact_match_changes', days=7, stdout=out)
+        self.assertIn('Deleted 1 change feed entries.', out.getvalue())
+        self.assertTrue(changes.feed(old, 10)['resync'])
+        result = changes.feed(recent, 10)
+        self.assertFalse(result['resync'])
+        self.assertEqual(len(result['changes']), 1)
+
+    def test_seeding_asks_for_resync(self):
+        since = self.since_now()
+        seed(prefix='Seeded', universities=1, leagues_per_university=1, teams_per_league=2,
+             players_per_team=1, matches=2, events_per_match=1)
+        self.assertTrue(changes.feed(since, 10)['resync'])
+
+    def test_endpoint(self):
+        since = self.since_now()
+        match = self.make_match()
+        response = self.client.get(reverse('change-feed'), {'since': since})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['changes'][0]['id'], match.pk)
+        self.assertIn('no-cache', response['Cache-Control'])
+        self.assertEqual(self.client.get(reverse('change-feed'), {'since': 'x'}).status_code, 400)
@@ -0,0 +1,129 @@
+import csv
+import io
+import os
+import tempfile
+from datetime import datetime, timezone as dt_timezone
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+from openpyxl import load_workbook
+
+from pitch import exports
+from pitch.models import Event, League, Match, Player, Sport, Team, University
+from pitch.tests.asgi import asgi_get
+
+
+class ExportTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        sport = Sport.objects.create(name='Football')
+        cls.tech = University.objects.create(name='First Technical University', short_name='Tech-U')
+        cls.league = League.objects.create(name='Campus League', sport=sport, university=cls.tech)
+        cls.other = League.objects.create(name='City League', sport=sport)
+        lions = Team.objects.create(name='Lions', sport=sport, university=cls.tech)
+        tigers = Team.objects.create(name='Tigers', sport=sport)
+        lions.league.add(cls.league)
+        cls.ada = Player.objects.create(name='Ada', dept='CSC', team=lions, university=cls.tech,
+                                        position='FW', jersey_number=9)
+        Player.objects.create(name='Bola', dept='EEE', team=tigers, position='GK', jersey_number=1)
+
+        january = datetime(2024, 1, 6, 15, 0, tzinfo=dt_timezone.utc)
+        cls.first = Match.objects.create(league=cls.league, home_team=lions, away_team=tigers, start_time=january)
+        Match.objects.create(league=cls.league, home_team=tigers, away_team=lions,
+                             start_time=datetime(2024, 3, 6, 15, 0, tzinfo=dt_timezone.utc))
+        Match.objects.create(league=cls.other, home_team=tigers, away_team=lions, start_time=january)
+        Event.objects.create(match=cls.first, team=lions, player_name=cls.ada, event_type='Goal', event_time=january)
+        cls.staff = User.objects.create_user('staff', password='secret', is_staff=True)
+
+    def streamed_csv(self, url):
+        self.client.force_login(self.staff)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return list(csv.reader(io.StringIO(b''.join(response.streaming_content).decode())))
+
+    def test_matches_csv_with_filters(self):
+        rows = self.streamed_csv(reverse('export-data', args=['matches']) + f'?league={self.league.pk}')
+        self.assertEqual(rows[0], exports.header('matches'))
+        self.assertEqual([row[3] for row in rows[1:]], ['Lions', 'Tigers'])
+
+        rows = self.streamed_csv(reverse('export-data', args=['matches']) + '?date_from=2024-01-01&date_to=2024-01-31')
+        self.assertEqual(len(rows), 3)
+
+        rows = self.streamed_csv(reverse('export-data', args=['matches']) + f'?university={self.tech.pk}')
+        self.assertEqual(len(rows), 3)
+
+    def test_events_and_players(self):
+        events = self.streamed_csv(reverse('export-data', args=['events']))
+        self.assertEqual(events[1][6:9], ['Goal', 'Lions', 'Ada'])
+
+        players = self.streamed_csv(reverse('export-data', args=['players']) + f'?league={self.league.pk}')
+        self.assertEqual([row[1] for row in players[1:]], ['Ada'])
+
+    def test_xlsx(self):
+        self.client.force_login(self.staff)
+        response = self.client.get(reverse('export-data', args=['matches']) + '?format=xlsx')
+        self.assertIn('.xlsx', response['Content-Disposition'])
+
+        workbook = load_workbook(io.BytesIO(b''.join(response.streaming_content)), read_only=True)
+        values = list(workbook.active.iter_rows(values_only=True))
+        self.assertEqual(list(values[0]), exports.header('matches'))
+        self.assertEqual(len(values), 4)
+        self.assertIsInstance(values[1][5], datetime)
+
+    def test_staff_only_and_bad_filters(self):
+        self.assertEqual(self.client.get(reverse('export-data', args=['matches'])).status_code, 302)
+        self.client.force_login(self.staff)
+        self.assertEqual(self.client.get(reverse('export-data', args=['teams'])).status_code, 404)
+        response = self.client.get(reverse('export-data', args=['matches']) + '?date_from=2024-02-01&date_to=2024-01-01')
+        self.assertEqual(response.status_code, 400)
+
+    def test_rows_are_read_in_chunks(self):
+        queryset = exports.export_queryset('matches')
+        with self.assertNumQueries(1):
+            self.assertEqual(len(list(exports.rows(queryset, chunk_size=1))), 3)
+
+    def test_command(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'events.xlsx')
+            call_command('export_pitch_data', 'events', '--output', path, '--from', '2024-01-01', stdout=io.StringIO())
+            rows = list(load_workbook(path, read_only=True).active.iter_rows(values_only=True))
+        self.assertEqual(len(rows), 2)
+
+        out = io.StringIO()
+        call_command('export_pitch_data', 'players', '--university', str(self.tech.pk), stdout=out)
+        self.assertEqual(len(out.getvalue().splitlines()), 2)
+
+
+class AsgiExportTest(TransactionTestCase):
+    """Exports under the ASGI handler; its request threads need committed data."""
+
+    def setUp(self):
+        sport = Sport.objects.create(name='Football')
+        league = League.objects.create(name='Campus League', sport=sport)
+        lions = Team.objects.create(name='Lions', sport=sport)
+        tigers = Team.objects.create(name='Tigers', sport=sport)
+        for day in (6, 13, 20):
+            Match.objects.create(league=league, home_team=lions, away_team=tigers,
+                                 start_time=datetime(2024, 1, day, 15, 0, tzinfo=dt_timezone.utc))
+        self.staff = User.objects.create_user('staff', password='secret', is_staff=True)
+
+    async def test_asgi_streams_without_buffering(self):
+        await self.async_client.aforce_login(self.staff)
+        cookie = f'sessionid={self.async_client.cookies["sessionid"].value}'
+        path = reverse('export-data', args=['matches'])
+
+        with mock.patch.object(exports, 'CHUNK_SIZE', 1):  # one CSV line per body message
+            response = await asgi_get(path, headers=[('cookie', cookie)])
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.warnings, [])
+        self.assertEqual(len([chunk for chunk in response.chunks if chunk]), 4)
+        self.assertEqual(b''.join(response.chunks).decode().splitlines()[0], ','.join(exports.header('matches')))
+
+        response = await asgi_get(path, query='format=xlsx', headers=[('cookie', cookie)])
+        self.assertEqual(response.warnings, [])
+        workbook = load_workbook(io.BytesIO(b''.join(response.chunks)), read_only=True)
+        self.assertEqual(len(list(workbook.active.iter_rows(values_only=True))), 4)
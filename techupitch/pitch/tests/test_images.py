@@ -0,0 +1,147 @@
+import io
+import shutil
+import tempfile
+from concurrent.futures import Future
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.template import Context, Template
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+from PIL import Image
+
+from pitch import images
+from pitch.models import Sport, Team
+
+
+def image_bytes(size=(800, 600), mode='RGB', fmt='PNG'):
+    buffer = io.BytesIO()
+    Image.new(mode, size, (200, 30, 30, 128) if mode == 'RGBA' else (200, 30, 30)).save(buffer, fmt)
+    return buffer.getvalue()
+
+
+class DeriveTest(SimpleTestCase):
+    def test_widths_formats_and_no_upscaling(self):
+        digest, size, variants = images.derive(image_bytes((800, 600)), (48, 96, 1000), 80)
+        self.assertEqual(size, (800, 600))
+        self.assertEqual([(w, h) for w, h, _ in variants], [(48, 36), (96, 72), (800, 600)])
+        self.assertEqual(sorted(variants[0][2]), ['jpg', 'webp'])
+        with Image.open(io.BytesIO(variants[1][2]['webp'])) as webp:
+            self.assertEqual((webp.format, webp.size), ('WEBP', (96, 72)))
+
+    def test_transparency_keeps_png(self):
+        _, _, variants = images.derive(image_bytes((100, 100), 'RGBA'), (48,), 80)
+        self.assertEqual(sorted(variants[0][2]), ['png', 'webp'])
+
+    def test_digest_follows_content(self):
+        first = images.derive(image_bytes(), (48,), 80)[0]
+        self.assertEqual(first, images.derive(image_bytes(), (48,), 80)[0])
+        self.assertNotEqual(first, images.derive(image_bytes((801, 600)), (48,), 80)[0])
+
+
+class DerivativePipelineTest(TransactionTestCase):
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media, IMAGE_DERIVATIVE_WIDTHS=(48, 96, 160))
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.sport = Sport.objects.create(name='Football')
+
+        self.scheduled = []
+        schedule = images.schedule
+
+        def record(*args):
+            self.scheduled.append(schedule(*args))
+            return self.scheduled[-1]
+
+        patcher = mock.patch.object(images, 'schedule', side_effect=record)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def upload(self, name='lions.png', content=None):
+        team = Team.objects.create(name='Lions', sport=self.sport,
+                                   logo=SimpleUploadedFile(name, content or image_bytes(), 'image/png'))
+        for future in self.scheduled:
+            future.result(timeout=30)
+        team.refresh_from_db()
+        return team
+
+    def test_upload_builds_content_hashed_derivatives(self):
+        team = self.upload()
+        record = team.logo_derivatives
+        self.assertEqual(record['source'], team.logo.name)
+        self.assertEqual([v['width'] for v in record['variants']], [48, 96, 160])
+        self.assertTrue(record['variants'][0]['webp'].endswith(f"{record['digest']}-48.webp"))
+        self.assertTrue(images.is_current(team.logo))
+
+        # same bytes under another name reuse the same files
+        other = self.upload('copy.png')
+        self.assertEqual(other.logo_derivatives['variants'], record['variants'])
+
+        # unrelated saves don't rebuild
+        scheduled = len(self.scheduled)
+        team.name = 'Lionesses'
+        team.save()
+        self.assertEqual(len(self.scheduled), scheduled)
+
+    def test_picture_tag_and_api_field(self):
+        team = self.upload()
+        html = Template('{% load pitch_images %}{% picture team.logo 40 alt="Lions" class="logo" %}').render(
+            Context({'team': team}))
+        self.assertIn('<source type="image/webp" srcset="/media/derivatives/', html)
+        self.assertIn('-96.webp 96w', html)
+        self.assertIn('sizes="40px"', html)
+        self.assertIn('-96.jpg"', html)  # 2x of 40px
+        self.assertIn('alt="Lions" class="logo"', html)
+
+        response = self.client.get(f'/api/teams/{team.pk}/')
+        derivatives = response.json()['logo_derivatives']
+        self.assertTrue(derivatives['webp_srcset'].startswith('http://testserver/media/derivatives/'))
+        self.assertEqual(len(derivatives['variants']), 3)
+
+    def test_stale_derivatives_fall_back_to_the_original(self):
+        team = self.upload()
+        Team.objects.filter(pk=team.pk).update(logo='team_logos/replaced.png')
+        team.refresh_from_db()
+        html = Template('{% load pitch_images %}{% picture team.logo 40 %}').render(Context({'team': team}))
+        self.assertEqual(html, '<img src="/media/team_logos/replaced.png">')
+
+    def test_backfill_command(self):
+        team = self.upload()
+        Team.objects.filter(pk=team.pk).update(logo_derivatives={})
+        out = io.StringIO()
+        call_command('build_image_derivatives', '--model', 'team', stdout=out, stderr=io.StringIO())
+        self.assertIn('Built derivatives for 1 images (0 failed)', out.getvalue())
+        team.refresh_from_db()
+        self.assertTrue(images.is_current(team.logo))
+
+        out = io.StringIO()
+        call_command('build_image_derivatives', stdout=out)
+        self.assertIn('for 0 images', out.getvalue())
+
+    @override_settings(IMAGE_WORKERS=1)
+    def test_backfill_keeps_a_bounded_number_in_flight(self):
+        for number in range(5):
+            self.upload(f'team-{number}.png', image_bytes((100 + number, 100)))
+        Team.objects.update(logo_derivatives={})
+
+        created, collected, in_flight = [], [], []
+
+        class Tracked(Future):
+            def result(self, timeout=None):
+                collected.append(self)
+                return super().result(timeout)
+
+        def schedule(instance, field_name):
+            future = Tracked()
+            future.set_result({})
+            created.append(future)
+            in_flight.append(len(created) - len(collected))
+            return future
+
+        out = io.StringIO()
+        with mock.patch.object(images, 'schedule', side_effect=schedule):
+            call_command('build_image_derivatives', '--model', 'team', stdout=out)
+        self.assertIn('Built derivatives for 5 images (0 failed)', out.getvalue())
+        self.assertEqual(max(in_flight), 2)
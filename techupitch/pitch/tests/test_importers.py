@@ -0,0 +1,158 @@
+import io
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from openpyxl import Workbook
+
+from pitch.importers import import_file
+from pitch.models import League, LeagueStanding, Match, Player, Sport, Team, University
+
+
+def csv_file(*lines):
+    return io.BytesIO('\n'.join(lines).encode())
+
+
+def xlsx_file(rows):
+    workbook = Workbook()
+    for row in rows:
+        workbook.active.append(row)
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    buffer.seek(0)
+    return buffer
+
+
+class ImportTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.sport = Sport.objects.create(name='Football')
+        cls.tech = University.objects.create(name='First Technical University', short_name='Tech-U')
+        cls.unilag = University.objects.create(name='University of Lagos', short_name='UNILAG')
+        cls.league = League.objects.create(name='Campus League', sport=cls.sport)
+        cls.lions = Team.objects.create(name='Lions', sport=cls.sport, university=cls.tech)
+        cls.tigers = Team.objects.create(name='Tigers', sport=cls.sport, university=cls.unilag)
+        cls.league.teams.add(cls.lions, cls.tigers)
+
+    def test_players_upsert_on_team_and_jersey(self):
+        Player.objects.create(name='Old Name', dept='CSC', team=self.lions, jersey_number=9)
+        result = import_file('players', csv_file(
+            'Name,Team,Dept,Position,Jersey Number,Date of Birth',
+            'Ada Obi,Lions,CSC,fw,9,2003-04-01',
+            'Bola Ade,Lions,EEE,GK,1,',
+            'Chi Eze,Tigers,MEC,MF,,',
+        ), 'players.csv')
+
+        self.assertEqual((result.created, result.updated, result.error_count), (2, 1, 0))
+        striker = Player.objects.get(team=self.lions, jersey_number=9)
+        self.assertEqual((striker.name, striker.position, str(striker.date_of_birth)), ('Ada Obi', 'FW', '2003-04-01'))
+        self.assertEqual(striker.university, self.tech)  # taken from the team
+        self.assertEqual(Player.objects.get(name='Chi Eze').university, self.unilag)
+
+        import_file('players', csv_file('name,team,dept,position,jersey_number', 'Ada Obi,Lions,CSC,FW,9'),
+                    'players.csv')
+        self.assertEqual(Player.objects.filter(team=self.lions, jersey_number=9).count(), 1)
+
+    def test_bad_rows_are_reported_and_skipped(self):
+        result = import_file('players', csv_file(
+            'name,team,dept,position,jersey_number',
+            'Ada Obi,Lions,CSC,FW,9',
+            'No Team,Eagles,CSC,FW,2',
+            'Bad Number,Lions,CSC,FW,nine',
+            'Bad Position,Lions,CSC,Striker,3',
+            ',Lions,CSC,FW,4',
+        ), 'players.csv')
+
+        self.assertEqual(result.created, 1)
+        self.assertEqual([number for number, _ in result.errors], [3, 4, 5, 6])
+        self.assertIn("Unknown team 'Eagles'", result.errors[0][1])
+        self.assertIn('position', result.errors[2][1])
+
+    def test_non_finite_numbers_are_row_errors(self):
+        result = import_file('players', csv_file(
+            'name,team,dept,position,jersey_number',
+            'Inf Number,Lions,CSC,FW,inf',
+            'NaN Number,Lions,CSC,FW,nan',
+            'Ada Obi,Lions,CSC,FW,9',
+        ), 'players.csv')
+
+        self.assertEqual(result.created, 1)
+        self.assertEqual([number for number, _ in result.errors], [2, 3])
+        self.assertIn('whole number', result.errors[0][1])
+
+    def test_names_are_looked_up_once_per_distinct_value(self):
+        lines = ['name,team,dept,position,jersey_number']
+        lines += [f'Player {n},{"Lions" if n % 2 else "Tigers"},CSC,MF,{n}' for n in range(1, 61)]
+        with CaptureQueriesContext(connection) as queries:
+            result = import_file('players', csv_file(*lines), 'players.csv', batch_size=20)
+
+        self.assertEqual(result.created, 60)
+        team_lookups = [q for q in queries if 'FROM "pitch_team" WHERE' in q['sql']]
+        self.assertEqual(len(team_lookups), 1)
+        self.assertLess(len(queries), 30)  # a handful per batch, none per row
+
+    def test_ambiguous_team_needs_university(self):
+        Team.objects.create(name='Lions', sport=self.sport, university=self.unilag)
+        result = import_file('players', csv_file(
+            'name,team,university,dept,position,jersey_number',
+            'Ada Obi,Lions,,CSC,FW,9',
+            'Bola Ade,Lions,UNILAG,CSC,FW,9',
+        ), 'players.csv')
+        self.assertEqual(result.created, 1)
+        self.assertIn('ambiguous', result.errors[0][1])
+
+    def test_xlsx_teams_with_leagues(self):
+        result = import_file('teams', xlsx_file([
+            ['Name', 'Sport', 'University', 'Leagues'],
+            ['Eagles', 'Football', 'Tech-U', 'Campus League'],
+            ['Lions', 'Football', 'First Technical University', 'Campus League'],
+            [None, None, None, None],
+        ]), 'teams.xlsx')
+
+        self.assertEqual((result.rows, result.created, result.updated), (2, 1, 1))
+        eagles = Team.objects.get(name='Eagles')
+        self.assertEqual(eagles.university, self.tech)
+        self.assertIn(self.league, eagles.league.all())
+        self.assertTrue(LeagueStanding.objects.filter(league=self.league, team=eagles).exists())
+
+    def test_fixtures_update_scores_and_standings(self):
+        Match.objects.create(league=self.league, home_team=self.lions, away_team=self.tigers,
+                             start_time='2024-01-06T15:00:00Z')
+        result = import_file('fixtures', csv_file(
+            'league,home_team,away_team,start_time,home_score,away_score',
+            'Campus League,Lions,Tigers,2024-01-06 15:00,2,1',
+            'Campus League,Tigers,Lions,2024-02-06 15:00,,',
+            'Campus League,Lions,Lions,2024-03-06 15:00,,',
+        ), 'fixtures.csv')
+
+        self.assertEqual((result.created, result.updated, result.error_count), (1, 1, 1))
+        self.assertEqual(Match.objects.get(home_team=self.lions).home_score, 2)
+
+    def test_dry_run_saves_nothing(self):
+        result = import_file('players', csv_file('name,team,dept,position,jersey_number', 'Ada Obi,Lions,CSC,FW,9'),
+                             'players.csv', dry_run=True)
+        self.assertEqual(result.created, 1)
+        self.assertFalse(Player.objects.exists())
+
+    def test_staff_upload(self):
+        staff = User.objects.create_user('staff', password='secret', is_staff=True)
+        self.client.force_login(staff)
+        upload = SimpleUploadedFile('players.csv', b'name,team,dept,position,jersey_number\nAda Obi,Lions,CSC,FW,9\n')
+        response = self.client.post(reverse('import-data'), {'kind': 'players', 'file': upload})
+
+        self.assertEqual(response.context['result'].created, 1)
+        self.assertTrue(Player.objects.filter(name='Ada Obi').exists())
+
+    def test_broken_files_are_form_errors(self):
+        self.client.force_login(User.objects.create_user('staff', password='secret', is_staff=True))
+        truncated = xlsx_file([['name', 'sport'], ['Eagles', 'Football']]).getvalue()[:200]
+        for upload in (SimpleUploadedFile('teams.xlsx', b'not a zip'),
+                       SimpleUploadedFile('teams.xlsx', truncated),
+                       SimpleUploadedFile('teams.csv', b'name,sport\n"Ea' + b'x' * 200000 + b'\n')):
+            response = self.client.post(reverse('import-data'), {'kind': 'teams', 'file': upload})
+            self.assertEqual(response.status_code, 200)
+            self.assertIn('Could not read the file', response.context['form'].errors['file'][0])
+        self.assertFalse(Team.objects.filter(name__startswith='Ea').exists())
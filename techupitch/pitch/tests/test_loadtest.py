@@ -0,0 +1,54 @@
+import asyncio
+
+from django.contrib.auth.models import User
+from django.test import LiveServerTestCase, SimpleTestCase
+from django.utils import timezone
+
+from pitch import loadtest
+from pitch.models import League, Match, Sport, Team
+
+
+class LoadTestHelpersTest(SimpleTestCase):
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(loadtest.percentile(values, 0.50), 50)
+        self.assertEqual(loadtest.percentile(values, 0.99), 99)
+        self.assertEqual(loadtest.percentile([7], 0.95), 7)
+        self.assertIsNone(loadtest.percentile([], 0.5))
+
+    def test_query_rates_from_metrics_scrapes(self):
+        before = loadtest.parse_metrics(
+            'upitch_http_requests_total{view="ajax-matches"} 10\n'
+            'upitch_db_queries_total{view="ajax-matches"} 20\n'
+        )
+        after = loadtest.parse_metrics(
+            '# TYPE upitch_http_requests_total counter\n'
+            'upitch_http_requests_total{view="ajax-matches"} 110\n'
+            'upitch_http_requests_total{view="index"} 3\n'
+            'upitch_db_queries_total{view="ajax-matches"} 70\n'
+            'upitch_db_queries_total{view="index"} 18\n'
+        )
+        rows = loadtest.metrics_delta(before, after, seconds=10)
+        self.assertEqual(rows['ajax-matches'], {'requests': 100, 'queries': 50,
+                                                'queries_per_request': 0.5, 'queries_per_second': 5.0})
+        self.assertEqual(rows['index']['queries_per_request'], 6.0)
+
+
+class LoadTestRunTest(LiveServerTestCase):
+    def test_pollers_and_score_updates(self):
+        sport = Sport.objects.create(name='Football')
+        league = League.objects.create(name='Campus League', sport=sport)
+        lions = Team.objects.create(name='Lions', sport=sport)
+        tigers = Team.objects.create(name='Tigers', sport=sport)
+        match = Match.objects.create(league=league, home_team=lions, away_team=tigers, start_time=timezone.now())
+        User.objects.create_user('staff', password='secret', is_staff=True)
+
+        report = asyncio.run(loadtest.run(self.live_server_url, pollers=5, duration=1, poll_interval=0.2,
+                                          update_interval=0.2, staff_user='staff', staff_password='secret'))
+
+        self.assertGreater(report['polls']['requests'], 5)
+        self.assertEqual(report['polls']['errors'], 0)
+        self.assertGreater(report['updates']['requests'], 0)
+        self.assertEqual(report['updates']['errors'], 0)
+        match.refresh_from_db()
+        self.assertGreater(match.home_score, 0)
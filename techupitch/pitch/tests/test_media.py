@@ -0,0 +1,151 @@
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.test import SimpleTestCase, override_settings
+from django.utils.http import http_date
+
+from pitch import streaming
+from pitch.media import byte_range
+from pitch.tests.asgi import asgi_get
+from pitch.storage import HashedFileSystemStorage
+
+CONTENT = b'0123456789abcdefghij'
+
+
+class HashedStorageTest(SimpleTestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+        self.storage = HashedFileSystemStorage(location=self.root)
+
+    def test_names_follow_content(self):
+        name = self.storage.save('team_logos/lions.png', ContentFile(b'lions'))
+        self.assertRegex(name, r'^team_logos/lions\.[0-9a-f]{12}\.png$')
+        self.assertTrue(self.storage.is_content_hashed(name))
+
+        # same bytes: same file, nothing new written
+        self.assertEqual(self.storage.save('team_logos/lions.png', ContentFile(b'lions')), name)
+        self.assertEqual(os.listdir(os.path.join(self.root, 'team_logos')), [os.path.basename(name)])
+
+        other = self.storage.save('team_logos/lions.png', ContentFile(b'new lions'))
+        self.assertNotEqual(other, name)
+        with self.storage.open(name) as file:
+            self.assertEqual(file.read(), b'lions')
+
+    def test_names_that_only_look_hashed_are_hashed(self):
+        first = self.storage.save('team_logos/x.aaaaaaaaaaaa.png', ContentFile(b'first'))
+        second = self.storage.save('team_logos/x.aaaaaaaaaaaa.png', ContentFile(b'second'))
+        self.assertNotEqual(first, second)
+        with self.storage.open(second) as file:
+            self.assertEqual(file.read(), b'second')
+
+        # a stored name saved again with its own bytes keeps its name
+        self.assertEqual(self.storage.save(second, ContentFile(b'second')), second)
+
+    def test_prehashed_and_long_names(self):
+        self.assertEqual(self.storage.save('derivatives/ab/abcd-48.webp', ContentFile(b'x')), 'derivatives/ab/abcd-48.webp')
+        self.assertEqual(self.storage.save('derivatives/ab/abcd-48.webp', ContentFile(b'x')), 'derivatives/ab/abcd-48.webp')
+        self.assertFalse(self.storage.is_content_hashed('team_logos/lions.png'))
+
+        name = self.storage.save('team_logos/' + 'x' * 120 + '.png', ContentFile(b'long'), max_length=100)
+        self.assertLessEqual(len(name), 100)
+        self.assertTrue(self.storage.is_content_hashed(name))
+
+
+class ByteRangeTest(SimpleTestCase):
+    def test_parse(self):
+        self.assertEqual(byte_range('bytes=0-9', 20), (0, 9))
+        self.assertEqual(byte_range('bytes=15-', 20), (15, 19))
+        self.assertEqual(byte_range('bytes=10-100', 20), (10, 19))
+        self.assertEqual(byte_range('bytes=-5', 20), (15, 19))
+        self.assertIsNone(byte_range(None, 20))
+        self.assertIsNone(byte_range('bytes=0-1,5-6', 20))
+        for header in ('bytes=20-', 'bytes=5-4', 'bytes=-0'):
+            with self.assertRaises(ValueError):
+                byte_range(header, 20)
+
+
+class ServeMediaTest(SimpleTestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        storage = HashedFileSystemStorage(location=self.root)
+        self.hashed = storage.save('team_logos/lions.png', ContentFile(CONTENT))
+        os.makedirs(os.path.join(self.root, 'legacy'))
+        with open(os.path.join(self.root, 'legacy', 'old.png'), 'wb') as file:
+            file.write(CONTENT)
+
+    def test_hashed_file_is_immutable(self):
+        response = self.client.get(f'/media/{self.hashed}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), CONTENT)
+        self.assertEqual(response['Content-Type'], 'image/png')
+        self.assertEqual(response['Cache-Control'], 'public, max-age=31536000, immutable')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+
+        legacy = self.client.get('/media/legacy/old.png')
+        self.assertEqual(legacy['Cache-Control'], 'public, max-age=0, must-revalidate')
+
+    def test_conditional_requests(self):
+        response = self.client.get(f'/media/{self.hashed}')
+        etag, last_modified = response['ETag'], response['Last-Modified']
+
+        not_modified = self.client.get(f'/media/{self.hashed}', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified['ETag'], etag)
+        self.assertIn('immutable', not_modified['Cache-Control'])
+
+        self.assertEqual(self.client.get(f'/media/{self.hashed}', HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 304)
+        self.assertEqual(self.client.get(f'/media/{self.hashed}', HTTP_IF_MODIFIED_SINCE=http_date(0)).status_code, 200)
+
+    def test_ranges(self):
+        url = f'/media/{self.hashed}'
+        response = self.client.get(url, HTTP_RANGE='bytes=2-5')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b''.join(response.streaming_content), b'2345')
+        self.assertEqual(response['Content-Range'], f'bytes 2-5/{len(CONTENT)}')
+        self.assertEqual(response['Content-Length'], '4')
+
+        self.assertEqual(b''.join(self.client.get(url, HTTP_RANGE='bytes=-3').streaming_content), b'hij')
+
+        unsatisfiable = self.client.get(url, HTTP_RANGE='bytes=100-')
+        self.assertEqual(unsatisfiable.status_code, 416)
+        self.assertEqual(unsatisfiable['Content-Range'], f'bytes */{len(CONTENT)}')
+
+        # a stale If-Range gets the whole current file
+        stale = self.client.get(url, HTTP_RANGE='bytes=2-5', HTTP_IF_RANGE='"old"')
+        self.assertEqual(stale.status_code, 200)
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_RANGE='bytes=2-5', HTTP_IF_RANGE=etag).status_code, 206)
+
+    async def test_asgi_reads_the_file_a_block_at_a_time(self):
+        path = f'/media/{self.hashed}'
+        with mock.patch.object(streaming, 'FILE_BLOCK_SIZE', 8):
+            ranged = await asgi_get(path, headers=[('range', 'bytes=2-17')])
+        self.assertEqual(ranged.status, 206)
+        self.assertEqual([chunk for chunk in ranged.chunks if chunk], [b'23456789', b'abcdefgh'])
+        self.assertEqual(ranged.warnings, [])
+
+        whole = await asgi_get(path)
+        self.assertEqual(whole.status, 200)
+        self.assertEqual(b''.join(whole.chunks), CONTENT)
+        self.assertEqual(whole.headers['content-length'], str(len(CONTENT)))
+        self.assertEqual(whole.warnings, [])
+
+    def test_head_and_missing_files(self):
+        response = self.client.head(f'/media/{self.hashed}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Length'], str(len(CONTENT)))
+        self.assertEqual(response.content, b'')
+
+        self.assertEqual(self.client.get('/media/team_logos/missing.png').status_code, 404)
+        self.assertEqual(self.client.get('/media/../manage.py').status_code, 404)
+        self.assertEqual(self.client.get('/media/team_logos').status_code, 404)
+        self.assertEqual(self.client.post(f'/media/{self.hashed}').status_code, 405)
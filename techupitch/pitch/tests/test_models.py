@@ -1,34 +1,175 @@
 from django.test import TestCase
 
-from pitch.models import Player
+from pitch.models import Player, Sport, Team
 
 class PlayerModelTest(TestCase):
     @classmethod
     def setUpTestData(cls):
         # Set up non-modified objects used by all test methods
-        Player.objects.create(first_name='Big', last_name='Bob')
+        team = Team.objects.create(name='Lions', sport=Sport.objects.create(name='Football'))
+        cls.player = Player.objects.create(name='Big Bob', dept='CSC', team=team)
 
-    def test_first_name_label(self):
-        player = Player.objects.get(id=1)
-        field_label = player._meta.get_field('first_name').verbose_name
-        self.assertEqual(field_label, 'first name')
+    def test_name_label(self):
+        field_label = Player._meta.get_field('name').verbose_name
+        self.assertEqual(field_label, 'name')
 
     def test_date_of_birth_label(self):
-        player = Player.objects.get(id=1)
-        field_label = player._meta.get_field('date_of_birth').verbose_name
-        self.assertEqual(field_label, 'birth')
+        field_label = Player._meta.get_field('date_of_birth').verbose_name
+        self.assertEqual(field_label, 'date of birth')
 
-    def test_first_name_max_length(self):
-        player = Player.objects.get(id=1)
-        max_length = player._meta.get_field('first_name').max_length
-        self.assertEqual(max_length, 100)
+    def test_name_max_length(self):
+        max_length = Player._meta.get_field('name').max_length
+        self.assertEqual(max_length, 200)
 
-    def test_object_name_is_last_name_comma_first_name(self):
-        player = Player.objects.get(id=1)
-        expected_object_name = f'{player.last_name}, {player.first_name}'
-        self.assertEqual(str(player), expected_object_name)
+    def test_object_name_is_name_comma_team(self):
+        self.assertEqual(str(self.player), 'Big Bob, Lions')
 
     def test_get_absolute_url(self):
-        player = Player.objects.get(id=1)
         # This will also fail if the URLConf is not defined.
-        self.assertEqual(player.get_absolute_url(), '/pitch/player/1')
\ No newline at end of file
+        self.assertEqual(self.player.get_absolute_url(), f'/pitch/players/{self.player.pk}')
+
+from datetime import timedelta
+
+from django.utils import timezone
+
+from pitch.models import Sport, League, Team, Match
+from pitch.standings import calculate_league_table
+
+
+class LeagueTableTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        sport = Sport.objects.create(name='Football')
+        cls.league = League.objects.create(name='Campus League', sport=sport)
+        cls.lions = Team.objects.create(name='Lions', sport=sport)
+        cls.tigers = Team.objects.create(name='Tigers', sport=sport)
+        cls.bears = Team.objects.create(name='Bears', sport=sport)
+        cls.league.teams.add(cls.lions, cls.tigers, cls.bears)
+
+        kickoff = timezone.now() - timedelta(days=7)
+        Match.objects.create(league=cls.league, home_team=cls.lions, away_team=cls.tigers,
+                             start_time=kickoff, status='finished', home_score=2, away_score=0)
+        Match.objects.create(league=cls.league, home_team=cls.tigers, away_team=cls.bears,
+                             start_time=kickoff, status='finished', home_score=1, away_score=1)
+        # Not finished yet, so it must not count towards the table.
+        Match.objects.create(league=cls.league, home_team=cls.bears, away_team=cls.lions,
+                             start_time=kickoff, status='live', home_score=3, away_score=0)
+
+    def test_rows_and_order(self):
+        table = calculate_league_table(self.league)
+        self.assertEqual([row['team'] for row in table], [self.lions, self.bears, self.tigers])
+        lions = table[0]
+        self.assertEqual((lions['position'], lions['played'], lions['wins'], lions['points']), (1, 1, 1, 3))
+        tigers = table[2]
+        self.assertEqual((tigers['played'], tigers['draws'], tigers['losses']), (2, 1, 1))
+        self.assertEqual((tigers['goals_for'], tigers['goals_against'], tigers['goal_difference']), (1, 3, -2))
+
+    def test_single_match_query(self):
+        with self.assertNumQueries(2):
+            calculate_league_table(self.league)
+
+
+from pitch.models import LeagueStanding
+from pitch.standings import league_table, rebuild_league_standings
+
+
+class LeagueStandingTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        sport = Sport.objects.create(name='Football')
+        cls.league = League.objects.create(name='Campus League', sport=sport)
+        cls.lions = Team.objects.create(name='Lions', sport=sport)
+        cls.tigers = Team.objects.create(name='Tigers', sport=sport)
+        cls.league.teams.add(cls.lions, cls.tigers)
+
+    def standing(self, team):
+        return LeagueStanding.objects.get(league=self.league, team=team)
+
+    def test_rows_created_for_league_teams(self):
+        self.assertEqual(LeagueStanding.objects.filter(league=self.league).count(), 2)
+
+    def test_score_changes_update_both_rows(self):
+        match = Match.objects.create(league=self.league, home_team=self.lions, away_team=self.tigers,
+                                     start_time=timezone.now(), status='finished', home_score=1, away_score=0)
+        self.assertEqual((self.standing(self.lions).points, self.standing(self.tigers).losses), (3, 1))
+
+        match.away_score = 1
+        match.save()
+        lions, tigers = self.standing(self.lions), self.standing(self.tigers)
+        self.assertEqual((lions.played, lions.wins, lions.draws, lions.points), (1, 0, 1, 1))
+        self.assertEqual((tigers.losses, tigers.draws, tigers.goals_for), (0, 1, 1))
+
+        match.delete()
+        self.assertEqual(self.standing(self.lions).played, 0)
+        self.assertEqual(self.standing(self.tigers).points, 0)
+
+    def test_unfinished_matches_do_not_count(self):
+        Match.objects.create(league=self.league, home_team=self.lions, away_team=self.tigers,
+                             start_time=timezone.now(), status='live', home_score=4, away_score=0)
+        self.assertEqual(self.standing(self.lions).played, 0)
+
+    def test_rebuild_matches_incremental_table(self):
+        Match.objects.create(league=self.league, home_team=self.lions, away_team=self.tigers,
+                             start_time=timezone.now(), status='finished', home_score=0, away_score=2)
+        incremental = league_table(self.league)
+        rebuild_league_standings(self.league)
+        self.assertEqual(league_table(self.league), incremental)
+        self.assertEqual(incremental, calculate_league_table(self.league))
+
+    def test_table_is_single_query(self):
+        with self.assertNumQueries(1):
+            league_table(self.league)
+
+
+class MatchStatusTransitionTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        sport = Sport.objects.create(name='Football')
+        cls.league = League.objects.create(name='Campus League', sport=sport)
+        cls.lions = Team.objects.create(name='Lions', sport=sport)
+        cls.tigers = Team.objects.create(name='Tigers', sport=sport)
+        cls.league.teams.add(cls.lions, cls.tigers)
+
+    def make_match(self, minutes_ago, status='scheduled', **scores):
+        return Match.objects.create(league=self.league, home_team=self.lions, away_team=self.tigers,
+                                    start_time=timezone.now() - timedelta(minutes=minutes_ago),
+                                    status=status, **scores)
+
+    def test_bulk_transitions(self):
+        upcoming = self.make_match(-30)
+        kicked_off = self.make_match(10)
+        over = self.make_match(120, status='live', home_score=2, away_score=1)
+        postponed = self.make_match(10, status='postponed')
+
+        started, finished = Match.objects.update_statuses()
+        self.assertEqual((started, finished), (1, 1))
+
+        statuses = dict(Match.objects.values_list('pk', 'status'))
+        self.assertEqual(statuses[upcoming.pk], 'scheduled')
+        self.assertEqual(statuses[kicked_off.pk], 'live')
+        self.assertEqual(statuses[over.pk], 'finished')
+        self.assertEqual(statuses[postponed.pk], 'postponed')
+
+        self.assertEqual(LeagueStanding.objects.get(league=self.league, team=self.lions).points, 3)
+
+    def test_transition_notification(self):
+        from pitch.signals import match_statuses_changed
+
+        received = []
+        handler = lambda sender, **kwargs: received.append((kwargs['started'], kwargs['finished']))
+        match_statuses_changed.connect(handler)
+        self.addCleanup(match_statuses_changed.disconnect, handler)
+
+        self.make_match(5)
+        with self.captureOnCommitCallbacks(execute=True):
+            Match.objects.update_statuses()
+        with self.captureOnCommitCallbacks(execute=True):
+            Match.objects.update_statuses()  # nothing due, nothing sent
+        self.assertEqual(received, [(1, 0)])
+
+    def test_next_transition(self):
+        now = timezone.now()
+        self.assertIsNone(Match.objects.next_transition(now))
+        self.make_match(-30)
+        live = self.make_match(80, status='live')
+        self.assertEqual(Match.objects.next_transition(now), live.start_time + timedelta(minutes=90))
@@ -0,0 +1,96 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from pitch.models import League, Match, Player, Team
+from pitch.seeding import seed
+
+# Most queries each page may run, whatever the number of rows. Paths take
+# the newest row of each model, so detail pages grow with each seeded size.
+BUDGETS = {
+    # HTML pages
+    '/pitch/': 6,
+    '/pitch/matchs/': 1,
+    '/pitch/match/{match}': 2,
+    '/pitch/league/{league}/table/': 2,
+    '/pitch/leagues/': 1,
+    # lists: count, page, filter options (league, university, sport), and for teams
+    # the league prefetch and the listings version
+    '/pitch/teams/': 7,
+    '/pitch/teams/{team}': 3,
+    '/pitch/players/': 5,
+    '/pitch/players/{player}': 1,
+    '/pitch/sports/': 1,
+    # AJAX
+    '/pitch/ajax/matches/': 7,
+    # API
+    '/api/sports/': 1,
+    '/api/universities/': 1,
+    '/api/leagues/': 1,
+    '/api/leagues/{league}/table/': 2,
+    '/api/teams/': 2,
+    '/api/matches/': 1,
+    '/api/players/': 1,
+    '/api/events/': 1,
+}
+
+# Admin changelists, requested as a superuser (session and user lookups included).
+ADMIN_BUDGETS = {
+    '/admin/pitch/sport/': 5,
+    '/admin/pitch/league/': 5,
+    '/admin/pitch/team/': 5,
+    '/admin/pitch/match/': 5,
+    '/admin/pitch/player/': 5,
+    '/admin/pitch/event/': 5,
+    '/admin/pitch/university/': 5,
+}
+
+
+class QueryBudgetTest(TestCase):
+    """Every page stays within its budget, and its query count does not grow with the data."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin', password='secret')
+
+    def setUp(self):
+        cache.clear()
+
+    def query_counts(self, budgets):
+        ids = {
+            'match': Match.objects.order_by('-pk').values_list('pk', flat=True).first(),
+            'league': League.objects.order_by('-pk').values_list('pk', flat=True).first(),
+            'team': Team.objects.order_by('-pk').values_list('pk', flat=True).first(),
+            'player': Player.objects.order_by('-pk').values_list('pk', flat=True).first(),
+        }
+        counts = {}
+        for path in budgets:
+            cache.clear()  # measure the cold path, not a cached scoreboard
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(path.format(**ids))
+            self.assertEqual(response.status_code, 200, path)
+            counts[path] = len(queries)
+        return counts
+
+    def assert_budgets(self, budgets):
+        seed(prefix='Small', universities=1, leagues_per_university=1, teams_per_league=3,
+             players_per_team=2, matches=6, events_per_match=1)
+        small = self.query_counts(budgets)
+
+        seed(prefix='Large', universities=2, leagues_per_university=2, teams_per_league=6,
+             players_per_team=5, matches=60, events_per_match=3, random_seed=1)
+        large = self.query_counts(budgets)
+
+        for path, budget in budgets.items():
+            with self.subTest(path=path):
+                self.assertLessEqual(large[path], budget, f"{path} is over its query budget")
+                self.assertEqual(large[path], small[path], f"{path} runs more queries with more rows")
+
+    def test_pages_ajax_and_api(self):
+        self.assert_budgets(BUDGETS)
+
+    def test_admin_changelists(self):
+        self.client.force_login(self.admin)
+        self.assert_budgets(ADMIN_BUDGETS)
@@ -0,0 +1,46 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from pitch.models import Sport, League, Team, Match, Event
+from pitch.query_plans import analyze, check_query_plans
+
+
+class HotQueryPlanTest(TestCase):
+    """Every hot query must be served by an index on a seeded dataset."""
+
+    @classmethod
+    def setUpTestData(cls):
+        sport = Sport.objects.create(name='Football')
+        leagues = [League.objects.create(name=f'League {n}', sport=sport) for n in range(4)]
+        teams = Team.objects.bulk_create([Team(name=f'Team {n}', sport=sport) for n in range(20)])
+
+        kickoff = timezone.now() - timedelta(days=200)
+        statuses = ['finished'] * 7 + ['scheduled', 'live', 'postponed']
+        matches = Match.objects.bulk_create([
+            Match(
+                league=leagues[n % 4],
+                home_team=teams[n % 20],
+                away_team=teams[(n + 1) % 20],
+                start_time=kickoff + timedelta(hours=6 * n),
+                status=statuses[n % 10],
+                home_score=n % 4,
+                away_score=n % 3,
+            )
+            for n in range(2000)
+        ])
+        Event.objects.bulk_create([
+            Event(match=matches[n % 2000], team=teams[n % 20], event_type='Goal',
+                  event_time=kickoff + timedelta(minutes=n))
+            for n in range(4000)
+        ])
+        analyze()
+
+    def test_no_sequential_scans(self):
+        scans = {
+            name: (scanned, plan)
+            for name, (plan, scanned) in check_query_plans().items()
+            if scanned
+        }
+        self.assertEqual(scans, {}, 'hot queries fell back to sequential scans')
@@ -0,0 +1,165 @@
+import os
+import shutil
+import tempfile
+import threading
+from datetime import datetime, timedelta, timezone as dt_timezone
+from unittest import mock
+
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from pitch import reports, versions
+from pitch.models import Event, League, Match, Sport, Team
+
+
+def make_league():
+    sport = Sport.objects.create(name='Football')
+    league = League.objects.create(name='Campus League', sport=sport)
+    lions = Team.objects.create(name='Lions', sport=sport)
+    tigers = Team.objects.create(name='Tigers', sport=sport)
+    lions.league.add(league)
+    tigers.league.add(league)
+    return league, lions, tigers
+
+
+class ReportTest(TransactionTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        settings_override = override_settings(REPORTS_DIR=self.directory)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.league, self.lions, self.tigers = make_league()
+        kickoff = datetime.now(dt_timezone.utc) - timedelta(days=1)
+        self.match = Match.objects.create(league=self.league, home_team=self.lions, away_team=self.tigers,
+                                          start_time=kickoff)
+
+    def get_pdf(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        content = b''.join(response.streaming_content)
+        self.assertTrue(content.startswith(b'%PDF'))
+        return content
+
+    def pdfs(self):
+        return sorted(name for name in os.listdir(self.directory) if name.endswith('.pdf'))
+
+    def test_league_table_is_rendered_once_per_version_of_its_table(self):
+        url = reverse('league-table-pdf', args=[self.league.pk])
+        with mock.patch.object(reports, 'render', wraps=reports.render) as render:
+            self.get_pdf(url)
+            self.get_pdf(url)
+            self.assertEqual(render.call_count, 1)
+
+            # a new fixture changes no table, so the cached file is still current
+            Match.objects.create(league=self.league, home_team=self.tigers, away_team=self.lions,
+                                 start_time=self.match.start_time + timedelta(days=7))
+            self.get_pdf(url)
+            self.assertEqual(render.call_count, 1)
+
+            Match.objects.filter(pk=self.match.pk).update(home_score=2, away_score=1)
+            Match.objects.update_statuses()
+            self.get_pdf(url)
+            self.assertEqual(render.call_count, 2)
+
+            # a result in another league leaves this table alone
+            other_league = League.objects.create(name='Staff League', sport=self.league.sport)
+            self.lions.league.add(other_league)
+            self.tigers.league.add(other_league)
+            Match.objects.create(league=other_league, home_team=self.lions, away_team=self.tigers,
+                                 start_time=self.match.start_time, home_score=1, away_score=0)
+            Match.objects.update_statuses()
+            self.get_pdf(url)
+            self.assertEqual(render.call_count, 2)
+
+        version = versions.current(versions.league_table(self.league.pk))
+        self.assertEqual(self.pdfs(), [f'league-{self.league.pk}-v{version}.pdf'])
+
+    def test_match_sheet_follows_its_own_match(self):
+        url = reverse('match-sheet-pdf', args=[self.match.pk])
+        other = Match.objects.create(league=self.league, home_team=self.tigers, away_team=self.lions,
+                                     start_time=self.match.start_time + timedelta(days=7))
+        with mock.patch.object(reports, 'render', wraps=reports.render) as render:
+            self.get_pdf(url)
+            self.get_pdf(url)
+            Event.objects.create(match=other, team=self.lions, event_type='Goal',
+                                 event_time=other.start_time + timedelta(minutes=3))
+            self.get_pdf(url)
+            self.assertEqual(render.call_count, 1)
+
+            Event.objects.create(match=self.match, team=self.lions, event_type='Goal',
+                                 event_time=self.match.start_time + timedelta(minutes=12))
+            self.get_pdf(url)
+            self.assertEqual(render.call_count, 2)
+
+            self.lions.name = 'Lionesses'
+            self.lions.save()
+            self.get_pdf(url)
+            self.assertEqual(render.call_count, 3)
+        self.assertEqual(len(self.pdfs()), 1)
+
+    def test_markup_in_names_is_printed_as_text(self):
+        self.lions.name = 'a<b>c'
+        self.lions.save()
+        Event.objects.create(match=self.match, team=self.lions, event_type='Goal & assist',
+                             description='<i>unclosed', event_time=self.match.start_time + timedelta(minutes=12))
+        self.get_pdf(reverse('league-table-pdf', args=[self.league.pk]))
+        self.get_pdf(reverse('match-sheet-pdf', args=[self.match.pk]))
+
+    @override_settings(REPORT_RENDER_WAIT=0)
+    def test_slow_render_answers_202_and_is_shared(self):
+        release = threading.Event()
+
+        def slow_render(pk, file):
+            release.wait(5)
+            reports.render_match_sheet(pk, file)
+
+        url = reverse('match-sheet-pdf', args=[self.match.pk])
+        with mock.patch.dict(reports.REPORTS, {'match': reports.Report(versions.match_sheet, slow_render)}):
+            with mock.patch.object(reports, 'render', wraps=reports.render) as render:
+                first = self.client.get(url)
+                second = self.client.get(url)
+                self.assertEqual((first.status_code, second.status_code), (202, 202))
+                self.assertEqual(first['Retry-After'], '2')
+
+                release.set()
+                path, future = reports.request('match', self.match.pk)
+                if future is not None:
+                    future.result(timeout=5)
+                # counted once the render has run; the pool may not have started it before release
+                self.assertEqual(render.call_count, 1)
+        self.get_pdf(url)
+
+    def test_missing_objects_404(self):
+        self.assertEqual(self.client.get(reverse('league-table-pdf', args=[999])).status_code, 404)
+        self.assertEqual(self.client.get(reverse('match-sheet-pdf', args=[999])).status_code, 404)
+
+    def test_stale_render_does_not_prune_a_newer_file(self):
+        newer = reports.report_path('match', self.match.pk, 7)
+        reports.render('match', self.match.pk, newer)
+        reports.render('match', self.match.pk, reports.report_path('match', self.match.pk, 6))
+        self.assertTrue(os.path.exists(newer))
+        reports.render('match', self.match.pk, reports.report_path('match', self.match.pk, 8))
+        self.assertEqual(self.pdfs(), [f'match-{self.match.pk}-v8.pdf'])
+
+
+class StandingsVersionTest(TestCase):
+    def test_bumped_by_table_changes_only(self):
+        league, lions, tigers = make_league()
+        before = versions.current(versions.STANDINGS)
+
+        match = Match.objects.create(league=league, home_team=lions, away_team=tigers,
+                                     start_time=datetime(2024, 1, 6, 15, 0, tzinfo=dt_timezone.utc))
+        self.assertEqual(versions.current(versions.STANDINGS), before)
+
+        match.home_score, match.away_score = 1, 0
+        match.save()
+        Match.objects.update_statuses()
+        after_result = versions.current(versions.STANDINGS)
+        self.assertGreater(after_result, before)
+
+        lions.name = 'Lionesses'
+        lions.save()
+        self.assertGreater(versions.current(versions.STANDINGS), after_result)
@@ -0,0 +1,119 @@
+from datetime import date, time
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from pitch import versions
+from pitch.models import League, Match, Sport, Team
+from pitch.scheduling import round_robin, schedule
+
+
+class RoundRobinTest(TestCase):
+    def venues(self, rounds):
+        sequence = {}
+        for pairs in rounds:
+            for home, away in pairs:
+                sequence.setdefault(home, []).append('H')
+                sequence.setdefault(away, []).append('A')
+        return sequence
+
+    def test_every_pair_meets_home_and_away(self):
+        for size in (2, 5, 6, 20):
+            teams = list(range(size))
+            rounds = round_robin(teams)
+            pairs = [pair for matches in rounds for pair in matches]
+            self.assertEqual(len(pairs), size * (size - 1))
+            self.assertEqual(set(pairs), {(a, b) for a in teams for b in teams if a != b})
+            for matches in rounds:
+                playing = [team for pair in matches for team in pair]
+                self.assertEqual(len(playing), len(set(playing)), "a team plays twice in one round")
+
+    def test_home_and_away_alternate(self):
+        for size in (6, 20):
+            half = size - 1
+            for team, venues in self.venues(round_robin(range(size))).items():
+                self.assertEqual(venues.count('H'), size - 1)
+                first = venues[:half]
+                self.assertLessEqual(abs(first.count('H') - first.count('A')), 1)
+                repeats = sum(1 for a, b in zip(first, first[1:]) if a == b)
+                self.assertLessEqual(repeats, 1, f"team {team} has {repeats} home/away repeats")
+
+    def test_single_round_robin(self):
+        rounds = round_robin('ABCD', double=False)
+        self.assertEqual(len(rounds), 3)
+        self.assertEqual(sum(len(matches) for matches in rounds), 6)
+
+    def test_needs_two_teams(self):
+        with self.assertRaises(ValueError):
+            round_robin(['A'])
+
+    def test_rounds_use_match_days_and_slots(self):
+        # 2024-01-06 is a Saturday
+        fixtures = schedule('ABCD', date(2024, 1, 1), [5, 6], [time(17, 30), time(15, 0)])
+        self.assertEqual(len(fixtures), 12)
+        days = sorted({fixture.start_time.date() for fixture in fixtures})
+        self.assertEqual(days, [date(2024, 1, 6), date(2024, 1, 7), date(2024, 1, 13),
+                                date(2024, 1, 14), date(2024, 1, 20), date(2024, 1, 21)])
+        first_round = [fixture.start_time.time() for fixture in fixtures if fixture.round == 1]
+        self.assertEqual(first_round, [time(15, 0), time(17, 30)])
+
+
+class GenerateFixturesTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        sport = Sport.objects.create(name='Football')
+        cls.league = League.objects.create(name='Campus League', sport=sport)
+        cls.league.teams.add(*[Team.objects.create(name=f'Team {n}', sport=sport) for n in range(6)])
+        cls.staff = User.objects.create_user('staff', password='secret', is_staff=True)
+
+    def post(self, action):
+        return self.client.post(reverse('generate-fixtures', args=[self.league.pk]), {
+            'teams': list(self.league.teams.values_list('pk', flat=True)),
+            'start_date': '2024-01-01',
+            'match_days': ['5'],
+            'kickoff_slots': '15:00, 17:30',
+            'double': 'on',
+            action: '1',
+        })
+
+    def test_staff_only(self):
+        response = self.client.get(reverse('generate-fixtures', args=[self.league.pk]))
+        self.assertEqual(response.status_code, 302)
+
+    def test_preview_then_commit(self):
+        self.client.force_login(self.staff)
+
+        response = self.post('preview')
+        self.assertEqual(len(response.context['fixtures']), 30)
+        self.assertFalse(Match.objects.exists())
+
+        before = versions.current(versions.SCOREBOARD)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.post('commit')
+        inserts = [q['sql'] for q in queries if q['sql'].startswith('INSERT INTO "pitch_match"')]
+        self.assertEqual(len(inserts), 1)
+        self.assertRedirects(response, reverse('matchs'))
+        self.assertEqual(Match.objects.filter(league=self.league).count(), 30)
+        self.assertGreater(versions.current(versions.SCOREBOARD), before)
+
+    def test_bad_kickoff_slot(self):
+        self.client.force_login(self.staff)
+        response = self.client.post(reverse('generate-fixtures', args=[self.league.pk]), {
+            'teams': list(self.league.teams.values_list('pk', flat=True)), 'start_date': '2024-01-01',
+            'match_days': ['5'], 'kickoff_slots': 'teatime', 'preview': '1',
+        })
+        self.assertIn('kickoff_slots', response.context['form'].errors)
+
+    def test_command_previews_unless_committed(self):
+        out = StringIO()
+        call_command('generate_fixtures', self.league.pk, '--start', '2024-01-01', '--days', 'sat,sun', stdout=out)
+        self.assertIn('30 matches', out.getvalue())
+        self.assertFalse(Match.objects.exists())
+
+        call_command('generate_fixtures', self.league.pk, '--start', '2024-01-01', '--commit', stdout=StringIO())
+        self.assertEqual(Match.objects.count(), 30)
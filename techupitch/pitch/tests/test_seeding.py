@@ -0,0 +1,48 @@
+from django.test import TestCase
+
+from pitch import benchmarks, versions
+from pitch.models import Event, League, LeagueStanding, Match, Player, Team, University
+from pitch.seeding import scaled_sizes, seed
+
+
+class SeedTest(TestCase):
+    def test_seed_creates_requested_volumes(self):
+        counts = seed(universities=2, leagues_per_university=2, teams_per_league=4,
+                      players_per_team=3, matches=50, events_per_match=2)
+
+        self.assertEqual(counts['universities'], University.objects.count())
+        self.assertEqual((League.objects.count(), Team.objects.count(), Player.objects.count()), (4, 16, 48))
+        self.assertEqual(Match.objects.count(), 50)
+        self.assertEqual(counts['events'], Event.objects.count())
+        self.assertFalse(Event.objects.filter(match__status='scheduled').exists())
+
+    def test_matches_are_played_inside_their_league(self):
+        seed(universities=1, leagues_per_university=2, teams_per_league=4, matches=40)
+        for match in Match.objects.select_related('league'):
+            members = set(match.league.teams.values_list('pk', flat=True))
+            self.assertIn(match.home_team_id, members)
+            self.assertIn(match.away_team_id, members)
+            self.assertNotEqual(match.home_team_id, match.away_team_id)
+
+    def test_derived_data_is_rebuilt(self):
+        before = versions.current(versions.SCOREBOARD)
+        seed(universities=1, leagues_per_university=1, teams_per_league=4, matches=30)
+
+        self.assertGreater(versions.current(versions.SCOREBOARD), before)
+        finished = Match.objects.filter(status='finished').count()
+        played = sum(LeagueStanding.objects.values_list('played', flat=True))
+        self.assertEqual(played, 2 * finished)
+
+    def test_scaled_sizes(self):
+        self.assertEqual(scaled_sizes(200_000)['universities'], 50)
+
+
+class BenchmarkTest(TestCase):
+    def test_every_target_is_timed(self):
+        seed(universities=1, leagues_per_university=1, teams_per_league=4, matches=20)
+        results = benchmarks.run(repeat=1)
+
+        self.assertIn('league_table_view', results)
+        for name, result in results.items():
+            self.assertEqual(result['status'], 200, name)
+            self.assertIsNotNone(result['median_ms'])
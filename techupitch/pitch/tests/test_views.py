@@ -0,0 +1,440 @@
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from pitch.models import Sport, League, Team, Match
+from pitch.scoreboard import LOCK_KEY, scoreboard_delta, snapshot_stats
+from pitch.views import HOME_CARDS
+
+
+class LeagueTestCase(TestCase):
+    """A football league and two teams, shared by the test classes below."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.sport = Sport.objects.create(name='Football')
+        cls.league = League.objects.create(name='Campus League', sport=cls.sport)
+        cls.lions = Team.objects.create(name='Lions', sport=cls.sport)
+        cls.tigers = Team.objects.create(name='Tigers', sport=cls.sport)
+
+
+class LiveScoreboardTest(LeagueTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.live = Match.objects.create(league=cls.league, home_team=cls.lions, away_team=cls.tigers,
+                                        start_time=timezone.now() - timedelta(minutes=10),
+                                        status='live', home_score=1, away_score=0)
+        cls.upcoming = Match.objects.create(league=cls.league, home_team=cls.tigers, away_team=cls.lions,
+                                            start_time=timezone.now() + timedelta(days=1))
+
+    def setUp(self):
+        cache.clear()
+
+    def test_ajax_matches_is_read_only(self):
+        response = self.client.get(reverse('ajax-matches'))
+        data = response.json()
+        self.assertEqual([m['id'] for m in data['live_matches']], [self.live.id])
+        self.assertEqual([m['id'] for m in data['upcoming_matches']], [self.upcoming.id])
+        self.assertEqual(data['live_matches'][0]['home_score'], 1)
+
+    def test_items_carry_iso_kickoff_times(self):
+        data = self.client.get(reverse('ajax-matches')).json()
+        for section, match in (('live_matches', self.live), ('upcoming_matches', self.upcoming)):
+            item = data[section][0]
+            self.assertEqual(datetime.fromisoformat(item['start_time']), match.start_time)
+        self.assertEqual(set(data['upcoming_matches'][0]), {'id', 'league', 'home_team', 'away_team', 'start_time'})
+
+    def test_home_page_and_script_share_the_card_limit(self):
+        for offset in range(2, 6):
+            Match.objects.create(league=self.league, home_team=self.tigers, away_team=self.lions,
+                                 start_time=timezone.now() + timedelta(days=offset))
+        response = self.client.get(reverse('index'))
+        self.assertEqual(len(response.context['upcoming_matches']), HOME_CARDS)
+        self.assertContains(response, f'const cards = {HOME_CARDS};')
+
+    def test_unchanged_scoreboard_answers_304(self):
+        etag = self.client.get(reverse('ajax-matches'))['ETag']
+
+        with self.assertNumQueries(1):  # just the version lookup
+            response = self.client.get(reverse('ajax-matches'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        self.live.home_score = 2
+        self.live.save()
+        response = self.client.get(reverse('ajax-matches'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_stale_board_keeps_its_own_etag(self):
+        etag = self.client.get(reverse('ajax-matches'))['ETag']
+        self.live.home_score = 2
+        self.live.save()
+
+        cache.add(LOCK_KEY, True)  # another request is rebuilding
+        response = self.client.get(reverse('ajax-matches'), HTTP_IF_NONE_MATCH='"scoreboard-0"')
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(response.json()['live_matches'][0]['home_score'], 1)
+
+        cache.delete(LOCK_KEY)
+        response = self.client.get(reverse('ajax-matches'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['live_matches'][0]['home_score'], 2)
+
+    def test_snapshot_served_from_cache(self):
+        self.client.get(reverse('index'))
+        with self.assertNumQueries(1):  # version lookup only
+            response = self.client.get(reverse('index'))
+        self.assertEqual(response.context['num_team'], 2)
+        self.assertEqual([m['id'] for m in response.context['live_matches']], [self.live.id])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Team.objects.create(name='Bears', sport=self.sport)
+        response = self.client.get(reverse('index'))
+        self.assertEqual(response.context['num_team'], 3)
+
+        self.assertEqual(snapshot_stats()['hits'], 1)
+        self.assertEqual(snapshot_stats()['rebuilds'], 2)
+
+    def test_stream_declines_under_wsgi(self):
+        response = self.client.get(reverse('ajax-matches-stream'))
+        self.assertEqual(response.status_code, 204)
+
+    def test_scoreboard_delta(self):
+        before = {'live_matches': [{'id': 1, 'home_score': 0}, {'id': 2, 'home_score': 0}], 'upcoming_matches': []}
+        self.assertIsNone(scoreboard_delta(before, before))
+
+        after = {'live_matches': [{'id': 1, 'home_score': 1}], 'upcoming_matches': []}
+        self.assertEqual(scoreboard_delta(before, after), {
+            'live_matches': {'changed': [{'id': 1, 'home_score': 1}], 'removed': [2], 'order': [1]},
+        })
+
+
+import json
+
+from asgiref.sync import sync_to_async
+from asgiref.testing import ApplicationCommunicator
+
+from pitch.broadcast import match_timeline_hub
+from pitch.consumers import websocket_application
+from pitch.models import Event
+
+
+class MatchTimelineSocketTest(LeagueTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.match = Match.objects.create(league=cls.league, home_team=cls.lions, away_team=cls.tigers,
+                                         start_time=timezone.now(), status='live', home_score=0, away_score=0)
+        cls.kickoff = Event.objects.create(match=cls.match, team=cls.lions, event_type='Kickoff', event_time=timezone.now())
+        cls.goal = Event.objects.create(match=cls.match, team=cls.lions, event_type='Goal', event_time=timezone.now())
+
+    async def connect(self, url):
+        path, _, query = url.partition('?')
+        scope = {'type': 'websocket', 'path': path, 'query_string': query.encode()}
+        socket = ApplicationCommunicator(websocket_application, scope)
+        await socket.send_input({'type': 'websocket.connect'})
+        return socket
+
+    async def test_resume_after_last_seen_event(self):
+        socket = await self.connect(f'/ws/match/{self.match.id}/?after={self.kickoff.id}')
+        self.assertEqual((await socket.receive_output())['type'], 'websocket.accept')
+
+        event = json.loads((await socket.receive_output())['text'])
+        self.assertEqual((event['type'], event['id'], event['team']), ('event', self.goal.id, 'Lions'))
+        score = json.loads((await socket.receive_output())['text'])
+        self.assertEqual(score, {'type': 'score', 'home_score': 0, 'away_score': 0, 'status': 'live'})
+
+        await socket.send_input({'type': 'websocket.disconnect', 'code': 1000})
+        await socket.wait(timeout=2)
+
+    async def test_deleted_event_is_removed_from_open_timelines(self):
+        socket = await self.connect(f'/ws/match/{self.match.id}/?after={self.goal.id}')
+        self.assertEqual((await socket.receive_output())['type'], 'websocket.accept')
+        self.assertEqual(json.loads((await socket.receive_output())['text'])['type'], 'score')
+
+        await sync_to_async(Event.objects.filter(pk=self.goal.pk).delete)()
+        match_timeline_hub.notify(self.match.id)
+        frame = json.loads((await socket.receive_output(timeout=2))['text'])
+        self.assertEqual(frame, {'type': 'removed', 'id': self.goal.id})
+
+        await socket.send_input({'type': 'websocket.disconnect', 'code': 1000})
+        await socket.wait(timeout=2)
+
+    def test_deleting_an_event_wakes_its_match(self):
+        with mock.patch.object(match_timeline_hub, 'notify') as notify:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.goal.delete()
+        notify.assert_called_with(self.match.id)
+
+    async def test_unknown_match_is_closed(self):
+        socket = await self.connect('/ws/match/999999/')
+        self.assertEqual(await socket.receive_output(), {'type': 'websocket.close', 'code': 4404})
+
+
+from unittest import mock
+
+from pitch.pagination import IdCursorPagination
+
+
+class ApiPaginationTest(LeagueTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        kickoff = timezone.now()
+        # created out of kickoff order so the cursor ordering is visible
+        for hours in (3, 1, 2, 1, 0):
+            Match.objects.create(league=cls.league, home_team=cls.lions, away_team=cls.tigers,
+                                 start_time=kickoff + timedelta(hours=hours))
+
+    def test_matches_walk_in_start_time_order(self):
+        seen = []
+        url = '/api/matches/?page_size=2'
+        while url:
+            page = self.client.get(url).json()
+            self.assertLessEqual(len(page['results']), 2)
+            seen.extend(page['results'])
+            url = page['next']
+
+        self.assertEqual(len(seen), 5)
+        keys = [(m['start_time'], m['id']) for m in seen]
+        self.assertEqual(keys, sorted(keys))
+
+    def test_page_size_is_capped(self):
+        with mock.patch.object(IdCursorPagination, 'max_page_size', 1):
+            page = self.client.get('/api/teams/?page_size=100000').json()
+        self.assertEqual(len(page['results']), 1)
+        self.assertIsNotNone(page['next'])
+
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from pitch.models import Player, University
+
+
+class ApiReadSerializerTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.sport = Sport.objects.create(name='Football')
+        cls.university = University.objects.create(name='First Technical University', short_name='Tech-U')
+        cls.league = League.objects.create(name='Campus League', sport=cls.sport, university=cls.university)
+        cls.add_rows(1)
+
+    @classmethod
+    def add_rows(cls, count):
+        for _ in range(count):
+            home = Team.objects.create(name='Home', sport=cls.sport, university=cls.university)
+            away = Team.objects.create(name='Away', sport=cls.sport)
+            home.league.add(cls.league)
+            player = Player.objects.create(name='Ada', dept='CSC', team=home, university=cls.university)
+            match = Match.objects.create(league=cls.league, home_team=home, away_team=away, start_time=timezone.now())
+            Event.objects.create(match=match, team=home, player_name=player, event_type='Goal', event_time=timezone.now())
+
+    def list_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get(url).status_code, 200)
+        return len(queries)
+
+    def test_list_cost_does_not_grow_with_rows(self):
+        urls = ['/api/leagues/', '/api/teams/', '/api/matches/', '/api/players/', '/api/events/']
+        before = {url: self.list_queries(url) for url in urls}
+        self.add_rows(5)
+        after = {url: self.list_queries(url) for url in urls}
+        self.assertEqual(before, after)
+
+    def test_names_are_flattened(self):
+        match = self.client.get('/api/matches/').json()['results'][0]
+        self.assertEqual((match['league_name'], match['home_team_name'], match['away_team_name']),
+                         ('Campus League', 'Home', 'Away'))
+
+        team = self.client.get('/api/teams/').json()['results'][0]
+        self.assertEqual(team['university_name'], 'First Technical University')
+        self.assertEqual(team['leagues'], [{'id': self.league.id, 'name': 'Campus League', 'abbreviation': None}])
+
+        event = self.client.get('/api/events/').json()['results'][0]
+        self.assertEqual((event['team_name'], event['player']), ('Home', 'Ada'))
+
+        away = self.client.get('/api/teams/').json()['results'][1]
+        self.assertIsNone(away['university_name'])
+
+
+import os
+import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.models import User
+from django.test import override_settings
+
+from pitch import metrics
+
+
+class MetricsTest(LeagueTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.staff = User.objects.create_user('admin', password='secret', is_staff=True)
+
+    def setUp(self):
+        cache.clear()
+        metrics.registry.views.clear()
+
+    @override_settings(METRICS_TOKEN='scrape-me')
+    def test_endpoint_requires_staff_or_token(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer wrong').status_code, 403)
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer scrape-me').status_code, 200)
+        self.client.force_login(self.staff)
+        self.assertEqual(self.client.get('/metrics').status_code, 200)
+
+    def test_requests_and_queries_recorded_per_url_name(self):
+        self.client.get('/api/leagues/')
+        self.client.get('/api/leagues/')
+        stats = metrics.registry.snapshot()['league-list']
+        self.assertEqual(stats['requests'], 2)
+        self.assertGreater(stats['queries'], 0)
+        self.assertEqual(sum(stats['buckets']), 2)
+
+        self.client.force_login(self.staff)
+        body = self.client.get('/metrics').content.decode()
+        self.assertIn('upitch_http_requests_total{view="league-list"} 2', body)
+        self.assertIn('upitch_http_request_duration_seconds_bucket{view="league-list",le="+Inf"} 2', body)
+        self.assertIn('upitch_db_queries_total{view="league-list"}', body)
+        self.assertIn('upitch_scoreboard_cache_total{outcome="hits"}', body)
+
+    def test_concurrent_flushes_leave_one_file(self):
+        with tempfile.TemporaryDirectory() as directory, override_settings(METRICS_DIR=directory):
+            metrics.registry.record('league-list', 0.01, 1, 0.001)
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                for future in [pool.submit(metrics.registry.maybe_flush, force=True) for _ in range(32)]:
+                    future.result()
+            self.assertEqual(os.listdir(directory), [f'metrics-{os.getpid()}.json'])
+
+    def test_failed_flush_does_not_fail_the_request(self):
+        with tempfile.NamedTemporaryFile() as not_a_directory, \
+                override_settings(METRICS_DIR=not_a_directory.name, METRICS_FLUSH_INTERVAL=0):
+            self.assertEqual(self.client.get('/api/leagues/').status_code, 200)
+        self.assertEqual(metrics.registry.snapshot()['league-list']['requests'], 1)
+
+    def test_workers_are_summed_from_metrics_dir(self):
+        with tempfile.TemporaryDirectory() as directory, override_settings(METRICS_DIR=directory):
+            other_worker = {'league-list': {'requests': 3, 'seconds': 0.3, 'buckets': [3] + [0] * 9,
+                                            'queries': 6, 'sql_seconds': 0.01}}
+            with open(f'{directory}/metrics-{os.getppid()}.json', 'w') as handle:
+                json.dump(other_worker, handle)
+            self.client.get('/api/leagues/')
+            self.assertEqual(metrics.collect()['league-list']['requests'], 4)
+
+    def test_files_of_exited_workers_are_dropped(self):
+        exited = subprocess.Popen(['true'])
+        exited.wait()
+        with tempfile.TemporaryDirectory() as directory, override_settings(METRICS_DIR=directory):
+            with open(f'{directory}/metrics-{exited.pid}.json', 'w') as handle:
+                json.dump({'league-list': {'requests': 3, 'seconds': 0.3, 'buckets': [3] + [0] * 9,
+                                           'queries': 6, 'sql_seconds': 0.01}}, handle)
+            self.client.get('/api/leagues/')
+            self.assertEqual(metrics.collect()['league-list']['requests'], 1)
+            self.assertEqual(os.listdir(directory), [f'metrics-{os.getpid()}.json'])
+
+
+class ListPagesTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.football = Sport.objects.create(name='Football')
+        cls.netball = Sport.objects.create(name='Netball')
+        cls.league = League.objects.create(name='Campus League', sport=cls.football)
+        Team.objects.bulk_create([Team(name=f'Team {n:02}', sport=cls.football) for n in range(25)])
+        cls.team = Team.objects.create(name='Hoops', sport=cls.netball)
+        cls.team.league.add(cls.league)
+        cls.player = Player.objects.create(name='Ada', team=cls.team)
+        Player.objects.create(name='Bea', team=Team.objects.get(name='Team 00'))
+
+    def setUp(self):
+        cache.clear()
+
+    def test_teams_are_paginated_and_filtered(self):
+        response = self.client.get(reverse('teams'))
+        self.assertEqual(len(response.context['team_list']), settings.LIST_PAGE_SIZE)
+        self.assertEqual(response.context['paginator'].count, 26)
+
+        response = self.client.get(reverse('teams'), {'sport': self.netball.pk, 'page': 1})
+        self.assertEqual([team.name for team in response.context['team_list']], ['Hoops'])
+        self.assertEqual(response.context['page_query'], f'sport={self.netball.pk}')
+
+        response = self.client.get(reverse('players'), {'league': self.league.pk})
+        self.assertEqual(list(response.context['player_list']), [self.player])
+
+    def test_page_links_keep_the_filters(self):
+        response = self.client.get(reverse('teams'), {'sport': self.football.pk})
+        self.assertContains(response, f'?sport={self.football.pk}&amp;page=2')
+
+    def test_rows_are_cached_until_they_change(self):
+        self.client.get(reverse('teams'), {'sport': self.netball.pk})
+        Team.objects.filter(pk=self.team.pk).update(name='Renamed')  # no updated_at bump
+        self.assertContains(self.client.get(reverse('teams'), {'sport': self.netball.pk}), 'Hoops')
+
+        self.team.refresh_from_db()
+        self.team.save()
+        self.assertContains(self.client.get(reverse('teams'), {'sport': self.netball.pk}), 'Renamed')
+
+        self.league.name = 'Varsity League'
+        self.league.save()
+        self.assertContains(self.client.get(reverse('teams'), {'sport': self.netball.pk}), 'Varsity League')
+        # the player row shows the team name
+        self.assertContains(self.client.get(reverse('players'), {'league': self.league.pk}), 'Renamed')
+
+
+class MatchListWindowTest(LeagueTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.today = timezone.localdate()
+        noon = timezone.localtime().replace(hour=12, minute=0, second=0, microsecond=0)
+        cls.matches = {
+            offset: Match.objects.create(league=cls.league, home_team=cls.lions, away_team=cls.tigers,
+                                         start_time=noon + timedelta(days=offset))
+            for offset in (-10, 0, 10)
+        }
+
+    def shown(self, params=None):
+        response = self.client.get(reverse('matchs'), params or {})
+        self.assertEqual(response.status_code, 200)
+        return response, sorted(match.pk for match in response.context['matches'])
+
+    def test_default_window_is_around_today(self):
+        with self.assertNumQueries(1):
+            response, shown = self.shown()
+        self.assertEqual(shown, [self.matches[0].pk])
+        first = self.today - timedelta(days=settings.MATCH_LIST_DAYS)
+        span = timedelta(days=2 * settings.MATCH_LIST_DAYS + 1)
+        self.assertContains(response, f'?from={first - span}&amp;to={first - timedelta(days=1)}')
+
+    def test_single_day_and_range(self):
+        day = self.today - timedelta(days=10)
+        response, shown = self.shown({'date': day.isoformat()})
+        self.assertEqual(shown, [self.matches[-10].pk])
+        self.assertContains(response, f'?date={day - timedelta(days=1)}')
+        self.assertContains(response, f'?date={day + timedelta(days=1)}')
+
+        _, shown = self.shown({'from': day.isoformat(), 'to': self.today.isoformat()})
+        self.assertEqual(shown, sorted([self.matches[-10].pk, self.matches[0].pk]))
+
+    def test_bad_window_falls_back_to_default(self):
+        response, shown = self.shown({'from': self.today.isoformat(), 'to': (self.today - timedelta(days=1)).isoformat()})
+        self.assertEqual(shown, [self.matches[0].pk])
+        self.assertContains(response, 'Showing the default dates instead.')
+
+        _, shown = self.shown({'from': '2020-01-01', 'to': '2021-01-01'})
+        self.assertEqual(shown, [self.matches[0].pk])
+
+    def test_dates_at_the_ends_of_the_calendar_fall_back_to_default(self):
+        for params in ({'date': '9999-12-31'}, {'date': '0001-01-01'}, {'to': '0001-01-02'},
+                       {'from': '9999-12-20'}, {'from': '0001-01-01', 'to': '0001-01-05'}):
+            response, shown = self.shown(params)
+            self.assertEqual(shown, [self.matches[0].pk])
+            self.assertContains(response, 'Showing the default dates instead.')
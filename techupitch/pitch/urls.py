@@ -4,10 +4,12 @@ from . import views
 urlpatterns = [
     path('', views.index, name='index'),
     path('league/<int:league_id>/table/', views.league_table_view, name='league-table'),
+    path('league/<int:league_id>/table.pdf', views.league_table_pdf, name='league-table-pdf'),
 
 
     path('matchs/', views.match_list, name='matchs'),
     path('match/<int:pk>', views.MatchDetailView.as_view(), name='match-detail'),
+    path('match/<int:pk>/sheet.pdf', views.match_sheet_pdf, name='match-sheet-pdf'),
 
     path('leagues/', views.LeagueListView.as_view(), name='leagues'),
     path('league/<int:pk>/table/', views.league_table_view, name='league-detail'),
@@ -35,9 +37,14 @@ urlpatterns += [
 # ✅ Match CRUD
 urlpatterns += [
     path('ajax/matches/', views.live_upcoming_matches, name='ajax-matches'),
+    path('ajax/matches/stream/', views.live_matches_stream, name='ajax-matches-stream'),
+    path('ajax/matches/cache-stats/', views.scoreboard_cache_stats, name='scoreboard-cache-stats'),
     path('match/create/', views.MatchCreate.as_view(), name='match-create'),
     path('match/<int:pk>/postpone/', views.postpone_match, name='postpone-match'),
     path('match/<int:pk>/resume/', views.resume_match, name='resume-match'),
+    path('league/<int:league_id>/fixtures/generate/', views.generate_fixtures, name='generate-fixtures'),
+    path('import/', views.import_data, name='import-data'),
+    path('export/<str:kind>/', views.export_data, name='export-data'),
     path('match/<int:pk>/update/', views.MatchUpdate.as_view(), name='match-update'),
     path('match/<int:pk>/delete/', views.MatchDelete.as_view(), name='match-delete'),
 ]
@@ -0,0 +1,67 @@
+from django.db.models import F
+
+from .models import VersionCounter
+
+# Bumped whenever a Match, Event, Team or Player changes.
+SCOREBOARD = 'scoreboard'
+# Bumped whenever a league table changes: a counted result, a rebuild, or a
+# team or league being renamed.
+STANDINGS = 'standings'
+# Bumped whenever a university or league changes or teams join or leave a
+# league: the names team list rows show without a timestamp of their own.
+LISTINGS = 'listings'
+# Numbers the entries of the match/event change feed, one value per entry.
+CHANGES = 'changes'
+# The newest change feed version deleted by compaction.
+CHANGES_COMPACTED = 'changes-compacted'
+
+
+def league_table(league_id):
+    """Counter of one league's table: its results, rows, and the names printed in it."""
+    return f'standings-{league_id}'
+
+
+def match_sheet(match_id):
+    """Counter of one match: the match, its events, and the names printed with them."""
+    return f'match-{match_id}'
+
+
+def bump(name):
+    """Increment the ``name`` counter inside the current transaction.
+
+    The UPDATE takes a row lock, so concurrent writers serialise on it and the
+    value never goes backwards.
+    """
+    if not VersionCounter.objects.filter(name=name).update(value=F('value') + 1):
+        _, created = VersionCounter.objects.get_or_create(name=name, defaults={'value': 1})
+        if not created:
+            VersionCounter.objects.filter(name=name).update(value=F('value') + 1)
+
+
+def bump_all(names):
+    """Increment each of the ``names`` counters with one UPDATE, creating the missing ones."""
+    names = set(names)
+    if not names:
+        return
+    VersionCounter.objects.filter(name__in=names).update(value=F('value') + 1)
+    existing = set(VersionCounter.objects.filter(name__in=names).values_list('name', flat=True))
+    for name in names - existing:
+        bump(name)
+
+
+def advance(name, count=1):
+    """Add ``count`` to the ``name`` counter and return its new value.
+
+    Call it inside a transaction: the row stays locked until commit, so
+    numbers taken by concurrent writers become visible in order.
+    """
+    if not VersionCounter.objects.filter(name=name).update(value=F('value') + count):
+        _, created = VersionCounter.objects.get_or_create(name=name, defaults={'value': count})
+        if not created:
+            VersionCounter.objects.filter(name=name).update(value=F('value') + count)
+    return current(name)
+
+
+def current(name):
+    """Return the current value of the ``name`` counter (0 if never bumped)."""
+    return VersionCounter.objects.filter(name=name).values_list('value', flat=True).first() or 0
@@ -4,32 +4,33 @@ from django.shortcuts import render
 
 
 from .models import Match, Player, League, Team, Sport, Event
+from .scoreboard import get_snapshot
 
 from django.utils import timezone
 
+# Cards per section on the home page; the live update script keeps to it too
+HOME_CARDS = 3
+
 def index(request):
     """View function for home page of site."""
 
-    num_matches = Match.objects.count()
-    num_team = Team.objects.count()
-    num_players = Player.objects.count()
+    # Counters and match lists come from the cached scoreboard snapshot
+    snapshot = get_snapshot()
 
-    # Live Matches (limit 3)
-    live_matches = Match.objects.filter(status__iexact='live').order_by('-start_time')[:3]
-    num_live_matches = live_matches.count()
+    # Live Matches (limit HOME_CARDS)
+    live_matches = snapshot['live_matches'][:HOME_CARDS]
 
-    # Upcoming Matches (start_time in future or status='upcoming')
-    upcoming_matches = Match.objects.filter(
-        start_time__gt=timezone.now()
-    ).order_by('start_time')[:3]
+    # Upcoming Matches (start_time in future)
+    upcoming_matches = snapshot['upcoming_matches'][:HOME_CARDS]
 
     context = {
-        'num_matches': num_matches,
-        'num_team': num_team,
-        'num_players': num_players,
-        'num_live_matches': num_live_matches,
+        'num_matches': snapshot['num_matches'],
+        'num_team': snapshot['num_team'],
+        'num_players': snapshot['num_players'],
+        'num_live_matches': len(live_matches),
         'live_matches': live_matches,
         'upcoming_matches': upcoming_matches,  # ✅ added
+        'home_cards': HOME_CARDS,
     }
 
     return render(request, 'index.html', context)
@@ -37,58 +38,13 @@ def index(request):
 
 
 from django.shortcuts import render, get_object_or_404
-from django.db.models import Q, F, Sum
 from .models import League, Match  
-
-def calculate_league_table(league):
-    teams = league.teams.all()
-    table = []
-
-    for team in teams:
-        matches = Match.objects.filter(
-            Q(league=league) & (Q(home_team=team) | Q(away_team=team))
-        )
-
-        played = matches.count()
-        wins = matches.filter(
-            (Q(home_team=team) & Q(home_score__gt=F('away_score'))) |
-            (Q(away_team=team) & Q(away_score__gt=F('home_score')))
-        ).count()
-        draws = matches.filter(Q(home_score=F('away_score'))).count()
-        losses = played - wins - draws
-
-        goals_for = matches.filter(home_team=team).aggregate(Sum('home_score'))['home_score__sum'] or 0
-        goals_for += matches.filter(away_team=team).aggregate(Sum('away_score'))['away_score__sum'] or 0
-
-        goals_against = matches.filter(home_team=team).aggregate(Sum('away_score'))['away_score__sum'] or 0
-        goals_against += matches.filter(away_team=team).aggregate(Sum('home_score'))['home_score__sum'] or 0
-
-        goal_difference = goals_for - goals_against
-        points = (wins * 3) + draws
-
-        table.append({
-            'team': team,
-            'played': played,
-            'wins': wins,
-            'draws': draws,
-            'losses': losses,
-            'goals_for': goals_for,
-            'goals_against': goals_against,
-            'goal_difference': goal_difference,
-            'points': points,
-        })
-
-    table = sorted(table, key=lambda x: (x['points'], x['goal_difference'], x['goals_for']), reverse=True)
-
-    for index, row in enumerate(table):
-        row['position'] = index + 1
-
-    return table
+from .standings import league_table
 
 
 def league_table_view(request, league_id):
     league = get_object_or_404(League, pk=league_id)
-    table_data = calculate_league_table(league)
+    table_data = league_table(league)
     return render(request, 'league_table.html', {'table': table_data, 'league': league})
 
 
@@ -103,11 +59,14 @@ from django.views import generic
 
 class MatchDetailView(generic.DetailView):
     model = Match
+    queryset = Match.objects.select_related('league', 'home_team', 'away_team')
+    # Statuses are kept current by `manage.py run_match_clock`, so this view only reads.
 
-    def get_object(self, queryset=None):
-        match = super().get_object(queryset)
-        match.auto_update_status()  # ✅ Automatically update the match status
-        return match
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        # Timeline so far; new events arrive over /ws/match/<id>/
+        context['events'] = self.object.event_set.select_related('team', 'player_name').order_by('event_time', 'id')
+        return context
 
 from .models import Match
 
@@ -120,19 +79,55 @@ class LeagueListView(generic.ListView):
     model = League
 
 
-class TeamListView(generic.ListView):
+from django.conf import settings
+from . import versions
+from .forms import ListFilterForm
+
+
+class FilteredListMixin:
+    """Paginated list narrowed by ``ListFilterForm``; the templates cache each row as a fragment."""
+    paginate_by = settings.LIST_PAGE_SIZE
+    filter_lookups = {}
+
+    def get_queryset(self):
+        self.filter_form = ListFilterForm(self.request.GET)
+        return super().get_queryset().filter(**self.filter_form.filters(self.filter_lookups))
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        query = self.request.GET.copy()
+        query.pop('page', None)
+        context['filter_form'] = self.filter_form
+        context['page_query'] = query.urlencode()  # keeps the filters on the page links
+        context['fragment_timeout'] = settings.FRAGMENT_CACHE_TIMEOUT
+        return context
+
+
+class TeamListView(FilteredListMixin, generic.ListView):
     model = Team
+    queryset = Team.objects.select_related('sport', 'university').prefetch_related('league').order_by('name', 'id')
+    filter_lookups = {'league': 'league', 'university': 'university', 'sport': 'sport'}
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        # rows show university and league names, which have no timestamp on the team
+        context['listings_version'] = versions.current(versions.LISTINGS)
+        return context
 
 
 class TeamDetailView(generic.DetailView):
     model = Team
+    queryset = Team.objects.select_related('sport', 'university').prefetch_related('league', 'player_set')
 
-class PlayerListView(generic.ListView):
+class PlayerListView(FilteredListMixin, generic.ListView):
     model = Player
+    queryset = Player.objects.select_related('team', 'university').order_by('name', 'id')
+    filter_lookups = {'league': 'team__league', 'university': 'university', 'sport': 'team__sport'}
 
 
 class PlayerDetailView(generic.DetailView):
     model = Player
+    queryset = Player.objects.select_related('team', 'university')
 
 class SportListView(generic.ListView):
     model = Sport
@@ -327,70 +322,279 @@ def resume_match(request, pk):
     return redirect('match-detail', pk=pk)
 
 
+from django.contrib.auth.decorators import user_passes_test
+from .forms import FixtureGeneratorForm
+from .scheduling import create_fixtures, schedule
+
+# ✅ Generate a league's whole season at once
+@user_passes_test(lambda user: user.is_staff)
+def generate_fixtures(request, league_id):
+    """Preview a round-robin season for a league, then create every match in one go."""
+    league = get_object_or_404(League, pk=league_id)
+    form = FixtureGeneratorForm(request.POST or None, league=league)
+    fixtures = None
+
+    if request.method == 'POST' and form.is_valid():
+        data = form.cleaned_data
+        fixtures = schedule(data['teams'], data['start_date'], data['match_days'],
+                            data['kickoff_slots'], double=data['double'])
+        if 'commit' in request.POST:
+            matches = create_fixtures(league, fixtures)
+            messages.success(request, f"✅ {len(matches)} matches created for {league.name}.")
+            return redirect('matchs')
+
+    return render(request, 'pitch/fixture_generator.html', {
+        'league': league,
+        'form': form,
+        'fixtures': fixtures,
+        'existing_matches': league.match_set.count(),
+    })
+
+
+from .forms import ImportForm
+from .importers import import_file
 
+# ✅ Bulk import from a spreadsheet
+@user_passes_test(lambda user: user.is_staff)
+def import_data(request):
+    """Import teams, players or fixtures from an XLSX/CSV upload and list the rows that failed."""
+    form = ImportForm(request.POST or None, request.FILES or None)
+    result = None
 
+    if request.method == 'POST' and form.is_valid():
+        data = form.cleaned_data
+        try:
+            result = import_file(data['kind'], data['file'], data['file'].name,
+                                 sheet=data['sheet'] or None, dry_run=data['dry_run'])
+        except (KeyError, ValueError) as error:
+            form.add_error('file', f"Could not read the file: {error}")
+
+    return render(request, 'pitch/import_data.html', {'form': form, 'result': result})
+
+
+from django.http import FileResponse, Http404, JsonResponse, StreamingHttpResponse
+from .forms import ExportForm
+from . import exports
+from .streaming import stream, stream_file
+
+# ✅ Season exports for the federation
+@user_passes_test(lambda user: user.is_staff)
+def export_data(request, kind):
+    """Stream matches, events or players as CSV or XLSX.
+
+    Filters: ?league=<id>&university=<id>&date_from=YYYY-MM-DD&date_to=YYYY-MM-DD&format=csv|xlsx
+    """
+    if kind not in exports.EXPORTS:
+        raise Http404(f"No export called {kind!r}.")
+    form = ExportForm(request.GET)
+    if not form.is_valid():
+        return JsonResponse({'errors': form.errors}, status=400)
+
+    data = form.cleaned_data
+    queryset = exports.export_queryset(kind, league=data['league'], university=data['university'],
+                                       date_from=data['date_from'], date_to=data['date_to'])
+    filename = f"{kind}-{timezone.localdate():%Y%m%d}"
+
+    if data['format'] == 'xlsx':
+        file = exports.xlsx_file(kind, queryset)
+        return stream_file(request, FileResponse(file, as_attachment=True, filename=f'{filename}.xlsx'), file)
+
+    lines = stream(request, exports.csv_lines(kind, queryset), batch=exports.CHUNK_SIZE)
+    response = StreamingHttpResponse(lines, content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename="{filename}.csv"'
+    return response
+
+
+from django.conf import settings
+from django.utils.text import slugify
+from . import reports
+
+def report_response(kind, pk, filename):
+    """Send the cached PDF, or 202 with Retry-After while it is still being rendered."""
+    file = reports.open_report(kind, pk, wait=settings.REPORT_RENDER_WAIT)
+    if file is None:
+        response = JsonResponse({'status': 'rendering'}, status=202)
+        response['Retry-After'] = '2'
+        return response
+    response = FileResponse(file, content_type='application/pdf', filename=filename)
+    response['Cache-Control'] = 'no-cache'
+    return response
+
+
+# ✅ Printable league table
+def league_table_pdf(request, league_id):
+    league = get_object_or_404(League, pk=league_id)
+    return report_response('league', league.pk, f"{slugify(league.name) or 'league'}-table.pdf")
+
+
+# ✅ Printable match sheet
+def match_sheet_pdf(request, pk):
+    match = get_object_or_404(Match, pk=pk)
+    return report_response('match', match.pk, f"match-{match.pk}.pdf")
+
+
+
+
+from datetime import datetime, time, timedelta
+from urllib.parse import urlencode
 from django.shortcuts import render
+from django.utils import timezone
+from .forms import MatchWindowForm
 from .models import Match
 
-def match_list(request):
-    # Fetch all matches, grouped by league
-    matches = Match.objects.select_related('league').order_by('league__name', 'start_time')
 
-    # 🔁 Automatically update status before displaying
-    for match in matches:
-        match.auto_update_status()
+def window_query(first, last):
+    """Query string selecting the days ``first``..``last``."""
+    if first == last:
+        return urlencode({'date': first.isoformat()})
+    return urlencode({'from': first.isoformat(), 'to': last.isoformat()})
+
 
-    # Group matches under each league name
-    grouped_matches = {}
-    for match in matches:
-        league_name = match.league.name if match.league else "Uncategorized"
-        grouped_matches.setdefault(league_name, []).append(match)
+def match_list(request):
+    """Fixtures kicking off in a window of days, grouped by league.
+
+    Only the window is read, as a range on the start_time index, so the page
+    costs the same in the first week of the season as in the last.
+    """
+    today = timezone.localdate()
+    window_form = MatchWindowForm(request.GET)  # ✅ date window instead of every match
+    first, last = window_form.window(today)
+    span = last - first + timedelta(days=1)
+
+    start = timezone.make_aware(datetime.combine(first, time.min))
+    end = timezone.make_aware(datetime.combine(last + timedelta(days=1), time.min))
+    # ordered by league so the template can regroup without a second pass
+    matches = (Match.objects.filter(start_time__gte=start, start_time__lt=end)
+               .select_related('league', 'home_team', 'away_team')
+               .order_by('league__name', 'league_id', 'start_time', 'id'))
 
     return render(request, 'pitch/match_list.html', {
-        'grouped_matches': grouped_matches,
+        'matches': matches,
+        'window_form': window_form,
+        'first_day': first,
+        'last_day': last,
+        'includes_today': first <= today <= last,
+        'previous_window': window_query(first - span, first - timedelta(days=1)),
+        'next_window': window_query(last + timedelta(days=1), last + span),
     })
 
 
 from django.http import JsonResponse
 from django.utils import timezone
 from .models import Match
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+from . import versions
+from django.contrib.auth.decorators import user_passes_test
+from django.utils.http import quote_etag
+from .scoreboard import snapshot_stats, versioned_scoreboard
+
+def scoreboard_etag(request):
+    return f"scoreboard-{versions.current(versions.SCOREBOARD)}"
 
+
+@cache_control(no_cache=True)
+@condition(etag_func=scoreboard_etag)
 def live_upcoming_matches(request):
-    """Return live and upcoming matches as JSON for AJAX updates."""
-    now = timezone.now()
-
-    # Auto-update statuses if you have this method
-    for match in Match.objects.exclude(status='postponed'):
-        match.auto_update_status()
-
-    live_matches = Match.objects.filter(status='live').select_related('league', 'home_team', 'away_team')
-    upcoming_matches = Match.objects.filter(start_time__gt=now).select_related('league', 'home_team', 'away_team')
-
-    data = {
-        'live_matches': [
-            {
-                'league': m.league.name,
-                'home_team': m.home_team.name,
-                'away_team': m.away_team.name,
-                'home_score': m.home_score or 0,
-                'away_score': m.away_score or 0,
-                'status': m.status,
-                'start_time': m.start_time.strftime('%H:%M'),
-            }
-            for m in live_matches
-        ],
-        'upcoming_matches': [
-            {
-                'league': m.league.name,
-                'home_team': m.home_team.name,
-                'away_team': m.away_team.name,
-                'start_time': m.start_time.strftime('%H:%M'),
-            }
-            for m in upcoming_matches
-        ]
-    }
+    """Return live and upcoming matches as JSON for AJAX updates.
+
+    Read-only: status transitions are applied by `manage.py run_match_clock`.
+    The ETag is the scoreboard version, so an unchanged board is answered
+    with a 304 before any match query runs. A stale board served during a
+    rebuild carries its own, older version, so the client asks again.
+    """
+    version, board = versioned_scoreboard()
+    response = JsonResponse(board)
+    response['ETag'] = quote_etag(f"scoreboard-{version}")  # condition() keeps it
+    return response
+
+
+@user_passes_test(lambda user: user.is_staff)
+def scoreboard_cache_stats(request):
+    """Hit/miss counters of the scoreboard snapshot cache."""
+    return JsonResponse(snapshot_stats())
+
+
+from django.views.decorators.http import require_safe
+from . import changes
+
+@require_safe
+@cache_control(no_cache=True)
+def change_feed(request):
+    """Match and event changes after `?since=<version>`, oldest first (see pitch.changes).
+
+    Without `since`, or with one older than the compacted log, the answer is
+    `resync: true` and the version to poll from after a full download.
+    """
+    try:
+        since = int(request.GET['since']) if request.GET.get('since') else None
+        limit = int(request.GET.get('limit', settings.CHANGE_FEED_LIMIT))
+    except ValueError:
+        return JsonResponse({'detail': "since and limit must be integers."}, status=400)
+    limit = max(1, min(limit, settings.CHANGE_FEED_LIMIT))
+    return JsonResponse(changes.feed(since, limit))
+
+
+import hmac
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from . import metrics as request_metrics
+
+def metrics(request):
+    """Request, SQL and scoreboard cache metrics in Prometheus text format.
+
+    Open to staff sessions, or to scrapers sending `Authorization: Bearer <METRICS_TOKEN>`.
+    """
+    token = settings.METRICS_TOKEN
+    supplied = request.headers.get('Authorization', '').removeprefix('Bearer ')
+    if not (request.user.is_staff or (token and hmac.compare_digest(supplied, token))):
+        return HttpResponseForbidden()
+
+    cache_lines = [
+        '# HELP upitch_scoreboard_cache_total Scoreboard snapshot cache lookups, by outcome.',
+        '# TYPE upitch_scoreboard_cache_total counter',
+    ]
+    cache_lines += [
+        f'upitch_scoreboard_cache_total{{outcome="{stat}"}} {count}'
+        for stat, count in snapshot_stats().items()
+    ]
+    body = request_metrics.render(request_metrics.collect(), cache_lines)
+    return HttpResponse(body, content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+import asyncio
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, StreamingHttpResponse
+from .broadcast import scoreboard_hub
+
+async def live_matches_stream(request):
+    """Server-Sent Events stream of scoreboard changes for the home page.
+
+    Every connection shares the process-wide hub, so one scoreboard read feeds
+    all clients. Under WSGI a long-lived stream would pin a worker, so the
+    endpoint answers 204 and the page falls back to polling `ajax-matches`.
+    """
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse(status=204)
+
+    async def events():
+        queue = await scoreboard_hub.subscribe()
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                try:
+                    yield await asyncio.wait_for(queue.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+        finally:
+            scoreboard_hub.unsubscribe(queue)
+
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
 
-    return JsonResponse(data)
 
 
 # ==========================================
@@ -401,27 +605,43 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from .serializers import (
     SportSerializer, UniversitySerializer, LeagueSerializer,
-    TeamSerializer, MatchSerializer, PlayerSerializer, EventSerializer
+    TeamSerializer, MatchSerializer, PlayerSerializer, EventSerializer,
+    UniversityReadSerializer, LeagueReadSerializer, TeamReadSerializer, MatchReadSerializer,
+    PlayerReadSerializer, EventReadSerializer,
 )
 from .models import University
+from .pagination import EventCursorPagination, MatchCursorPagination
+
+
+class ReadSerializerMixin:
+    """Use ``read_serializer_class`` for list/retrieve and ``serializer_class`` for writes."""
+    read_serializer_class = None
+
+    def get_serializer_class(self):
+        if self.read_serializer_class is not None and self.action in ('list', 'retrieve'):
+            return self.read_serializer_class
+        return super().get_serializer_class()
+
 
 class SportViewSet(viewsets.ModelViewSet):
     queryset = Sport.objects.all()
     serializer_class = SportSerializer
 
-class UniversityViewSet(viewsets.ModelViewSet):
+class UniversityViewSet(ReadSerializerMixin, viewsets.ModelViewSet):
     queryset = University.objects.all()
     serializer_class = UniversitySerializer
+    read_serializer_class = UniversityReadSerializer
 
-class LeagueViewSet(viewsets.ModelViewSet):
-    queryset = League.objects.all()
+class LeagueViewSet(ReadSerializerMixin, viewsets.ModelViewSet):
+    queryset = League.objects.select_related('sport', 'university')
     serializer_class = LeagueSerializer
+    read_serializer_class = LeagueReadSerializer
 
     @action(detail=True, methods=['get'])
     def table(self, request, pk=None):
         league = self.get_object()
-        table_data = calculate_league_table(league)
-        # calculate_league_table returns a list of dicts with the team object
+        table_data = league_table(league)
+        # league_table returns a list of dicts with the team object
         serialized_table = []
         for row in table_data:
             serialized_table.append({
@@ -439,19 +659,25 @@ class LeagueViewSet(viewsets.ModelViewSet):
             })
         return Response(serialized_table)
 
-class TeamViewSet(viewsets.ModelViewSet):
-    queryset = Team.objects.all()
+class TeamViewSet(ReadSerializerMixin, viewsets.ModelViewSet):
+    queryset = Team.objects.select_related('sport', 'university').prefetch_related('league')
     serializer_class = TeamSerializer
+    read_serializer_class = TeamReadSerializer
 
-class MatchViewSet(viewsets.ModelViewSet):
-    queryset = Match.objects.all()
+class MatchViewSet(ReadSerializerMixin, viewsets.ModelViewSet):
+    queryset = Match.objects.select_related('league', 'home_team', 'away_team')
     serializer_class = MatchSerializer
+    read_serializer_class = MatchReadSerializer
+    pagination_class = MatchCursorPagination
 
-class PlayerViewSet(viewsets.ModelViewSet):
-    queryset = Player.objects.all()
+class PlayerViewSet(ReadSerializerMixin, viewsets.ModelViewSet):
+    queryset = Player.objects.select_related('team', 'university')
     serializer_class = PlayerSerializer
+    read_serializer_class = PlayerReadSerializer
 
-class EventViewSet(viewsets.ModelViewSet):
-    queryset = Event.objects.all()
+class EventViewSet(ReadSerializerMixin, viewsets.ModelViewSet):
+    queryset = Event.objects.select_related('team', 'player_name')
     serializer_class = EventSerializer
+    read_serializer_class = EventReadSerializer
+    pagination_class = EventCursorPagination
 
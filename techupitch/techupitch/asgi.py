@@ -13,4 +13,15 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'techupitch.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Imported after Django is set up: the consumers touch the ORM.
+from pitch.consumers import websocket_application  # noqa: E402
+
+
+async def application(scope, receive, send):
+    """Serve WebSockets (e.g. /ws/match/<id>/) from pitch.consumers, everything else from Django."""
+    if scope['type'] == 'websocket':
+        await websocket_application(scope, receive, send)
+    else:
+        await django_application(scope, receive, send)
@@ -61,6 +61,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'pitch.metrics.MetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
@@ -136,7 +137,8 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedStaticFilesStorage'
+# collectstatic writes content-hashed copies plus .gz/.br versions (see STORAGES
+# below); whitenoise serves the hashed names with a far-future immutable Cache-Control.
 # Where Django will search for your local static files (Bootstrap, CSS, JS)
 STATICFILES_DIRS = [
     BASE_DIR / "static",
@@ -155,5 +157,93 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 LOGIN_REDIRECT_URL = '/'
 
 
+# Django REST framework: every list endpoint is cursor-paginated (see pitch/pagination.py).
+REST_FRAMEWORK = {
+    'DEFAULT_PAGINATION_CLASS': 'pitch.pagination.IdCursorPagination',
+    'PAGE_SIZE': 50,
+}
+# Hard ceiling for ?page_size= on API list endpoints.
+API_MAX_PAGE_SIZE = 200
+
+
+# Cache framework. Local memory by default; point CACHE_BACKEND/CACHE_LOCATION at
+# e.g. django.core.cache.backends.filebased.FileBasedCache and a directory to share
+# the scoreboard snapshot between gunicorn workers.
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'upitch'),
+    }
+}
+
+# Scoreboard snapshot: seconds a cached copy may live (upcoming fixtures are
+# time-dependent), and how long a miss waits for another request's rebuild.
+SCOREBOARD_CACHE_TIMEOUT = 30
+SCOREBOARD_REBUILD_WAIT = 2
+
+# Team and player list pages. Row fragments are keyed on what they show, so an
+# edit never serves a stale row; the timeout only bounds how long unused ones
+# (and the static URLs inside them) linger.
+LIST_PAGE_SIZE = 24
+FRAGMENT_CACHE_TIMEOUT = 60 * 60 * 6
+
+# Fixtures page: days shown either side of today by default, and the longest
+# ?from=&to= range it will load.
+MATCH_LIST_DAYS = 3
+MATCH_LIST_MAX_DAYS = 31
+
+# Change feed (/api/changes/?since=): most entries per response, and how many
+# days of entries `manage.py compact_match_changes` keeps.
+CHANGE_FEED_LIMIT = 500
+CHANGE_LOG_RETENTION_DAYS = 7
+
+
+# Live scoreboard: how many upcoming fixtures the scoreboard carries, and how
+# often (seconds) the live stream re-reads it when nothing local wakes it up.
+SCOREBOARD_UPCOMING_LIMIT = 10
+SCOREBOARD_STREAM_INTERVAL = 5
+# Seconds between checks for new events on /ws/match/<id>/ when nothing local wakes it up.
+MATCH_STREAM_INTERVAL = 3
+
+
+# Request metrics served at /metrics. Set METRICS_DIR to a directory shared by
+# the gunicorn workers so the endpoint sums all of them (each flushes at most
+# every METRICS_FLUSH_INTERVAL seconds). Files of exited workers are deleted, so the
+# directory must be local to one host. METRICS_TOKEN lets a scraper in without a staff login.
+METRICS_DIR = os.environ.get('METRICS_DIR')
+METRICS_FLUSH_INTERVAL = 5
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
+
+# Printable PDF reports (league tables, match sheets): rendered on a pool of
+# REPORT_WORKERS threads and cached in REPORTS_DIR per data version. A request
+# waits up to REPORT_RENDER_WAIT seconds for a render before answering 202.
+REPORTS_DIR = os.environ.get('REPORTS_DIR', os.path.join(BASE_DIR, 'reports'))
+REPORT_WORKERS = 2
+REPORT_RENDER_WAIT = 10
+
+
+# Resized WebP/JPEG/PNG copies of uploaded logos and photos, built by
+# IMAGE_WORKERS processes. Widths cover the 20-150px slots the templates use, at 1x and 2x.
+IMAGE_DERIVATIVE_WIDTHS = (48, 96, 160, 320)
+IMAGE_QUALITY = 80
+IMAGE_WORKERS = 2
+
+
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+# Uploads are stored under content-hashed names (pitch/storage.py) and served by
+# pitch.media.serve_media with ranges, validators and a year of immutable
+# caching. Point MEDIA_STORAGE at another backend (and MEDIA_URL at its host)
+# and set SERVE_MEDIA=False to serve media from elsewhere.
+MEDIA_CACHE_MAX_AGE = 60 * 60 * 24 * 365
+SERVE_MEDIA = os.environ.get('SERVE_MEDIA', 'True') == 'True'
+
+STORAGES = {
+    'default': {
+        'BACKEND': os.environ.get('MEDIA_STORAGE', 'pitch.storage.HashedFileSystemStorage'),
+    },
+    'staticfiles': {
+        'BACKEND': 'pitch.storage.ManifestStaticStorage',
+    },
+}
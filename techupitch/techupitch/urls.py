@@ -16,8 +16,10 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+import re
+
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from django.views.generic import RedirectView
 from django.conf import settings
 from django.conf.urls.static import static
@@ -25,6 +27,7 @@ from django.conf.urls.static import static
 # DRF API Router Setup
 from rest_framework import routers
 from pitch import views as pitch_api_views
+from pitch.media import serve_media
 
 router = routers.DefaultRouter()
 router.register(r'sports', pitch_api_views.SportViewSet)
@@ -37,6 +40,8 @@ router.register(r'events', pitch_api_views.EventViewSet)
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('metrics', pitch_api_views.metrics, name='metrics'),
+    path('api/changes/', pitch_api_views.change_feed, name='change-feed'),
     path('api/', include(router.urls)),
     path('pitch/', include('pitch.urls')),
     path('', RedirectView.as_view(url='pitch/', permanent=True)),
@@ -45,5 +50,7 @@ urlpatterns = [
 
 urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
 
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
+if settings.SERVE_MEDIA:
+    urlpatterns += [
+        re_path(r'^%s(?P<path>.*)$' % re.escape(settings.MEDIA_URL.lstrip('/')), serve_media, name='media'),
+    ]